@@ -0,0 +1,143 @@
+"""
+Inference-only entry point: classify a large CSV in chunks with a saved pipeline.
+
+    python batch_predict.py data/Document_data.csv --output data/predictions.csv --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+DEFAULT_MODEL = os.path.join("models", "pipeline_tfidf_logreg.joblib")
+
+# Per-process model of pool workers, loaded once by _init_worker
+_model = None
+
+
+def load_model(path, mmap=True):
+    """Load a saved pipeline; numpy arrays are memory-mapped when joblib allows.
+
+    mmap_mode only applies to arrays stored uncompressed; everything else
+    (e.g. the TF-IDF vocabulary) is unpickled normally.
+    """
+    try:
+        return joblib.load(path, mmap_mode="r" if mmap else None)
+    except ValueError:
+        # Compressed artifacts cannot be memory-mapped
+        return joblib.load(path)
+
+
+def model_classes(model):
+    if isinstance(model, dict) and "clf" in model:
+        return list(model["clf"].classes_)
+    return list(model.classes_)
+
+
+def predict_proba(model, texts):
+    """predict_proba for either artifact layout saved by main.py."""
+    if isinstance(model, dict) and "clf" in model and "featurizer" in model:
+        return model["clf"].predict_proba(model["featurizer"].transform(texts))
+    return model.predict_proba(texts)
+
+
+def _init_worker(model_path, mmap):
+    global _model
+    _model = load_model(model_path, mmap)
+
+
+def _predict_chunk(texts):
+    return predict_proba(_model, texts)
+
+
+def iter_chunks(csv_path, text_column, chunksize):
+    """Yield (frame, texts) chunks of the input CSV."""
+    for frame in pd.read_csv(csv_path, chunksize=chunksize):
+        if text_column not in frame.columns:
+            raise ValueError(f"Column '{text_column}' not found in {csv_path}")
+        yield frame, frame[text_column].fillna("").astype(str).tolist()
+
+
+def iter_probabilities(chunks, model_path, workers=1, mmap=True, max_pending=None, model=None):
+    """Yield (frame, probabilities) in input order.
+
+    With workers <= 1, chunks are classified in this process by `model`
+    (loaded from model_path when not given). With workers > 1, they are
+    classified by a process pool whose workers each load model_path once;
+    at most max_pending chunks are in flight, so memory does not grow with
+    the input size.
+    """
+    if workers <= 1:
+        model = model if model is not None else load_model(model_path, mmap)
+        for frame, texts in chunks:
+            yield frame, predict_proba(model, texts)
+        return
+
+    max_pending = max_pending or 2 * workers
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, mmap)) as pool:
+        for frame, texts in chunks:
+            pending.append((frame, pool.submit(_predict_chunk, texts)))
+            if len(pending) >= max_pending:
+                frame, future = pending.popleft()
+                yield frame, future.result()
+        while pending:
+            frame, future = pending.popleft()
+            yield frame, future.result()
+
+
+def run(csv_path, output_path, model_path=DEFAULT_MODEL, text_column="text", keep_columns=None,
+        chunksize=5000, workers=1, mmap=True):
+    """Classify csv_path into output_path; returns (documents, seconds)."""
+    model = load_model(model_path, mmap)
+    classes = model_classes(model)
+    keep_columns = keep_columns or []
+
+    started = time.perf_counter()
+    n_docs = 0
+    header = True
+    chunks = iter_chunks(csv_path, text_column, chunksize)
+    for frame, proba in iter_probabilities(chunks, model_path, workers, mmap, model=model):
+        proba = np.asarray(proba)
+        out = frame[keep_columns].reset_index(drop=True) if keep_columns else pd.DataFrame(index=range(len(frame)))
+        out["predicted_label"] = np.asarray(classes)[proba.argmax(axis=1)]
+        out["confidence"] = proba.max(axis=1).round(6)
+        for j, label in enumerate(classes):
+            out[f"proba_{label}"] = proba[:, j].round(6)
+
+        # Append each chunk as soon as it is classified
+        out.to_csv(output_path, mode="w" if header else "a", header=header, index=False)
+        header = False
+        n_docs += len(frame)
+
+    return n_docs, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming batch inference for the document categorizer")
+    parser.add_argument("input", help="CSV with a text column")
+    parser.add_argument("--output", default=os.path.join("data", "predictions.csv"))
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--keep-columns", nargs="*", default=None,
+                        help="Input columns copied to the output (e.g. an id column)")
+    parser.add_argument("--chunksize", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--no-mmap", action="store_true", help="Load the model fully into memory")
+    args = parser.parse_args()
+
+    print(f"[predict] Classifying {args.input} with {args.model} ({args.workers} worker(s))...")
+    n_docs, seconds = run(args.input, args.output, args.model, args.text_column, args.keep_columns,
+                          args.chunksize, args.workers, not args.no_mmap)
+    rate = n_docs / seconds if seconds > 0 else float("inf")
+    print(f"[predict] {n_docs} documents in {seconds:.2f}s ({rate:.1f} docs/sec) -> {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Cross-validated model selection for the categorizer.
+
+Each fold is featurized once through a TfidfVectorizer (configured like the
+shipped pipeline_tfidf_logreg model) and cached on disk (keyed by data hash +
+featurizer config); the classifier grid is then evaluated in parallel against
+the cached matrices. Reported latency covers the full predict path: the fold's
+fitted vectorizer transforms the raw test texts before each prediction.
+
+    python model_selection.py data/Document_data.csv --folds 5 --n-jobs -1 --min-accuracy 0.95
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, RidgeClassifier, SGDClassifier
+from sklearn.model_selection import StratifiedKFold
+from sklearn.naive_bayes import ComplementNB
+from sklearn.svm import LinearSVC
+
+DEFAULT_CACHE_DIR = os.path.join("cache", "features")
+
+# Featurizer settings of models/pipeline_tfidf_logreg.joblib
+DEFAULT_FEATURIZER_KWARGS = {"ngram_range": (1, 2), "max_features": 5000}
+
+# (name, estimator class, fixed params, {param: values}) -- one candidate per value
+CLASSIFIER_GRID = [
+    ("logreg", LogisticRegression, {"max_iter": 1000, "solver": "saga"}, {"C": [0.1, 1.0, 10.0]}),
+    ("linear_svc", LinearSVC, {}, {"C": [0.1, 1.0, 10.0]}),
+    ("sgd_log", SGDClassifier, {"loss": "log_loss", "random_state": 123}, {"alpha": [1e-5, 1e-4, 1e-3]}),
+    ("ridge", RidgeClassifier, {}, {"alpha": [0.1, 1.0, 10.0]}),
+    ("complement_nb", ComplementNB, {}, {"alpha": [0.1, 0.5, 1.0]}),
+]
+
+
+def expand_grid(grid):
+    candidates = []
+    for name, estimator, fixed, search in grid:
+        for param, values in search.items():
+            for value in values:
+                candidates.append((f"{name}({param}={value})", estimator, {**fixed, param: value}))
+    return candidates
+
+
+def data_hash(texts, labels):
+    digest = hashlib.sha1()
+    for text, label in zip(texts, labels):
+        digest.update(str(text).encode("utf-8"))
+        digest.update(b"\x1f")
+        digest.update(str(label).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()[:16]
+
+
+def build_featurizer(**kwargs):
+    """TfidfVectorizer with the shipped pipeline's settings, overridden by kwargs."""
+    params = {**DEFAULT_FEATURIZER_KWARGS, **kwargs}
+    if "ngram_range" in params:
+        params["ngram_range"] = tuple(params["ngram_range"])  # JSON gives a list
+    return TfidfVectorizer(**params)
+
+
+def featurizer_config(featurizer):
+    """JSON-able description of a featurizer, used in the cache key."""
+    return {"class": type(featurizer).__name__,
+            "params": {key: repr(value) for key, value in sorted(featurizer.get_params().items())}}
+
+
+def config_hash(config):
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=repr).encode("utf-8")).hexdigest()[:16]
+
+
+def cache_folds(texts, labels, n_folds, seed, featurizer_kwargs, cache_dir=DEFAULT_CACHE_DIR):
+    """Featurize each fold once (fit on its training part); return the cached fold paths.
+
+    Folds already on disk for the same data, split and featurizer config are reused.
+    """
+    config = featurizer_config(build_featurizer(**featurizer_kwargs))
+    key = f"{data_hash(texts, labels)}-{config_hash({**config, 'folds': n_folds, 'seed': seed})}"
+    fold_dir = os.path.join(cache_dir, key)
+    os.makedirs(fold_dir, exist_ok=True)
+
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    paths = []
+    for fold, (train_idx, test_idx) in enumerate(splitter.split(texts, labels)):
+        path = os.path.join(fold_dir, f"fold{fold}.joblib")
+        paths.append(path)
+        if os.path.exists(path):
+            print(f"[select] Fold {fold}: cached ({path})")
+            continue
+
+        featurizer = build_featurizer(**featurizer_kwargs)
+        started = time.perf_counter()
+        X_train = featurizer.fit_transform([texts[i] for i in train_idx])
+        seconds = time.perf_counter() - started
+        print(f"[select] Fold {fold}: featurized in {seconds:.2f}s")
+
+        # Test texts stay raw: evaluate() times featurization as part of predict
+        tmp_path = path + ".tmp"
+        joblib.dump({"featurizer": featurizer, "X_train": X_train, "y_train": labels[train_idx],
+                     "texts_test": [texts[i] for i in test_idx], "y_test": labels[test_idx],
+                     "featurize_seconds": seconds}, tmp_path)
+        os.replace(tmp_path, path)
+
+    with open(os.path.join(fold_dir, "config.json"), "w") as f:
+        json.dump(config, f, indent=2, default=repr)
+    return paths
+
+
+def evaluate(name, estimator, params, fold_path):
+    """Fit one candidate on one cached fold; returns accuracy and end-to-end inference latency."""
+    fold = joblib.load(fold_path, mmap_mode="r")
+    clf = estimator(**params)
+    started = time.perf_counter()
+    try:
+        clf.fit(fold["X_train"], fold["y_train"])
+    except ValueError as e:
+        # e.g. ComplementNB on features with negative values
+        return {"name": name, "error": str(e)}
+    fit_seconds = time.perf_counter() - started
+
+    # Raw text in, labels out; best of a few runs: single timings on small folds are noisy
+    featurizer, texts_test = fold["featurizer"], fold["texts_test"]
+    predict_seconds = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        predictions = clf.predict(featurizer.transform(texts_test))
+        predict_seconds = min(predict_seconds, time.perf_counter() - started)
+    return {
+        "name": name,
+        "accuracy": float(np.mean(predictions == fold["y_test"])),
+        "fit_seconds": fit_seconds,
+        "latency_us_per_doc": 1e6 * predict_seconds / max(len(predictions), 1),
+    }
+
+
+def rank_candidates(results, min_accuracy=None):
+    """Aggregate fold results per candidate, best accuracy first, then lowest latency."""
+    by_name = {}
+    for result in results:
+        by_name.setdefault(result["name"], []).append(result)
+
+    report = []
+    for name, folds in by_name.items():
+        errors = [r["error"] for r in folds if "error" in r]
+        if errors:
+            report.append({"name": name, "error": errors[0]})
+            continue
+        accuracy = np.array([r["accuracy"] for r in folds])
+        report.append({
+            "name": name,
+            "accuracy_mean": round(float(accuracy.mean()), 4),
+            "accuracy_std": round(float(accuracy.std()), 4),
+            "latency_us_per_doc": round(float(np.mean([r["latency_us_per_doc"] for r in folds])), 2),
+            "fit_seconds": round(float(np.mean([r["fit_seconds"] for r in folds])), 4),
+            "meets_bar": None if min_accuracy is None else bool(accuracy.mean() >= min_accuracy),
+        })
+
+    scored = sorted((r for r in report if "error" not in r),
+                    key=lambda r: (-r["accuracy_mean"], r["latency_us_per_doc"]))
+    return scored + [r for r in report if "error" in r]
+
+
+def fastest_meeting_bar(report, min_accuracy):
+    eligible = [r for r in report if "error" not in r and r["accuracy_mean"] >= min_accuracy]
+    return min(eligible, key=lambda r: r["latency_us_per_doc"]) if eligible else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel cross-validated model selection for the categorizer")
+    parser.add_argument("input", help="Labelled CSV (text, label)")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=123)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="joblib workers (-1: all cores)")
+    parser.add_argument("--featurizer-kwargs", default="{}",
+                        help="JSON keyword arguments for TfidfVectorizer (e.g. '{\"max_features\": 20000}')")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--min-accuracy", type=float, default=None, help="Accuracy bar for the recommendation")
+    parser.add_argument("--report", default=os.path.join("models", "model_selection_report.json"))
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input).dropna(subset=[args.label_column])
+    texts = df[args.text_column].fillna("").astype(str).tolist()
+    labels = df[args.label_column].astype(str).values
+    featurizer_kwargs = json.loads(args.featurizer_kwargs)
+
+    print(f"[select] {len(texts)} documents, {args.folds} folds")
+    fold_paths = cache_folds(texts, labels, args.folds, args.seed, featurizer_kwargs, args.cache_dir)
+
+    candidates = expand_grid(CLASSIFIER_GRID)
+    print(f"[select] Evaluating {len(candidates)} candidates x {len(fold_paths)} folds (n_jobs={args.n_jobs})...")
+    results = Parallel(n_jobs=args.n_jobs)(
+        delayed(evaluate)(name, estimator, params, path)
+        for name, estimator, params in candidates
+        for path in fold_paths
+    )
+    report = rank_candidates(results, args.min_accuracy)
+
+    print(f"\n{'candidate':34s} {'accuracy':>16s} {'latency us/doc':>15s} {'fit s':>8s}")
+    for r in report:
+        if "error" in r:
+            print(f"{r['name']:34s} failed: {r['error'][:60]}")
+            continue
+        flag = "" if r["meets_bar"] is None else ("  ok" if r["meets_bar"] else "  below bar")
+        print(f"{r['name']:34s} {r['accuracy_mean']:>8.4f} ±{r['accuracy_std']:.4f} "
+              f"{r['latency_us_per_doc']:>15.2f} {r['fit_seconds']:>8.3f}{flag}")
+
+    summary = {"documents": len(texts), "folds": args.folds, "ranking": report}
+    if args.min_accuracy is not None:
+        best = fastest_meeting_bar(report, args.min_accuracy)
+        summary["recommended"] = best
+        print(f"\n[select] Fastest candidate with accuracy >= {args.min_accuracy}: "
+              f"{best['name'] if best else 'none'}")
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"[select] Report saved to {args.report}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
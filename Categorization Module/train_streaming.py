@@ -0,0 +1,151 @@
+"""
+Out-of-core training for the categorizer: hashed features + SGD partial_fit.
+
+    python train_streaming.py data/Document_data.csv --epochs 3 --chunksize 5000 --checkpoint-every 10
+"""
+import argparse
+import os
+import sys
+import time
+from itertools import islice
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+
+DEFAULT_OUTPUT = os.path.join("models", "pipeline_hashing_sgd.joblib")
+DEFAULT_CHECKPOINT = os.path.join("models", "checkpoint_hashing_sgd.joblib")
+
+
+def build_featurizer(n_features=2 ** 20, ngram_range=(1, 2)):
+    """Stateless featurizer: nothing is fitted, so memory does not grow with the corpus."""
+    return HashingVectorizer(n_features=n_features, ngram_range=ngram_range,
+                             alternate_sign=False, norm="l2")
+
+
+def scan_labels(csv_path, label_column, chunksize):
+    """Collect the label set with a pass over the label column only."""
+    labels = set()
+    for frame in pd.read_csv(csv_path, usecols=[label_column], chunksize=chunksize):
+        labels.update(frame[label_column].dropna().astype(str).unique())
+    return np.array(sorted(labels))
+
+
+def iter_labelled_chunks(csv_path, text_column, label_column, chunksize):
+    for frame in pd.read_csv(csv_path, usecols=[text_column, label_column], chunksize=chunksize):
+        frame = frame.dropna(subset=[label_column])
+        yield frame[text_column].fillna("").astype(str).tolist(), frame[label_column].astype(str).values
+
+
+def save_artifact(pipeline, path):
+    """Write atomically so an interrupted run never leaves a truncated artifact."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    joblib.dump(pipeline, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def save_checkpoint(pipeline, path, epoch, chunk, chunks_seen, rng):
+    """Checkpoint the model with its position: `chunk` chunks of `epoch` are already learned."""
+    save_artifact({"pipeline": pipeline, "epoch": epoch, "chunk": chunk, "chunks_seen": chunks_seen,
+                   "rng_state": rng.bit_generator.state}, path)
+
+
+def load_checkpoint(path):
+    """Return (pipeline, epoch, chunk, chunks_seen, rng_state); bare pipelines restart at epoch 1."""
+    checkpoint = joblib.load(path)
+    if isinstance(checkpoint, dict):
+        return (checkpoint["pipeline"], checkpoint["epoch"], checkpoint["chunk"],
+                checkpoint["chunks_seen"], checkpoint.get("rng_state"))
+    return checkpoint, 1, 0, 0, None
+
+
+def train_streaming(csv_path, text_column="text", label_column="label", chunksize=5000, epochs=1,
+                    checkpoint_every=10, checkpoint_path=DEFAULT_CHECKPOINT, alpha=1e-5,
+                    n_features=2 ** 20, resume=False, seed=123):
+    """Train a HashingVectorizer + SGDClassifier(log_loss) pipeline chunk by chunk.
+
+    Each chunk is scored by the current model before it is learned from
+    (progressive validation), which gives an accuracy estimate per epoch
+    without holding out data in memory.
+
+    Checkpoints record the epoch and chunk reached, so a resumed run skips
+    the chunks already learned (resume with the same csv_path and chunksize).
+    """
+    rng = np.random.default_rng(seed)
+    start_epoch, start_chunk, chunks_seen = 1, 0, 0
+    if resume and os.path.exists(checkpoint_path):
+        pipeline, start_epoch, start_chunk, chunks_seen, rng_state = load_checkpoint(checkpoint_path)
+        featurizer, clf = pipeline.named_steps["hash"], pipeline.named_steps["clf"]
+        classes = clf.classes_
+        if rng_state is not None:
+            rng.bit_generator.state = rng_state
+        print(f"[train] Resuming from {checkpoint_path} at epoch {start_epoch}, chunk {start_chunk}")
+    else:
+        featurizer = build_featurizer(n_features)
+        clf = SGDClassifier(loss="log_loss", alpha=alpha, random_state=seed)
+        pipeline = Pipeline([("hash", featurizer), ("clf", clf)])
+        classes = scan_labels(csv_path, label_column, chunksize)
+        print(f"[train] Classes: {', '.join(classes)}")
+
+    for epoch in range(start_epoch, epochs + 1):
+        started = time.perf_counter()
+        n_docs, n_correct, n_scored = 0, 0, 0
+        skip = start_chunk if epoch == start_epoch else 0
+        chunks = islice(iter_labelled_chunks(csv_path, text_column, label_column, chunksize), skip, None)
+        for chunk, (texts, labels) in enumerate(chunks, start=skip + 1):
+            if not texts:
+                continue
+            X = featurizer.transform(texts)
+
+            if hasattr(clf, "coef_"):
+                n_correct += int((clf.predict(X) == labels).sum())
+                n_scored += len(labels)
+
+            # Shuffle within the chunk; SGD is sensitive to label runs
+            order = rng.permutation(len(labels))
+            clf.partial_fit(X[order], labels[order], classes=classes)
+
+            n_docs += len(labels)
+            chunks_seen += 1
+            if checkpoint_every and chunks_seen % checkpoint_every == 0:
+                save_checkpoint(pipeline, checkpoint_path, epoch, chunk, chunks_seen, rng)
+
+        if checkpoint_every:
+            save_checkpoint(pipeline, checkpoint_path, epoch + 1, 0, chunks_seen, rng)
+        seconds = time.perf_counter() - started
+        accuracy = f"{n_correct / n_scored:.4f}" if n_scored else "n/a"
+        print(f"[train] Epoch {epoch}/{epochs}: {n_docs} docs in {seconds:.2f}s, "
+              f"progressive accuracy {accuracy}")
+
+    return pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Out-of-core training for the document categorizer")
+    parser.add_argument("input", help="Labelled CSV (text, label)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--chunksize", type=int, default=5000)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="Chunks between checkpoints (0: off)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint if present")
+    parser.add_argument("--alpha", type=float, default=1e-5, help="L2 regularization strength")
+    parser.add_argument("--n-features", type=int, default=2 ** 20)
+    parser.add_argument("--seed", type=int, default=123)
+    args = parser.parse_args()
+
+    pipeline = train_streaming(args.input, args.text_column, args.label_column, args.chunksize, args.epochs,
+                               args.checkpoint_every, args.checkpoint, args.alpha, args.n_features,
+                               args.resume, args.seed)
+    save_artifact(pipeline, args.output)
+    print(f"[train] Pipeline saved to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -87,15 +87,19 @@ def demo_comparison(model, documents):
     print("Priority Scores by Department:")
     print("-" * 80)
     
+    # One pass scores the document for every department
+    matrix = model.score_matrix([sample_doc], departments)
+    
     comparison_results = []
-    for dept in departments:
-        score_result = model.calculate_priority_score(sample_doc, dept, dept)
+    for j, dept in enumerate(departments):
+        score = matrix['priority_score'][0, j]
+        label = matrix['priority_label'][0, j]
         comparison_results.append({
             'department': dept,
-            'score': score_result['priority_score'],
-            'label': score_result['priority_label']
+            'score': score,
+            'label': label
         })
-        print(f"{dept:15s} | Score: {score_result['priority_score']:.4f} | Priority: {score_result['priority_label']}")
+        print(f"{dept:15s} | Score: {score:.4f} | Priority: {label}")
     
     print()
     print("💡 Insight: Documents from CMRS (Safety Authority) are automatically prioritized")
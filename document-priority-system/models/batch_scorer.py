@@ -0,0 +1,683 @@
+"""
+Batch Priority Scorer
+Columnar, array-at-a-time evaluation of the DocumentPriorityModel score
+"""
+
+import json
+import uuid
+import base64
+import numpy as np
+from collections import Counter, OrderedDict
+from datetime import date, datetime, time
+from typing import List, Dict, Optional
+from models.bm25_index import BM25Index
+
+# Priority label thresholds (see DocumentPriorityModel._get_priority_label)
+PRIORITY_THRESHOLDS = np.array([0.30, 0.50, 0.70, 0.85])
+PRIORITY_LABELS = np.array(['MINIMAL', 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL'], dtype=object)
+
+# Deadline buckets: inclusive upper bounds on days remaining (-1 means overdue)
+DEADLINE_BUCKET_EDGES = np.array([-1, 1, 3, 7, 14, 30])
+DEADLINE_URGENCY = np.array([1.0, 0.95, 0.85, 0.7, 0.55, 0.4, 0.25, 0.5])
+NO_DEADLINE_BUCKET = len(DEADLINE_URGENCY) - 1
+
+# Deadlines are stored as days since 1970-01-01; missing/invalid ones as a sentinel
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+NO_DEADLINE_DAY = np.iinfo(np.int64).min
+
+# Simulated TF-IDF similarity used by the per-document path
+SIMULATED_TFIDF_SCORE = 0.6
+
+# Document fields read by columnarize (and so by every score)
+SCORING_FIELDS = ('id', 'title', 'content', 'source_department', 'document_type', 'deadline',
+                  'tagged_departments', 'user_query')
+
+
+def parse_deadline_day(deadline_str) -> int:
+    """Epoch day of a 'YYYY-MM-DD' deadline, or NO_DEADLINE_DAY if missing or invalid"""
+    if not deadline_str:
+        return NO_DEADLINE_DAY
+    try:
+        return datetime.strptime(deadline_str, '%Y-%m-%d').toordinal() - EPOCH_ORDINAL
+    except (TypeError, ValueError):
+        return NO_DEADLINE_DAY
+
+
+def parse_deadlines(deadlines) -> np.ndarray:
+    """Parse deadline strings into an epoch-day array (each distinct string once)"""
+    parsed = {}
+    days = np.empty(len(deadlines), dtype=np.int64)
+    for i, deadline in enumerate(deadlines):
+        day = parsed.get(deadline)
+        if day is None:
+            day = parsed[deadline] = parse_deadline_day(deadline)
+        days[i] = day
+    return days
+
+
+def deadline_urgency(deadline_days, as_of=None) -> np.ndarray:
+    """
+    Deadline urgency for an epoch-day array as of a given date
+
+    Args:
+        deadline_days: Epoch days (NO_DEADLINE_DAY for documents without a deadline)
+        as_of: date or datetime to score at (default: now)
+
+    Returns:
+        Urgency array with the shape of deadline_days
+    """
+    if as_of is None:
+        as_of = datetime.now()
+    today = as_of.toordinal() - EPOCH_ORDINAL
+    # Deadlines are at midnight, so any time past it loses the day (as timedelta.days floors)
+    if isinstance(as_of, datetime) and as_of.time() != time(0):
+        today += 1
+
+    deadline_days = np.asarray(deadline_days, dtype=np.int64)
+    missing = deadline_days == NO_DEADLINE_DAY
+    days_remaining = np.where(missing, today, deadline_days) - today
+    buckets = np.where(missing, NO_DEADLINE_BUCKET, np.searchsorted(DEADLINE_BUCKET_EDGES, days_remaining))
+    return DEADLINE_URGENCY[buckets]
+
+
+def id_sort_key(doc_id) -> str:
+    """Tie-break key for a document id (missing ids sort first)"""
+    return '' if doc_id is None else str(doc_id)
+
+
+def encode_cursor(score: float, id_key: str, row: int, snapshot_id: Optional[str] = None) -> str:
+    """Opaque pagination cursor for the last returned (score, id) position of a snapshot"""
+    payload = json.dumps([float(score), id_key, int(row), snapshot_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        score, id_key, row, snapshot_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return float(score), str(id_key), int(row), (None if snapshot_id is None else str(snapshot_id))
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def content_scores(bm25: np.ndarray, jaccard: np.ndarray, noise: np.ndarray) -> Dict[str, np.ndarray]:
+    """Combine BM25, query overlap and simulated BERT noise into content relevance"""
+    tfidf = np.full(bm25.shape, SIMULATED_TFIDF_SCORE)
+    bert = np.minimum(0.6 * jaccard + 0.4 * noise, 1.0)
+    combined = (0.3 * tfidf + 0.3 * bm25 + 0.4 * bert)
+    return {'tfidf': tfidf, 'bm25': bm25, 'bert': bert, 'content_relevance': combined}
+
+
+def weighted_priority(authority, doc_type, urgency, role_relevance, content_relevance) -> np.ndarray:
+    """
+    Weighted priority score with the urgency boost
+
+    Document-level components may be column vectors (n, 1) so they broadcast
+    against per-department (n, departments) matrices.
+    """
+    priority = (
+        authority * 0.20 +
+        doc_type * 0.15 +
+        urgency * 0.25 +
+        role_relevance * 0.20 +
+        content_relevance * 0.20
+    )
+
+    # Urgency boost for high-priority combinations
+    boost = (urgency > 0.8) & (authority > 0.85)
+    return np.where(boost, np.minimum(priority * 1.15, 1.0), priority)
+
+
+def priority_labels(priority: np.ndarray) -> np.ndarray:
+    """Map priority scores (any shape) to their labels"""
+    return PRIORITY_LABELS[np.searchsorted(PRIORITY_THRESHOLDS, priority, side='right')]
+
+
+class DocumentColumns:
+    """
+    Struct-of-arrays view of a document list
+
+    Built once by BatchPriorityScorer.columnarize and reusable across
+    scoring calls for any department.
+    """
+
+    def __init__(self, documents, source_codes, doc_type_codes, deadline_days,
+                 tag_matrix, term_counts, doc_lengths, index_rows, queries):
+        self.documents = documents
+        self.source_codes = source_codes
+        self.doc_type_codes = doc_type_codes
+        self.deadline_days = deadline_days
+        self.tag_matrix = tag_matrix
+        self.term_counts = term_counts
+        self.distinct_terms = np.array([len(c) for c in term_counts], dtype=np.int64)
+        self.id_keys = [id_sort_key(doc.get('id')) for doc in documents]
+        self.doc_lengths = doc_lengths
+        self.index_rows = index_rows
+        self.queries = queries
+
+    def __len__(self):
+        return len(self.documents)
+
+
+def slice_scores(scores: Dict[str, np.ndarray], start: int, stop: int) -> Dict[str, np.ndarray]:
+    """Score arrays of rows start:stop (views)"""
+    return {key: values[start:stop] for key, values in scores.items()}
+
+
+class BatchPriorityScorer:
+    """
+    Vectorized scoring engine for DocumentPriorityModel
+
+    Weight dicts are compiled into lookup arrays, tagged departments into a
+    multi-hot matrix, and every score component is computed as a whole-array
+    operation. Results match DocumentPriorityModel.calculate_priority_score.
+    """
+
+    def __init__(self, model, snapshot_cache_size: int = 16):
+        self.model = model
+        self.snapshot_cache_size = snapshot_cache_size
+        self._sessions = {}
+        self._snapshots = OrderedDict()
+        self.compile()
+
+    def compile(self):
+        """Compile the model's weight dicts into lookup tables"""
+        model = self.model
+        self._sessions = {}
+        self._snapshots = OrderedDict()
+
+        # Authority and document type tables; the last slot holds the default
+        self.authority_index = {dept: i for i, dept in enumerate(model.dept_authority_weights)}
+        self.authority_table = np.array(list(model.dept_authority_weights.values()) + [0.5])
+
+        self.doc_type_index = {doc_type: i for i, doc_type in enumerate(model.doc_type_weights)}
+        self.doc_type_table = np.array(list(model.doc_type_weights.values()) + [0.5])
+
+        # Department vocabulary for the multi-hot tag matrix
+        self.departments = []
+        self.department_index = {}
+        for user_dept, row in model.role_relevance_matrix.items():
+            self._department_column(user_dept)
+            for dept in row:
+                self._department_column(dept)
+
+        # User department x tagged department relevance (0.3 when unlisted)
+        self.user_index = {dept: i for i, dept in enumerate(model.role_relevance_matrix)}
+        self.relevance_matrix = np.full(
+            (len(self.user_index) + 1, len(self.departments)), 0.3
+        )
+        for user_dept, row in model.role_relevance_matrix.items():
+            for dept, weight in row.items():
+                self.relevance_matrix[self.user_index[user_dept], self.department_index[dept]] = weight
+
+    @property
+    def metrics(self):
+        """Stage timers of the model (see models.instrumentation)"""
+        return self.model.metrics
+
+    def _department_column(self, dept):
+        """Return the tag matrix column for a department, adding it if unseen"""
+        col = self.department_index.get(dept)
+        if col is None:
+            col = len(self.departments)
+            self.departments.append(dept)
+            self.department_index[dept] = col
+            if hasattr(self, 'relevance_matrix'):
+                self.relevance_matrix = np.hstack([
+                    self.relevance_matrix,
+                    np.full((self.relevance_matrix.shape[0], 1), 0.3)
+                ])
+        return col
+
+    def columnarize(self, documents: List[Dict], term_counts: Optional[List[Counter]] = None) -> DocumentColumns:
+        """
+        Convert a document list into a DocumentColumns batch
+
+        term_counts, when given, are the documents' already tokenized BM25
+        term counts (see TokenizedBatch) and are used instead of tokenizing
+        the content again. Scoring never adds documents to the BM25 corpus;
+        that is done explicitly with DocumentPriorityModel.index_documents.
+        """
+        with self.metrics.timer('scoring.columnarize'):
+            return self._columnarize(documents, term_counts)
+
+    def _columnarize(self, documents: List[Dict], term_counts: Optional[List[Counter]]) -> DocumentColumns:
+        n_docs = len(documents)
+        default_source = len(self.authority_index)
+        default_doc_type = len(self.doc_type_index)
+
+        source_codes = np.empty(n_docs, dtype=np.intp)
+        doc_type_codes = np.empty(n_docs, dtype=np.intp)
+        tag_rows, tag_cols = [], []
+        shared_counts = term_counts
+        term_counts = []
+        doc_lengths = np.empty(n_docs, dtype=np.int64)
+        index_rows = np.full(n_docs, -1, dtype=np.intp)
+        bm25_index = self.model.bm25_index
+        queries = []
+
+        for i, doc in enumerate(documents):
+            source_codes[i] = self.authority_index.get(doc.get('source_department', 'General'), default_source)
+            doc_type_codes[i] = self.doc_type_index.get(doc.get('document_type', 'General_Notice'), default_doc_type)
+
+            for dept in doc.get('tagged_departments', []):
+                tag_rows.append(i)
+                tag_cols.append(self._department_column(dept))
+
+            if shared_counts is not None:
+                counts = shared_counts[i]
+                doc_lengths[i] = sum(counts.values())
+            else:
+                terms = BM25Index.tokenize(doc.get('content', doc.get('title', '')))
+                counts = Counter(terms)
+                doc_lengths[i] = len(terms)
+            term_counts.append(counts)
+
+            # Indexed documents are scored from their postings; others (and
+            # documents whose length changed since indexing) from their counts
+            doc_id = doc.get('id')
+            if doc_id is not None:
+                row = bm25_index.doc_number(doc_id)
+                if row is not None and bm25_index.doc_length(row) == doc_lengths[i]:
+                    index_rows[i] = row
+            queries.append(doc.get('user_query'))
+
+        tag_matrix = np.zeros((n_docs, len(self.departments)), dtype=bool)
+        tag_matrix[tag_rows, tag_cols] = True
+
+        deadline_days = parse_deadlines([doc.get('deadline', None) for doc in documents])
+
+        return DocumentColumns(documents, source_codes, doc_type_codes, deadline_days,
+                               tag_matrix, term_counts, doc_lengths, index_rows, queries)
+
+    def session(self, user_department: str, user_role: Optional[str] = None,
+                query: Optional[str] = None) -> 'ScoringSession':
+        """Return a (cached) scoring session for one user profile"""
+        key = (user_department, user_role, query)
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = ScoringSession(self, user_department, user_role, query)
+        return session
+
+    def page_snapshot(self, session: 'ScoringSession', documents: List[Dict], as_of=None,
+                      cursor: Optional[str] = None, scored: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Immutable scores of a document list to page over
+
+        Scores vary between calls (simulated BERT noise, corpus statistics,
+        the current date), so one cursor walk must rank a single set of them.
+        A first page (no cursor) scores the documents afresh and keeps the
+        score and id-key arrays under a new snapshot id, which rank() writes
+        into its cursors; pages with a cursor reuse that snapshot and must
+        pass the same documents. The last snapshot_cache_size snapshots are
+        kept; a cursor whose snapshot was evicted raises "Expired cursor".
+
+        Args:
+            session: Scoring session of the profile
+            documents: The full document list being paged
+            as_of: Optional date or datetime to compute deadline urgency at
+            cursor: Cursor of the previous page (None for the first page)
+            scored: Already computed scores of documents for a first page
+
+        Returns:
+            Tuple of (scores, id_keys, snapshot_id) with read-only score arrays
+
+        Raises:
+            ValueError: If the cursor is malformed, expired or belongs to
+                another profile or document list
+        """
+        profile = (session.user_department, session.user_role, session.query, as_of)
+        if cursor is not None:
+            snapshot_id = decode_cursor(cursor)[3]
+            snapshot = self._snapshots.get(snapshot_id)
+            if snapshot is None:
+                raise ValueError(f"Expired cursor: {cursor!r}; request the first page again")
+            snapshot_profile, scores, id_keys = snapshot
+            if snapshot_profile != profile or len(id_keys) != len(documents):
+                raise ValueError(f"Invalid cursor: {cursor!r} was issued for another query")
+            self._snapshots.move_to_end(snapshot_id)
+            return scores, id_keys, snapshot_id
+
+        if scored is not None:
+            scores = scored
+            id_keys = [id_sort_key(doc.get('id')) for doc in documents]
+        else:
+            columns = self.columnarize(documents)
+            scores = session.score(columns, as_of)
+            id_keys = columns.id_keys
+        for values in scores.values():
+            values.flags.writeable = False
+
+        snapshot_id = uuid.uuid4().hex
+        if self.snapshot_cache_size > 0:
+            self._snapshots[snapshot_id] = (profile, scores, id_keys)
+            while len(self._snapshots) > self.snapshot_cache_size:
+                self._snapshots.popitem(last=False)
+        return scores, id_keys, snapshot_id
+
+    def _bm25_raw(self, query, query_terms, columns, rows):
+        """Raw BM25 scores for a subset of the batch"""
+        bm25_index = self.model.bm25_index
+        doc_numbers = columns.index_rows[rows]
+        indexed = doc_numbers >= 0
+        raw = np.zeros(len(rows))
+
+        if indexed.any():
+            matched, matched_scores = bm25_index.score_sparse(query)
+            if len(matched):
+                wanted = doc_numbers[indexed]
+                pos = np.minimum(np.searchsorted(matched, wanted), len(matched) - 1)
+                raw[indexed] = np.where(matched[pos] == wanted, matched_scores[pos], 0.0)
+
+        for j in np.flatnonzero(~indexed):
+            i = rows[j]
+            raw[j] = bm25_index.score_counts(query_terms, columns.term_counts[i], columns.doc_lengths[i])
+        return raw
+
+    def query_scores(self, columns: DocumentColumns, query, query_terms, query_words, rows):
+        """Normalized BM25 and query/document Jaccard overlap for a subset of the batch"""
+        counts = [columns.term_counts[i] for i in rows]
+
+        # BM25: indexed documents via postings, the rest via corpus statistics
+        bm25 = np.minimum(self._bm25_raw(query, query_terms, columns, rows) / 10, 1.0)
+
+        # Jaccard overlap between query and document vocabularies
+        overlap = np.zeros(len(rows), dtype=np.int64)
+        for word in query_words:
+            overlap += np.array([word in c for c in counts], dtype=np.int64)
+        union = len(query_words) + columns.distinct_terms[rows] - overlap
+        jaccard = np.divide(overlap, union, out=np.zeros(len(rows)), where=union > 0)
+        return bm25, jaccard
+
+    def urgency(self, columns: DocumentColumns, as_of=None) -> np.ndarray:
+        """Deadline urgency of the batch as of a date (default: the model's as_of, then now)"""
+        return deadline_urgency(columns.deadline_days, as_of if as_of is not None else self.model.as_of)
+
+    def score(self, columns: DocumentColumns, user_department: str, as_of=None) -> Dict[str, np.ndarray]:
+        """Score every document in the batch for one department"""
+        return self.session(user_department).score(columns, as_of)
+
+    def role_relevance_matrix(self, columns: DocumentColumns, departments: List[str],
+                              chunk_size: int = 16384) -> np.ndarray:
+        """Role relevance of every document for every department, shape (docs, departments)"""
+        tag_matrix = columns.tag_matrix
+        n_docs, width = tag_matrix.shape
+        user_rows = [self.user_index.get(dept, len(self.user_index)) for dept in departments]
+        relevance_rows = self.relevance_matrix[user_rows, :width]
+
+        relevance = np.full((n_docs, len(departments)), 0.3)
+        if width:
+            # Masked max of (docs, 1, tags) against (1, departments, tags), chunked over docs
+            for start in range(0, n_docs, chunk_size):
+                tags = tag_matrix[start:start + chunk_size, None, :]
+                best = np.where(tags, relevance_rows[None, :, :], -np.inf).max(axis=2)
+                relevance[start:start + chunk_size] = np.where(np.isfinite(best), best, 0.3)
+
+        for j, dept in enumerate(departments):
+            user_col = self.department_index.get(dept)
+            if user_col is not None and user_col < width:
+                relevance[:, j] = np.where(tag_matrix[:, user_col], 1.0, relevance[:, j])
+        return relevance
+
+    def score_matrix(self, columns: DocumentColumns, departments: List[str], as_of=None) -> Dict[str, np.ndarray]:
+        """
+        Score every document for every department in one pass
+
+        Authority, document type, urgency and user-query content scores are
+        computed once; only role relevance and department-query content
+        scores vary per department. Noise is drawn department by department,
+        so column j matches score() for departments[j] called in order.
+
+        Returns:
+            Dictionary of (docs, departments) score arrays
+        """
+        n_docs, n_depts = len(columns), len(departments)
+        authority = self.authority_table[columns.source_codes][:, None]
+        doc_type = self.doc_type_table[columns.doc_type_codes][:, None]
+        urgency = self.urgency(columns, as_of)[:, None]
+        role_relevance = self.role_relevance_matrix(columns, departments)
+
+        noise = np.random.uniform(0.3, 0.9, size=(n_depts, n_docs)).T
+        bm25 = np.zeros((n_docs, n_depts))
+        jaccard = np.zeros((n_docs, n_depts))
+
+        # Documents with their own query score the same for every department
+        by_query = {}
+        default_rows = []
+        for i, query in enumerate(columns.queries):
+            if query is None:
+                default_rows.append(i)
+            else:
+                by_query.setdefault(query, []).append(i)
+        for query, rows in by_query.items():
+            rows = np.array(rows, dtype=np.intp)
+            query_terms = BM25Index.tokenize(query)
+            bm25_rows, jaccard_rows = self.query_scores(columns, query, query_terms, set(query_terms), rows)
+            bm25[rows] = bm25_rows[:, None]
+            jaccard[rows] = jaccard_rows[:, None]
+
+        # The rest fall back to the department name as query
+        if default_rows:
+            rows = np.array(default_rows, dtype=np.intp)
+            for j, dept in enumerate(departments):
+                query_terms = BM25Index.tokenize(dept)
+                bm25[rows, j], jaccard[rows, j] = self.query_scores(columns, dept, query_terms, set(query_terms), rows)
+
+        content = content_scores(bm25, jaccard, noise)
+        priority = weighted_priority(authority, doc_type, urgency, role_relevance,
+                                     content['content_relevance'])
+
+        return {
+            'priority_score': priority,
+            'priority_label': priority_labels(priority),
+            'role_relevance': role_relevance,
+            **content
+        }
+
+    def rank(self, id_keys: List[str], scores: Dict[str, np.ndarray], top_k: Optional[int] = None,
+             cursor: Optional[str] = None, snapshot_id: Optional[str] = None):
+        """
+        Rows of the best top_k documents, ordered by (score desc, id asc)
+
+        Only the candidates at or above the k-th best score are sorted, so a
+        page costs O(n + k log k) instead of a full sort.
+
+        Args:
+            id_keys: Tie-break id keys of the rows (DocumentColumns.id_keys)
+            scores: Output of score()
+            top_k: Number of rows to return (default: all)
+            cursor: Cursor returned with the previous page; resumes after it
+            snapshot_id: Snapshot the scores belong to (see page_snapshot)
+
+        Returns:
+            Tuple of (rows, next_cursor); next_cursor is None on the last page
+        """
+        priority = scores['priority_score']
+
+        candidates = np.arange(len(priority))
+        if cursor is not None:
+            last_score, last_id, last_row, _ = decode_cursor(cursor)
+            tied = [i for i in np.flatnonzero(priority == last_score).tolist()
+                    if (id_keys[i], i) > (last_id, last_row)]
+            candidates = np.concatenate([np.flatnonzero(priority < last_score),
+                                         np.array(tied, dtype=np.intp)])
+
+        if top_k is not None and top_k < len(candidates):
+            if top_k <= 0:
+                return [], None
+            # Everything tied with the k-th best score competes on id
+            kth_best = -np.partition(-priority[candidates], top_k - 1)[top_k - 1]
+            candidates = candidates[priority[candidates] >= kth_best]
+            has_more = True
+        else:
+            has_more = False
+
+        rows = sorted(candidates.tolist(), key=lambda i: (-priority[i], id_keys[i], i))
+        if top_k is not None:
+            has_more = has_more or len(rows) > top_k
+            rows = rows[:top_k]
+
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor(priority[last], id_keys[last], last, snapshot_id)
+        return rows, next_cursor
+
+    def materialize(self, documents: List[Dict], scores: Dict[str, np.ndarray],
+                    rows=None, extra_fields: Optional[Dict] = None) -> List[Dict]:
+        """
+        Build batch_score_documents result dicts for the given rows
+
+        documents are the scored documents (e.g. DocumentColumns.documents);
+        extra_fields maps additional document keys to their defaults.
+        """
+        if rows is None:
+            rows = range(len(documents))
+
+        priority = scores['priority_score'].tolist()
+        labels = scores['priority_label']
+        breakdown_keys = ('authority_score', 'doc_type_score', 'urgency_score',
+                          'role_relevance', 'content_relevance', 'tfidf', 'bm25', 'bert')
+        breakdown_values = {key: scores[key].tolist() for key in breakdown_keys}
+
+        results = []
+        for i in rows:
+            doc = documents[i]
+            results.append({
+                'document_id': doc.get('id'),
+                'title': doc.get('title'),
+                'source_department': doc.get('source_department'),
+                'document_type': doc.get('document_type'),
+                'deadline': doc.get('deadline'),
+                **{key: doc.get(key, default) for key, default in (extra_fields or {}).items()},
+                'priority_score': round(priority[i], 4),
+                'breakdown': {key: round(breakdown_values[key][i], 3) for key in breakdown_keys},
+                'priority_label': labels[i]
+            })
+        return results
+
+
+class ScoringSession:
+    """
+    Precompiled scoring state for one user profile
+
+    Holds the user's department relevance row, tag column and the derived
+    query terms, so repeated batch calls only evaluate array expressions.
+    A session with a query scores every document against it; without one,
+    each document's 'user_query' (default: the department) is used.
+    """
+
+    def __init__(self, scorer: BatchPriorityScorer, user_department: str,
+                 user_role: Optional[str] = None, query: Optional[str] = None):
+        self.scorer = scorer
+        self.user_department = user_department
+        self.user_role = user_role
+        self.query = query
+
+        self.user_row = scorer.user_index.get(user_department, len(scorer.user_index))
+        self.user_col = scorer.department_index.get(user_department)
+        self.relevance_row = scorer.relevance_matrix[self.user_row]
+        if query is not None:
+            self.query_terms = BM25Index.tokenize(query)
+            self.query_words = set(self.query_terms)
+
+    def _relevance_row(self, width: int) -> np.ndarray:
+        if width > len(self.relevance_row):
+            # Departments first seen after the session was compiled
+            self.relevance_row = self.scorer.relevance_matrix[self.user_row]
+        return self.relevance_row[:width]
+
+    def role_relevance(self, columns: DocumentColumns) -> np.ndarray:
+        """Role relevance of every document for this user department"""
+        tag_matrix = columns.tag_matrix
+        n_docs, width = tag_matrix.shape
+        relevance_row = self._relevance_row(width)
+
+        # Best cross-department relevance over the tagged departments
+        masked = np.where(tag_matrix, relevance_row, -np.inf)
+        best = masked.max(axis=1) if width else np.full(n_docs, -np.inf)
+        relevance = np.where(np.isfinite(best), best, 0.3)
+
+        user_col = self.user_col
+        if user_col is None:
+            # The user's department may get a tag column after the session was compiled
+            user_col = self.user_col = self.scorer.department_index.get(self.user_department)
+        if user_col is not None and user_col < width:
+            relevance = np.where(tag_matrix[:, user_col], 1.0, relevance)
+        return relevance
+
+    def content_relevance(self, columns: DocumentColumns) -> Dict[str, np.ndarray]:
+        """TF-IDF, BM25 and simulated BERT scores for every document"""
+        n_docs = len(columns)
+        bm25 = np.zeros(n_docs)
+        jaccard = np.zeros(n_docs)
+
+        # Same draw order as the per-document path: one per document
+        noise = np.random.uniform(0.3, 0.9, size=n_docs)
+
+        if self.query is not None:
+            groups = {self.query: (self.query_terms, self.query_words, np.arange(n_docs))}
+        else:
+            by_query = {}
+            for i, query in enumerate(columns.queries):
+                by_query.setdefault(self.user_department if query is None else query, []).append(i)
+            groups = {}
+            for query, rows in by_query.items():
+                query_terms = BM25Index.tokenize(query)
+                groups[query] = (query_terms, set(query_terms), np.array(rows, dtype=np.intp))
+
+        for query, (query_terms, query_words, rows) in groups.items():
+            bm25[rows], jaccard[rows] = self.scorer.query_scores(columns, query, query_terms, query_words, rows)
+
+        return content_scores(bm25, jaccard, noise)
+
+    def score(self, columns: DocumentColumns, as_of=None) -> Dict[str, np.ndarray]:
+        """
+        Score every document in the batch for this profile
+
+        Args:
+            columns: Columnarized batch
+            as_of: Optional date or datetime to compute deadline urgency at
+
+        Returns:
+            Dictionary of score arrays, one entry per document
+        """
+        scorer = self.scorer
+        timer = scorer.metrics.timer
+        with timer('scoring.document_weights'):
+            authority = scorer.authority_table[columns.source_codes]
+            doc_type = scorer.doc_type_table[columns.doc_type_codes]
+            urgency = scorer.urgency(columns, as_of)
+        with timer('scoring.role_relevance'):
+            role_relevance = self.role_relevance(columns)
+        with timer('scoring.content'):
+            content = self.content_relevance(columns)
+        with timer('scoring.weighting'):
+            priority = weighted_priority(authority, doc_type, urgency, role_relevance,
+                                         content['content_relevance'])
+            labels = priority_labels(priority)
+
+        return {
+            'priority_score': priority,
+            'priority_label': labels,
+            'authority_score': authority,
+            'doc_type_score': doc_type,
+            'urgency_score': urgency,
+            'role_relevance': role_relevance,
+            **content
+        }
+
+    def score_documents(self, documents: List[Dict], as_of=None):
+        """Columnarize and score a document list; returns (columns, scores)"""
+        columns = self.scorer.columnarize(documents)
+        return columns, self.score(columns, as_of)
+
+    def page_scores(self, documents: List[Dict], cursor: Optional[str] = None, as_of=None):
+        """(scores, id_keys, snapshot_id) to rank one page from (see BatchPriorityScorer.page_snapshot)"""
+        return self.scorer.page_snapshot(self, documents, as_of, cursor)
+
+    def score_document(self, document: Dict, as_of=None) -> Dict:
+        """Score one document (same result layout as calculate_priority_score)"""
+        columns, scores = self.score_documents([document], as_of)
+        result = self.scorer.materialize(columns.documents, scores)[0]
+        return {key: result[key] for key in ('priority_score', 'breakdown', 'priority_label')}
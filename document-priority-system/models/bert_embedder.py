@@ -2,9 +2,19 @@
 BERT Embedder Module
 """
 
+import os
 import numpy as np
-from typing import List, Dict
+from collections import OrderedDict
+from typing import List, Dict, Optional
 import json
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from models.embedding_cache import EmbeddingCache
+from models.vector_index import VectorIndex, create_vector_index
+from models.clustering import MiniBatchKMeans
+from models.keyword_matcher import KeywordMatcher
+from models.instrumentation import Metrics, METRICS
 
 class BERTEmbedder:
     """
@@ -12,11 +22,19 @@ class BERTEmbedder:
     In production, replace with actual sentence-transformers
     """
     
-    def __init__(self, model_name='bert-base-uncased'):
+    def __init__(self, model_name='bert-base-uncased', cache_size: int = 4096,
+                 cache_dir: Optional[str] = None, seed: int = 42,
+                 keyword_matcher: Optional[KeywordMatcher] = None, embedding_dim: int = 768,
+                 metrics: Optional[Metrics] = None):
         self.model_name = model_name
-        self.embedding_dim = 768  # Standard BERT embedding dimension
+        self.metrics = metrics if metrics is not None else METRICS
+        self.embedding_dim = embedding_dim  # Standard BERT embedding dimension by default
         self.is_loaded = False
         
+        # Embeddings are cached by content hash (memory LRU + optional disk store)
+        self.cache = EmbeddingCache(model_name, self.embedding_dim,
+                                    max_entries=cache_size, cache_dir=cache_dir)
+        
         # Domain-specific keywords for KMRL
         self.domain_keywords = {
             'safety': ['safety', 'emergency', 'incident', 'accident', 'hazard', 'risk', 'critical'],
@@ -27,6 +45,25 @@ class BERTEmbedder:
             'financial': ['budget', 'payment', 'invoice', 'procurement', 'expenditure', 'financial']
         }
         
+        # Domain direction matrix (domains x embedding_dim), drawn once from a
+        # private generator so the global NumPy RNG is never touched
+        self.seed = seed
+        self.domain_names = list(self.domain_keywords)
+        self.domain_matrix = np.random.default_rng(seed).standard_normal(
+            (len(self.domain_names), self.embedding_dim)
+        )
+        
+        # Domain keywords join the (possibly shared) keyword automaton
+        self.keyword_matcher = keyword_matcher if keyword_matcher is not None else KeywordMatcher()
+        self.keyword_matcher.add_groups(self.domain_keywords, 'domain')
+        self._domain_categories = [('domain', domain) for domain in self.domain_names]
+        
+        # Base vectors are seeded by text length; an LRU keeps the recently used ones
+        self._base_vectors = OrderedDict()
+        self._base_cache_size = 2048
+        
+        self.cluster_model = None
+        
         print(f"[BERT] Initializing {model_name} embedder...")
         self._load_model()
     
@@ -50,41 +87,97 @@ class BERTEmbedder:
         if not self.is_loaded:
             raise RuntimeError("Model not loaded")
         
-        # Simulate embedding generation
-        # In reality, BERT creates contextual embeddings
-        # For demo, we create deterministic embeddings based on content
+        with self.metrics.timer('embed.encode'):
+            embedding = self.cache.get(text)
+            if embedding is None:
+                self.metrics.inc('embedding_cache_misses')
+                embedding = self.cache.put(text, self._compute_batch([text])[0])
+            else:
+                self.metrics.inc('embedding_cache_hits')
+        self.metrics.inc('texts_embedded')
         
-        text_lower = text.lower()
+        return embedding
+    
+    def keyword_counts(self, texts: List[str]) -> np.ndarray:
+        """
+        Count distinct domain keywords present in each text
         
-        # Create base random embedding (deterministic by text length)
-        np.random.seed(len(text) % 10000)
-        base_embedding = np.random.randn(self.embedding_dim)
+        Each text is scanned once by the keyword automaton, whatever the
+        number of keywords.
         
-        # Modify embedding based on domain keywords
-        for domain, keywords in self.domain_keywords.items():
-            keyword_count = sum(1 for kw in keywords if kw in text_lower)
-            if keyword_count > 0:
-                # Shift embedding in domain-specific direction
-                domain_seed = hash(domain) % 10000
-                np.random.seed(domain_seed)
-                domain_vector = np.random.randn(self.embedding_dim)
-                base_embedding += domain_vector * (keyword_count * 0.1)
+        Returns:
+            Array of shape (len(texts), n_domains)
+        """
+        counts = np.zeros((len(texts), len(self.domain_names)))
+        for i, found in enumerate(self.keyword_matcher.find_batch(texts)):
+            for domain_idx, category in enumerate(self._domain_categories):
+                counts[i, domain_idx] = len(found.get(category, ()))
+        return counts
+    
+    def _base_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Deterministic base vectors seeded by text length (private generators)"""
+        base = np.empty((len(texts), self.embedding_dim))
+        for i, text in enumerate(texts):
+            length = len(text) % 10000
+            vector = self._base_vectors.get(length)
+            if vector is not None:
+                self._base_vectors.move_to_end(length)
+            else:
+                vector = np.random.default_rng(length).standard_normal(self.embedding_dim)
+                self._base_vectors[length] = vector
+                if len(self._base_vectors) > self._base_cache_size:
+                    self._base_vectors.popitem(last=False)
+            base[i] = vector
+        return base
+    
+    def _compute_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Compute embeddings for a batch without consulting the cache
         
-        # Normalize
-        embedding = base_embedding / np.linalg.norm(base_embedding)
+        Simulates BERT: a deterministic base vector shifted along the
+        domain directions by keyword counts, i.e. one
+        (batch x domains) @ (domains x embedding_dim) product.
+        """
+        embeddings = self._base_embeddings(texts)
+        embeddings += (self.keyword_counts(texts) * 0.1) @ self.domain_matrix
         
-        return embedding
+        # Normalize rows
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings
     
     def encode_batch(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         """Generate embeddings for multiple texts"""
-        embeddings = []
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded")
+        
+        metrics = self.metrics
+        embeddings = np.empty((len(texts), self.embedding_dim))
+        missing = {}
+        with metrics.timer('embed.cache_lookup'):
+            for i, text in enumerate(texts):
+                cached = self.cache.get(text)
+                if cached is None:
+                    missing.setdefault(text, []).append(i)
+                else:
+                    embeddings[i] = cached
+        n_missing = sum(len(rows) for rows in missing.values())
+        metrics.inc('embedding_cache_hits', len(texts) - n_missing)
+        metrics.inc('embedding_cache_misses', n_missing)
+        metrics.inc('texts_embedded', len(texts))
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_embeddings = [self.encode(text) for text in batch]
-            embeddings.extend(batch_embeddings)
+        # Compute each unique uncached text once, batch_size texts at a time
+        missing_texts = list(missing)
+        with metrics.timer('embed.compute'):
+            for start in range(0, len(missing_texts), batch_size):
+                batch = missing_texts[start:start + batch_size]
+                for text, embedding in zip(batch, self._compute_batch(batch)):
+                    embeddings[missing[text]] = self.cache.put(text, embedding)
         
-        return np.array(embeddings)
+        return embeddings
+    
+    def cosine_similarity(self, emb1: np.ndarray, emb2: np.ndarray) -> float:
+        """Cosine similarity between two embeddings"""
+        return float(np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2)))
     
     def similarity(self, text1: str, text2: str) -> float:
         """Calculate cosine similarity between two texts"""
@@ -96,112 +189,371 @@ class BERTEmbedder:
         
         return float(similarity)
     
+    def document_text(self, doc: Dict) -> str:
+        """Text embedded for a document (title and content)"""
+        return f"{doc.get('title', '')} {doc.get('content', '')}"
+    
+    def build_index(self, documents: List[Dict], kind: str = 'exact', **index_params) -> VectorIndex:
+        """
+        Build a retrieval index over document embeddings
+        
+        Index ids are positions in the documents list. kind is 'exact' or
+        'ivf' (approximate; index_params such as n_lists and n_probe tune
+        recall against latency).
+        """
+        doc_embeddings = self.encode_batch([self.document_text(doc) for doc in documents])
+        index = create_vector_index(kind, self.embedding_dim, **index_params)
+        index.add(doc_embeddings)
+        return index
+    
     def get_relevant_documents(self, query: str, documents: List[Dict], 
-                              top_k: int = 5, threshold: float = 0.5) -> List[Dict]:
+                              top_k: int = 5, threshold: float = 0.5,
+                              index: Optional[VectorIndex] = None,
+                              id_field: Optional[str] = None) -> List[Dict]:
         """
         Find most relevant documents for a query using semantic similarity
-        """
-        
-        query_embedding = self.encode(query)
         
-        results = []
-        for doc in documents:
-            # Create document text from title and content
-            doc_text = f"{doc.get('title', '')} {doc.get('content', '')}"
-            doc_embedding = self.encode(doc_text)
-            
-            # Calculate similarity
-            similarity = np.dot(query_embedding, doc_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding)
-            )
-            
-            if similarity >= threshold:
-                results.append({
-                    'document': doc,
-                    'similarity_score': float(similarity)
-                })
+        Pass an index to reuse it across queries; otherwise an exact index is
+        built for this call. By default index ids are positions in documents,
+        as with build_index(documents). For an index keyed by a document
+        field (e.g. ScoringEngine.vector_index, keyed by 'id'), pass that
+        field as id_field; hits that are not in documents are skipped.
+        """
+        if index is None:
+            index = self.build_index(documents)
+        elif id_field is None and len(index) != len(documents):
+            raise ValueError(f"Index of {len(index)} vectors is not positional over {len(documents)} "
+                             f"documents; pass id_field for an index keyed by document ids")
         
-        # Sort by similarity
-        results.sort(key=lambda x: x['similarity_score'], reverse=True)
+        # One matrix-vector product + argpartition for the exact top-k
+        keys, scores = index.search(self.encode(query), top_k)
+        if id_field is None:
+            by_key = documents
+        else:
+            by_key = {doc.get(id_field): doc for doc in documents}
         
-        return results[:top_k]
+        return [
+            {'document': by_key[key], 'similarity_score': float(score)}
+            for key, score in zip(keys, scores)
+            if score >= threshold and (id_field is None or key in by_key)
+        ]
     
     def create_document_clusters(self, documents: List[Dict], n_clusters: int = 5) -> Dict:
         """
-        Group similar documents together (simplified clustering)
-        In production, use actual clustering algorithms
-        """
-        
-        # Generate embeddings for all documents
-        doc_embeddings = []
-        for doc in documents:
-            doc_text = f"{doc.get('title', '')} {doc.get('content', '')}"
-            embedding = self.encode(doc_text)
-            doc_embeddings.append(embedding)
+        Group similar documents together with mini-batch k-means
         
-        doc_embeddings = np.array(doc_embeddings)
+        The fitted model is kept as self.cluster_model so new documents can
+        be assigned with assign_clusters without re-clustering the archive.
+        """
+        clusters = {i: [] for i in range(n_clusters)}
+        if not documents:
+            return clusters
         
-        # Simple K-means-like clustering (simulated)
-        # In production, use sklearn.cluster.KMeans
-        np.random.seed(42)
-        cluster_centers = np.random.randn(n_clusters, self.embedding_dim)
+        # Generate embeddings for all documents (cached after first use)
+        doc_embeddings = self.encode_batch([self.document_text(doc) for doc in documents])
         
-        clusters = {i: [] for i in range(n_clusters)}
+        self.cluster_model = MiniBatchKMeans(
+            n_clusters=min(n_clusters, len(documents)), seed=self.seed
+        ).fit(doc_embeddings)
         
-        for idx, emb in enumerate(doc_embeddings):
-            # Assign to nearest cluster
-            distances = [np.linalg.norm(emb - center) for center in cluster_centers]
-            cluster_id = np.argmin(distances)
-            clusters[cluster_id].append(documents[idx])
+        for doc, cluster_id in zip(documents, self.cluster_model.predict(doc_embeddings)):
+            clusters[int(cluster_id)].append(doc)
         
         return clusters
     
+    def assign_clusters(self, documents: List[Dict], model: Optional[MiniBatchKMeans] = None) -> List[int]:
+        """Assign documents to the centroids of a fitted clustering model"""
+        model = model if model is not None else self.cluster_model
+        if model is None:
+            raise RuntimeError("No clustering model; call create_document_clusters first")
+        doc_embeddings = self.encode_batch([self.document_text(doc) for doc in documents])
+        return model.predict(doc_embeddings).tolist()
+    
     def get_model_info(self) -> Dict:
         """Return model information"""
         return {
             'model_name': self.model_name,
             'embedding_dimension': self.embedding_dim,
             'is_loaded': self.is_loaded,
-            'type': 'Simulated BERT (Demo Mode)'
+            'type': 'Simulated BERT (Demo Mode)',
+            'cache': self.cache.stats()
         }
 
 
-class ProductionBERTEmbedder:
+def plan_batches(sorted_lengths: np.ndarray, token_budget: int, max_batch_size: int):
     """
-    Template for production BERT implementation
-    Uncomment and install required packages for actual use
+    Split length-sorted (longest first) sequences into padded batches
+
+    Each batch is padded to its first (longest) sequence, so a batch of
+    size n costs n * that length tokens; batches grow until the next
+    sequence would exceed token_budget or max_batch_size.
+
+    Yields:
+        (start, stop) positions into sorted_lengths
+    """
+    start, n = 0, len(sorted_lengths)
+    while start < n:
+        width = max(int(sorted_lengths[start]), 1)
+        size = max(1, min(max_batch_size, token_budget // width))
+        stop = min(n, start + size)
+        yield start, stop
+        start = stop
+
+
+def _import_sentence_transformers():
+    """Import torch and sentence-transformers on demand (optional dependencies)"""
+    # Never reach out to the model hub: models are loaded from local paths only
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+    try:
+        import torch
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError("ProductionBERTEmbedder requires torch and sentence-transformers "
+                          "(see the optional entries in requirements.txt)") from e
+    return torch, SentenceTransformer
+
+
+class ProductionBERTEmbedder(BERTEmbedder):
+    """
+    Real sentence-transformers embeddings behind the BERTEmbedder interface
+
+    The model is loaded from a local directory on CPU (no downloads) and
+    caching, retrieval and clustering are inherited from BERTEmbedder.
+
+    Texts are tokenized once; inputs longer than the model's sequence limit
+    are split into overlapping token windows whose embeddings are averaged
+    (weighted by window length) instead of being truncated. All windows of
+    a call are sorted by length and packed into batches under a padded
+    token budget, so short texts are not padded to the longest one; results
+    are scattered back to input order.
     """
     
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
+    def __init__(self, model_path: str, num_threads: Optional[int] = None,
+                 token_budget: int = 16384, max_batch_size: int = 64,
+                 max_seq_length: Optional[int] = None, chunk_overlap: int = 32,
+                 cache_size: int = 4096, cache_dir: Optional[str] = None,
+                 keyword_matcher: Optional[KeywordMatcher] = None, metrics: Optional[Metrics] = None):
         """
-        # Production implementation:
+        Args:
+            model_path: Local sentence-transformers model directory
+            num_threads: torch intra-op CPU threads (process-wide; None keeps torch's default)
+            token_budget: Maximum padded tokens per forward pass
+            max_batch_size: Maximum sequences per forward pass
+            max_seq_length: Tokens per window including special tokens (default: the model's limit)
+            chunk_overlap: Tokens shared by consecutive windows of a long text
+        """
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"No local sentence-transformers model at {model_path}")
         
-        from sentence_transformers import SentenceTransformer
-        self.model = SentenceTransformer(model_name)
-        self.model_name = model_name
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        
+        self._torch, SentenceTransformer = _import_sentence_transformers()
+        if num_threads:
+            self._torch.set_num_threads(num_threads)
+        self.model = SentenceTransformer(model_path, device='cpu')
+        self.model.eval()
+        self.tokenizer = self.model.tokenizer
+        
+        if max_seq_length:
+            self.model.max_seq_length = max_seq_length
+        self.max_seq_length = self.model.max_seq_length
+        self.window = self.max_seq_length - self.tokenizer.num_special_tokens_to_add(pair=False)
+        self.chunk_overlap = min(chunk_overlap, self.window // 2)
+        
+        # Padding efficiency counters: real tokens vs padded tokens processed
+        self.real_tokens = 0
+        self.padded_tokens = 0
+        
+        super().__init__(model_name=os.path.basename(os.path.normpath(model_path)),
+                         cache_size=cache_size, cache_dir=cache_dir, keyword_matcher=keyword_matcher,
+                         embedding_dim=self.model.get_sentence_embedding_dimension(), metrics=metrics)
+    
+    def _load_model(self):
+        """The model is loaded in __init__; report it"""
+        print(f"[BERT] Loaded sentence-transformers model from {self.model_path}")
+        print(f"[BERT] Embedding dimension: {self.embedding_dim} | max sequence length: {self.max_seq_length}")
+        print(f"[BERT] CPU threads: {self._torch.get_num_threads()}")
+        self.is_loaded = True
+    
+    def _windows(self, token_ids: List[int]) -> List[List[int]]:
+        """Overlapping windows covering a token sequence"""
+        if len(token_ids) <= self.window:
+            return [token_ids]
+        stride = self.window - self.chunk_overlap
+        starts = range(0, len(token_ids) - self.chunk_overlap, stride)
+        return [token_ids[start:start + self.window] for start in starts]
+    
+    def _embed_sequences(self, sequences: List[List[int]]) -> np.ndarray:
+        """Embed token sequences (with special tokens) in length-bucketed batches"""
+        lengths = np.array([len(seq) for seq in sequences])
+        order = np.argsort(-lengths, kind='stable')
+        embeddings = np.empty((len(sequences), self.embedding_dim), dtype=np.float32)
+        
+        for start, stop in plan_batches(lengths[order], self.token_budget, self.max_batch_size):
+            rows = order[start:stop]
+            features = self.tokenizer.pad({'input_ids': [sequences[row] for row in rows]},
+                                          padding=True, return_tensors='pt')
+            with self._torch.inference_mode():
+                output = self.model(dict(features))['sentence_embedding']
+            embeddings[rows] = output.float().cpu().numpy()
+            
+            self.real_tokens += int(lengths[rows].sum())
+            self.padded_tokens += int(lengths[rows[0]]) * len(rows)
+        
+        return embeddings
+    
+    def _compute_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts with the model, mean-pooling the windows of long texts
         """
-        pass
+        token_ids = self.tokenizer(texts, add_special_tokens=False, truncation=False,
+                                   verbose=False)['input_ids']
+        
+        sequences, owners, weights = [], [], []
+        for i, ids in enumerate(token_ids):
+            for window in self._windows(ids):
+                sequences.append(self.tokenizer.build_inputs_with_special_tokens(window))
+                owners.append(i)
+                weights.append(max(len(window), 1))
+        
+        window_embeddings = self._embed_sequences(sequences)
+        weights = np.array(weights, dtype=np.float64)
+        
+        embeddings = np.zeros((len(texts), self.embedding_dim))
+        np.add.at(embeddings, owners, window_embeddings * weights[:, None])
+        
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.where(norms > 0, norms, 1.0)
     
-    def encode(self, text):
+    def encode_batch(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
         """
-        # Production implementation:
+        Generate embeddings for multiple texts
         
-        return self.model.encode(text, convert_to_numpy=True)
+        All uncached texts are embedded in one call so they are bucketed
+        together; forward-pass sizes follow token_budget and max_batch_size.
         """
-        pass
+        return super().encode_batch(texts, batch_size=max(len(texts), 1))
     
-    def encode_batch(self, texts, batch_size=32):
+    def get_model_info(self) -> Dict:
+        """Return model information"""
+        info = super().get_model_info()
+        info.update({
+            'type': 'sentence-transformers (local, CPU)',
+            'model_path': self.model_path,
+            'max_seq_length': self.max_seq_length,
+            'token_budget': self.token_budget,
+            'cpu_threads': self._torch.get_num_threads(),
+            'padding_efficiency': round(self.real_tokens / self.padded_tokens, 4) if self.padded_tokens else None
+        })
+        return info
+
+
+class HashingEmbedder(BERTEmbedder):
+    """
+    Model-free embeddings from hashed n-grams and a sparse random projection
+
+    Word and character n-gram counts are hashed into fixed feature spaces
+    (no vocabulary to fit or store), log-scaled and L2-normalized per block,
+    then projected to embedding_dim through a fixed sparse random matrix
+    with nonzeros_per_feature entries of +-1/sqrt(k) per feature row. Random
+    projection approximately preserves cosine similarity, so texts sharing
+    words or spellings land close together, whatever their length. A batch
+    is two hashing passes and one sparse matrix product; there are no model
+    files and torch is not needed.
+    """
+    
+    def __init__(self, embedding_dim: int = 384, n_features: int = 2 ** 18,
+                 word_ngram_range=(1, 2), char_ngram_range=(3, 5), char_weight: float = 0.5,
+                 nonzeros_per_feature: int = 4, seed: int = 42, cache_size: int = 4096,
+                 cache_dir: Optional[str] = None, keyword_matcher: Optional[KeywordMatcher] = None,
+                 metrics: Optional[Metrics] = None):
         """
-        # Production implementation:
-        
-        return self.model.encode(
-            texts, 
-            batch_size=batch_size,
-            show_progress_bar=True,
-            convert_to_numpy=True
-        )
+        Args:
+            embedding_dim: Output dimension
+            n_features: Hashed features per block (word and character)
+            word_ngram_range: Word n-gram sizes
+            char_ngram_range: Character n-gram sizes (within word boundaries)
+            char_weight: Weight of the character block relative to the word block
+            nonzeros_per_feature: Projection entries per hashed feature
+            seed: Projection matrix seed
         """
-        pass
+        self.n_features = n_features
+        self.char_weight = char_weight
+        self.nonzeros_per_feature = nonzeros_per_feature
+        
+        self.word_hasher = HashingVectorizer(n_features=n_features, ngram_range=word_ngram_range,
+                                             alternate_sign=False, norm=None, dtype=np.float32)
+        self.char_hasher = HashingVectorizer(n_features=n_features, analyzer='char_wb',
+                                             ngram_range=char_ngram_range,
+                                             alternate_sign=False, norm=None, dtype=np.float32)
+        self.projection = self._projection_matrix(2 * n_features, embedding_dim, nonzeros_per_feature, seed)
+        
+        model_name = (f"hashing-w{word_ngram_range[0]}{word_ngram_range[1]}"
+                      f"-c{char_ngram_range[0]}{char_ngram_range[1]}-cw{char_weight}"
+                      f"-f{n_features}-k{nonzeros_per_feature}-s{seed}")
+        super().__init__(model_name=model_name, cache_size=cache_size, cache_dir=cache_dir,
+                         seed=seed, keyword_matcher=keyword_matcher, embedding_dim=embedding_dim,
+                         metrics=metrics)
+    
+    @staticmethod
+    def _projection_matrix(n_features: int, dim: int, k: int, seed: int) -> sp.csr_matrix:
+        """Sparse (n_features x dim) matrix with k random +-1/sqrt(k) entries per row"""
+        rng = np.random.default_rng(seed)
+        cols = rng.integers(0, dim, size=n_features * k)
+        signs = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=n_features * k) / np.sqrt(k)
+        indptr = np.arange(0, n_features * k + 1, k)
+        matrix = sp.csr_matrix((signs.astype(np.float32), cols, indptr), shape=(n_features, dim))
+        matrix.sum_duplicates()
+        return matrix
+    
+    def _load_model(self):
+        """Nothing to load: the projection is generated from the seed"""
+        print(f"[BERT] Hashing embedder: {2 * self.n_features} hashed features -> {self.embedding_dim} dims")
+        self.is_loaded = True
+    
+    def _features(self, texts: List[str]) -> sp.csr_matrix:
+        """Log-scaled, block-normalized word and character n-gram features"""
+        blocks = []
+        for hasher, weight in ((self.word_hasher, 1.0), (self.char_hasher, self.char_weight)):
+            counts = hasher.transform(texts)
+            np.log1p(counts.data, out=counts.data)
+            blocks.append(normalize(counts, copy=False) * weight)
+        return sp.hstack(blocks, format='csr')
+    
+    def _compute_batch(self, texts: List[str]) -> np.ndarray:
+        """Project the hashed features of a batch in one sparse product"""
+        embeddings = (self._features(texts) @ self.projection).toarray().astype(np.float64)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.where(norms > 0, norms, 1.0)
+    
+    def encode_batch(self, texts: List[str], batch_size: int = 1024) -> np.ndarray:
+        """Generate embeddings for multiple texts (batch_size texts per sparse product)"""
+        return super().encode_batch(texts, batch_size=batch_size)
+    
+    def get_model_info(self) -> Dict:
+        """Return model information"""
+        info = super().get_model_info()
+        info.update({
+            'type': 'Hashed n-grams + sparse random projection',
+            'hashed_features': 2 * self.n_features,
+            'projection_nonzeros': int(self.projection.nnz)
+        })
+        return info
+
+
+def create_embedder(kind: str = 'simulated', **kwargs) -> BERTEmbedder:
+    """Factory for the scoring engine: 'simulated', 'hashing' or 'production'"""
+    if kind == 'simulated':
+        return BERTEmbedder(**kwargs)
+    if kind == 'hashing':
+        return HashingEmbedder(**kwargs)
+    if kind == 'production':
+        return ProductionBERTEmbedder(**kwargs)
+    raise ValueError(f"Unknown embedder type: {kind}")
 
 
 # Example usage
@@ -0,0 +1,269 @@
+"""
+BM25 Inverted Index
+Corpus-level Okapi BM25 with postings lists and true document statistics
+"""
+
+import math
+import bisect
+import numpy as np
+from collections import Counter
+from typing import List, Dict, Optional, Iterable
+
+
+class BM25Index:
+    """
+    Inverted index for BM25 ranking
+
+    Postings store (document number, term frequency) pairs per term, so
+    scoring a query only touches documents that contain its terms. Document
+    frequencies and the average document length come from the indexed corpus.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self._postings = {}         # term -> ([doc numbers], [term frequencies])
+        self._doc_lengths = []
+        self._total_length = 0
+        self._retired = set()       # numbers of removed documents
+        self._keys = {}             # external document key -> doc number
+
+        # Array views of postings, rebuilt lazily after documents are added
+        self._compiled = {}
+        self._lengths_array = None
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Lowercase whitespace tokenization (matches the legacy scorer)"""
+        return text.lower().split() if text else []
+
+    def __len__(self):
+        return len(self._doc_lengths) - len(self._retired)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    @property
+    def n_retired(self) -> int:
+        """Document numbers held by removed documents until compact()"""
+        return len(self._retired)
+
+    def doc_number(self, key) -> Optional[int]:
+        """Return the internal document number for a key, or None"""
+        return self._keys.get(key)
+
+    def doc_length(self, doc_number: int) -> int:
+        """Indexed length of a document number (0 once removed)"""
+        return self._doc_lengths[doc_number]
+
+    @property
+    def avg_doc_length(self) -> float:
+        """Average document length over the indexed corpus"""
+        return self._total_length / len(self) if len(self) else 0.0
+
+    def document_frequency(self, term: str) -> int:
+        """Number of indexed documents containing the term"""
+        posting = self._postings.get(term)
+        return len(posting[0]) if posting else 0
+
+    def add_tokens(self, tokens: Iterable[str], key=None) -> int:
+        """
+        Index a pre-tokenized document
+
+        Args:
+            tokens: Document terms
+            key: Optional external key (e.g. document id)
+
+        Returns:
+            Internal document number
+        """
+        counts = tokens if isinstance(tokens, Counter) else Counter(tokens)
+        doc_number = len(self._doc_lengths)
+        doc_length = sum(counts.values())
+
+        for term, freq in counts.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = ([], [])
+            posting[0].append(doc_number)
+            posting[1].append(freq)
+            self._compiled.pop(term, None)
+
+        self._doc_lengths.append(doc_length)
+        self._total_length += doc_length
+        self._lengths_array = None
+
+        if key is not None:
+            self._keys[key] = doc_number
+        return doc_number
+
+    def remove(self, key, tokens: Optional[Iterable[str]] = None) -> bool:
+        """
+        Remove a keyed document from the index
+
+        Its document number is retired (never reused), so numbers held by
+        callers for other documents stay valid.
+
+        Args:
+            key: Document key
+            tokens: The document's indexed terms, if known (avoids a vocabulary scan)
+
+        Returns:
+            True if the key was indexed
+        """
+        doc_number = self._keys.pop(key, None)
+        if doc_number is None:
+            return False
+
+        terms = set(tokens) if tokens is not None else list(self._postings)
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            doc_numbers, freqs = posting
+            pos = bisect.bisect_left(doc_numbers, doc_number)
+            if pos < len(doc_numbers) and doc_numbers[pos] == doc_number:
+                del doc_numbers[pos]
+                del freqs[pos]
+                self._compiled.pop(term, None)
+                if not doc_numbers:
+                    del self._postings[term]
+
+        self._total_length -= self._doc_lengths[doc_number]
+        self._doc_lengths[doc_number] = 0
+        self._retired.add(doc_number)
+        self._lengths_array = None
+        return True
+
+    def compact(self) -> None:
+        """
+        Renumber live documents consecutively, releasing retired numbers
+
+        Scores are unchanged, but document numbers held by callers become
+        invalid; look them up again with doc_number().
+        """
+        if not self._retired:
+            return
+        live = np.ones(len(self._doc_lengths), dtype=bool)
+        live[list(self._retired)] = False
+        renumber = (np.cumsum(live) - 1).tolist()
+
+        for doc_numbers, _ in self._postings.values():
+            doc_numbers[:] = [renumber[number] for number in doc_numbers]
+        self._doc_lengths = [length for length, keep in zip(self._doc_lengths, live) if keep]
+        self._keys = {key: renumber[number] for key, number in self._keys.items()}
+        self._retired = set()
+        self._compiled = {}
+        self._lengths_array = None
+
+    def add_document(self, text: str, key=None) -> int:
+        """Tokenize and index a single document"""
+        return self.add_tokens(self.tokenize(text), key=key)
+
+    def add_documents(self, texts: List[str], keys: Optional[List] = None) -> List[int]:
+        """Index a list of documents"""
+        keys = keys if keys is not None else [None] * len(texts)
+        return [self.add_document(text, key) for text, key in zip(texts, keys)]
+
+    def idf(self, term: str, n_docs: Optional[int] = None, doc_freq: Optional[int] = None) -> float:
+        """BM25 inverse document frequency (non-negative variant)"""
+        n_docs = len(self) if n_docs is None else n_docs
+        doc_freq = self.document_frequency(term) if doc_freq is None else doc_freq
+        return math.log((n_docs - doc_freq + 0.5) / (doc_freq + 0.5) + 1)
+
+    def _posting_arrays(self, term):
+        """Return (doc numbers, term frequencies) arrays for a term"""
+        arrays = self._compiled.get(term)
+        if arrays is None:
+            doc_numbers, freqs = self._postings[term]
+            arrays = self._compiled[term] = (
+                np.array(doc_numbers, dtype=np.intp),
+                np.array(freqs, dtype=np.float64)
+            )
+        return arrays
+
+    def _length_array(self):
+        if self._lengths_array is None:
+            self._lengths_array = np.array(self._doc_lengths, dtype=np.float64)
+        return self._lengths_array
+
+    def _term_contributions(self, query: str):
+        """Yield (document numbers, BM25 contributions) per query term"""
+        k1, b = self.k1, self.b
+        avg_doc_length = self.avg_doc_length or 1.0
+        doc_lengths = self._length_array()
+
+        for term in self.tokenize(query):
+            if term not in self._postings:
+                continue
+            doc_numbers, term_freq = self._posting_arrays(term)
+            idf = self.idf(term, doc_freq=len(doc_numbers))
+            numerator = term_freq * (k1 + 1)
+            denominator = term_freq + k1 * (1 - b + b * (doc_lengths[doc_numbers] / avg_doc_length))
+            yield doc_numbers, idf * (numerator / denominator)
+
+    def score(self, query: str) -> np.ndarray:
+        """
+        Score every indexed document against a query
+
+        Args:
+            query: Query text
+
+        Returns:
+            Array of raw BM25 scores indexed by document number
+        """
+        scores = np.zeros(len(self._doc_lengths))
+        for doc_numbers, contributions in self._term_contributions(query):
+            scores[doc_numbers] += contributions
+        return scores
+
+    def score_sparse(self, query: str):
+        """
+        Score a query, touching only documents that contain its terms
+
+        Returns:
+            Tuple of (document numbers, raw BM25 scores)
+        """
+        parts = list(self._term_contributions(query))
+        if not parts:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        doc_numbers = np.concatenate([numbers for numbers, _ in parts])
+        contributions = np.concatenate([values for _, values in parts])
+        matched, inverse = np.unique(doc_numbers, return_inverse=True)
+        return matched, np.bincount(inverse, weights=contributions, minlength=len(matched))
+
+    def score_counts(self, query_terms: List[str], term_counts: Dict[str, int],
+                     doc_length: int, k1: Optional[float] = None, b: Optional[float] = None) -> float:
+        """
+        Score one document given its term counts, using corpus statistics
+
+        An empty index treats the document itself as the corpus.
+        """
+        k1 = self.k1 if k1 is None else k1
+        b = self.b if b is None else b
+
+        if len(self):
+            n_docs = len(self)
+            avg_doc_length = self.avg_doc_length or 1.0
+        else:
+            n_docs = 1
+            avg_doc_length = doc_length or 1.0
+
+        score = 0.0
+        for term in query_terms:
+            term_freq = term_counts.get(term, 0)
+            if term_freq > 0:
+                doc_freq = self.document_frequency(term) if len(self) else 1
+                idf = self.idf(term, n_docs=n_docs, doc_freq=doc_freq)
+                numerator = term_freq * (k1 + 1)
+                denominator = term_freq + k1 * (1 - b + b * (doc_length / avg_doc_length))
+                score += idf * (numerator / denominator)
+        return score
+
+    def score_text(self, query: str, document: str, k1: Optional[float] = None,
+                   b: Optional[float] = None) -> float:
+        """Score a single document text against a query"""
+        doc_terms = self.tokenize(document)
+        return self.score_counts(self.tokenize(query), Counter(doc_terms), len(doc_terms), k1=k1, b=b)
@@ -0,0 +1,211 @@
+"""
+Clustering Module
+Streaming mini-batch k-means over document embeddings
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from typing import Callable, Iterable, Iterator, Optional
+
+
+def squared_distances(X: np.ndarray, centers: np.ndarray,
+                      X_sq: Optional[np.ndarray] = None,
+                      centers_sq: Optional[np.ndarray] = None) -> np.ndarray:
+    """Pairwise squared distances via ||a||^2 - 2ab + ||b||^2"""
+    if X_sq is None:
+        X_sq = np.einsum('ij,ij->i', X, X)
+    if centers_sq is None:
+        centers_sq = np.einsum('ij,ij->i', centers, centers)
+    distances = X_sq[:, None] - 2.0 * (X @ centers.T) + centers_sq[None, :]
+    return np.maximum(distances, 0.0, out=distances)
+
+
+def iter_array_chunks(array: np.ndarray, chunk_size: int = 4096) -> Iterator[np.ndarray]:
+    """Yield row chunks of an array or memory map (e.g. np.load(..., mmap_mode='r'))"""
+    for start in range(0, array.shape[0], chunk_size):
+        yield np.asarray(array[start:start + chunk_size], dtype=np.float64)
+
+
+class MiniBatchKMeans:
+    """
+    Mini-batch k-means (Sculley, 2010) with k-means++ seeding
+
+    Centers are updated from per-center running counts, so the model can be
+    fed chunk by chunk with partial_fit (or fit_stream for several epochs
+    over an on-disk source) and its centroids reused to assign new documents.
+    """
+
+    def __init__(self, n_clusters: int = 8, batch_size: int = 1024, max_iter: int = 100,
+                 tol: float = 1e-4, max_no_improvement: int = 10, seed: int = 0):
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.max_iter = max_iter
+        self.tol = tol
+        self.max_no_improvement = max_no_improvement
+        self.rng = np.random.default_rng(seed)
+
+        self.cluster_centers_ = None
+        self.counts_ = None
+        self.n_steps_ = 0
+        self.converged_ = False
+
+        self._tol_abs = None
+        self._ewa_inertia = None
+        self._best_inertia = None
+        self._no_improvement = 0
+
+    def _init_centers(self, X: np.ndarray) -> np.ndarray:
+        """k-means++ seeding with vectorized distance updates"""
+        n_samples = len(X)
+        X_sq = np.einsum('ij,ij->i', X, X)
+        n_local_trials = 2 + int(np.log(self.n_clusters))
+
+        centers = np.empty((self.n_clusters, X.shape[1]))
+        centers[0] = X[self.rng.integers(n_samples)]
+        closest = squared_distances(X, centers[:1], X_sq)[:, 0]
+
+        for k in range(1, self.n_clusters):
+            total = closest.sum()
+            if total <= 0:
+                centers[k] = X[self.rng.integers(n_samples)]
+                continue
+            # Sample candidates proportional to D^2 and keep the best one
+            candidates = np.searchsorted(np.cumsum(closest), self.rng.random(n_local_trials) * total)
+            candidates = np.minimum(candidates, n_samples - 1)
+            candidate_dist = np.minimum(closest[None, :], squared_distances(X[candidates], X, X_sq[candidates], X_sq))
+            best = np.argmin(candidate_dist.sum(axis=1))
+            centers[k] = X[candidates[best]]
+            closest = candidate_dist[best]
+
+        return centers
+
+    def _start(self, X: np.ndarray) -> None:
+        # Seed on a random sample, as k-means++ is quadratic-ish in practice
+        init_size = min(len(X), max(3 * self.batch_size, 3 * self.n_clusters))
+        sample = X[self.rng.choice(len(X), init_size, replace=False)] if init_size < len(X) else X
+        self.cluster_centers_ = self._init_centers(sample)
+        self.counts_ = np.zeros(self.n_clusters)
+        self._set_tolerance(sample)
+
+    def _set_tolerance(self, X: np.ndarray) -> None:
+        # Convergence tolerance relative to the data variance
+        self._tol_abs = self.tol * np.mean(np.var(X, axis=0))
+
+    def _step(self, batch: np.ndarray) -> float:
+        """One mini-batch update; returns the squared center shift"""
+        centers = self.cluster_centers_
+        distances = squared_distances(batch, centers)
+        labels = np.argmin(distances, axis=1)
+        inertia = distances[np.arange(len(batch)), labels].sum() / len(batch)
+
+        # Per-center sums via a sparse one-hot product
+        one_hot = sp.csr_matrix(
+            (np.ones(len(batch)), (labels, np.arange(len(batch)))),
+            shape=(self.n_clusters, len(batch))
+        )
+        batch_counts = np.bincount(labels, minlength=self.n_clusters).astype(np.float64)
+        sums = one_hot @ batch
+
+        updated = batch_counts > 0
+        old_centers = centers[updated].copy()
+        new_counts = self.counts_[updated] + batch_counts[updated]
+        centers[updated] = (old_centers * self.counts_[updated, None] + sums[updated]) / new_counts[:, None]
+        self.counts_[updated] = new_counts
+
+        self.n_steps_ += 1
+        self._track_inertia(inertia)
+        return float(((centers[updated] - old_centers) ** 2).sum())
+
+    def _track_inertia(self, inertia: float) -> None:
+        """Exponentially weighted inertia for the no-improvement stopping rule"""
+        if self._ewa_inertia is None:
+            self._ewa_inertia = inertia
+        else:
+            alpha = min(self.batch_size * 2.0 / max(self.counts_.sum(), 1.0), 1.0)
+            self._ewa_inertia = self._ewa_inertia * (1 - alpha) + inertia * alpha
+
+        if self._best_inertia is None or self._ewa_inertia < self._best_inertia:
+            self._best_inertia = self._ewa_inertia
+            self._no_improvement = 0
+        else:
+            self._no_improvement += 1
+
+    def _converged(self, shift: float) -> bool:
+        return shift <= self._tol_abs or self._no_improvement >= self.max_no_improvement
+
+    def partial_fit(self, chunk: np.ndarray) -> 'MiniBatchKMeans':
+        """
+        Update the model with one chunk of embeddings
+
+        The first chunk seeds the centers and must hold at least n_clusters rows.
+        """
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if self.cluster_centers_ is None:
+            if len(chunk) < self.n_clusters:
+                raise ValueError(f"First chunk needs at least {self.n_clusters} rows, got {len(chunk)}")
+            self._start(chunk)
+        elif self._tol_abs is None:
+            self._set_tolerance(chunk)
+
+        for start in range(0, len(chunk), self.batch_size):
+            if self._converged(self._step(chunk[start:start + self.batch_size])):
+                self.converged_ = True
+        return self
+
+    def fit(self, X: np.ndarray) -> 'MiniBatchKMeans':
+        """Fit on an in-memory matrix, sampling mini-batches until convergence"""
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) < self.n_clusters:
+            raise ValueError(f"Need at least {self.n_clusters} samples, got {len(X)}")
+        self._start(X)
+
+        n_batches = max(1, int(np.ceil(len(X) / self.batch_size)))
+        for _ in range(self.max_iter * n_batches):
+            batch = X[self.rng.integers(0, len(X), min(self.batch_size, len(X)))]
+            if self._converged(self._step(batch)):
+                self.converged_ = True
+                break
+        return self
+
+    def fit_stream(self, chunks: Callable[[], Iterable[np.ndarray]], n_epochs: int = 1) -> 'MiniBatchKMeans':
+        """
+        Fit from a chunked source such as an on-disk embedding store
+
+        Args:
+            chunks: Callable returning a fresh iterable of chunks per epoch
+            n_epochs: Maximum passes over the source (stops early on convergence)
+        """
+        for _ in range(n_epochs):
+            self.converged_ = False
+            for chunk in chunks():
+                self.partial_fit(chunk)
+            if self.converged_:
+                break
+        return self
+
+    def predict(self, X: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """Assign embeddings to the nearest learned centroid"""
+        if self.cluster_centers_ is None:
+            raise RuntimeError("Model is not fitted")
+        X = np.asarray(X, dtype=np.float64)
+        centers_sq = np.einsum('ij,ij->i', self.cluster_centers_, self.cluster_centers_)
+        labels = np.empty(len(X), dtype=np.intp)
+        for start in range(0, len(X), chunk_size):
+            batch = X[start:start + chunk_size]
+            labels[start:start + chunk_size] = np.argmin(
+                squared_distances(batch, self.cluster_centers_, centers_sq=centers_sq), axis=1
+            )
+        return labels
+
+    def save(self, filepath: str) -> None:
+        """Save centroids and counts for incremental assignment elsewhere"""
+        np.savez(filepath, cluster_centers=self.cluster_centers_, counts=self.counts_)
+
+    @classmethod
+    def load(cls, filepath: str, **params) -> 'MiniBatchKMeans':
+        """Restore a model saved with save()"""
+        data = np.load(filepath)
+        model = cls(n_clusters=len(data['cluster_centers']), **params)
+        model.cluster_centers_ = data['cluster_centers']
+        model.counts_ = data['counts']
+        return model
@@ -0,0 +1,101 @@
+"""
+Department Classifier
+Fills tagged_departments with the Categorization Module's trained classifier
+"""
+
+import os
+import joblib
+import numpy as np
+from typing import List, Dict, Optional
+from models.text_features import TokenizedBatch, TokenTfidf
+
+DEFAULT_CLASSIFIER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'Categorization Module', 'models', 'pipeline_tfidf_logreg.joblib'
+)
+
+
+class DepartmentClassifier:
+    """
+    Department tagging with a saved categorization pipeline
+
+    Accepts both artifact layouts written by the Categorization Module: an
+    sklearn Pipeline (TF-IDF + classifier) or {"clf": ..., "featurizer": ...}.
+    For TF-IDF pipelines, documents are vectorized from a TokenizedBatch
+    (see TokenTfidf), so the tokens that feed the classifier are the same
+    ones BM25 scoring uses; other featurizers get the raw text.
+
+    A document is tagged with every department whose probability reaches
+    min_probability (at most max_tags, best first; always the top one).
+    Documents that already have tagged_departments keep them.
+    """
+
+    def __init__(self, path: str = DEFAULT_CLASSIFIER_PATH, min_probability: float = 0.3,
+                 max_tags: int = 3, overwrite: bool = False):
+        self.path = path
+        self.min_probability = min_probability
+        self.max_tags = max_tags
+        self.overwrite = overwrite
+
+        try:
+            artifact = joblib.load(path, mmap_mode='r')
+        except ValueError:
+            # Compressed artifacts cannot be memory-mapped
+            artifact = joblib.load(path)
+
+        if isinstance(artifact, dict):
+            self.clf = artifact['clf']
+            self.featurizer = artifact['featurizer']
+            vectorizer = getattr(self.featurizer, 'tfidf', None)
+            if getattr(self.featurizer, 'use_transformer', False):
+                vectorizer = None
+        else:
+            self.clf = artifact.steps[-1][1]
+            self.featurizer = artifact[:-1] if len(artifact.steps) > 1 else None
+            vectorizer = artifact.steps[0][1] if len(artifact.steps) == 2 else None
+
+        self.token_tfidf = TokenTfidf(vectorizer) if vectorizer is not None and TokenTfidf.supports(vectorizer) else None
+        self.classes = [str(label) for label in self.clf.classes_]
+
+    @staticmethod
+    def document_text(doc: Dict) -> str:
+        """Text the classifier reads (title and content)"""
+        return f"{doc.get('title') or ''} {doc.get('content') or ''}"
+
+    def vectorize(self, documents: List[Dict], tokenized: Optional[TokenizedBatch] = None):
+        """Classifier features for a batch, from shared tokens when possible"""
+        if self.token_tfidf is not None:
+            tokenized = tokenized if tokenized is not None else TokenizedBatch(documents)
+            return self.token_tfidf.transform(tokenized.tokens)
+        texts = [self.document_text(doc) for doc in documents]
+        return self.featurizer.transform(texts) if self.featurizer is not None else texts
+
+    def predict_proba(self, documents: List[Dict], tokenized: Optional[TokenizedBatch] = None) -> np.ndarray:
+        """Class probabilities, shape (documents, classes)"""
+        if not documents:
+            return np.empty((0, len(self.classes)))
+        return self.clf.predict_proba(self.vectorize(documents, tokenized))
+
+    def tags(self, proba: np.ndarray) -> List[List[str]]:
+        """Departments per document from class probabilities"""
+        ranked = np.argsort(-proba, axis=1, kind='stable')[:, :self.max_tags]
+        tags = []
+        for row, order in zip(proba, ranked):
+            tags.append([self.classes[j] for k, j in enumerate(order)
+                         if k == 0 or row[j] >= self.min_probability])
+        return tags
+
+    def categorize_tokenized(self, documents: List[Dict], tokenized: TokenizedBatch) -> List[Dict]:
+        """Tag a batch in place, reusing its TokenizedBatch"""
+        proba = self.predict_proba(documents, tokenized)
+        best = proba.argmax(axis=1) if len(documents) else []
+        for doc, row, top, departments in zip(documents, proba, best, self.tags(proba)):
+            doc['predicted_department'] = self.classes[top]
+            doc['category_confidence'] = round(float(row[top]), 4)
+            if self.overwrite or not doc.get('tagged_departments'):
+                doc['tagged_departments'] = departments
+        return documents
+
+    def __call__(self, documents: List[Dict]) -> List[Dict]:
+        """Categorizer interface of IngestPipeline"""
+        return self.categorize_tokenized(documents, TokenizedBatch(documents))
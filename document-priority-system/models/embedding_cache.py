@@ -0,0 +1,238 @@
+"""
+Embedding Cache
+Content-hash keyed embedding cache with an LRU memory tier and an
+append-only memory-mapped disk store
+"""
+
+import os
+import re
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:         # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+
+@contextmanager
+def _file_lock(path: str):
+    """
+    Exclusive inter-process lock on a lock file
+
+    Uses flock where available and msvcrt.locking on Windows; elsewhere the
+    lock is a no-op, which is safe for a store used by a single process.
+    """
+    with open(path, 'ab') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:     # LK_LOCK gives up after ~10 seconds
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class DiskEmbeddingStore:
+    """
+    Append-only on-disk embedding store
+
+    Vectors are appended as raw rows to <name>.vec and read back through a
+    read-only memory map; <name>.keys records "key<TAB>row" lines. Appends
+    take an exclusive lock on <name>.lock so several processes can share
+    one store.
+    """
+
+    def __init__(self, directory: str, name: str, dim: int, dtype=np.float64):
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.row_bytes = self.dim * self.dtype.itemsize
+
+        os.makedirs(directory, exist_ok=True)
+        self.vector_path = os.path.join(directory, f"{name}.vec")
+        self.key_path = os.path.join(directory, f"{name}.keys")
+        self.lock_path = os.path.join(directory, f"{name}.lock")
+        for path in (self.vector_path, self.key_path):
+            open(path, 'ab').close()
+
+        self._rows = {}
+        self._key_offset = 0
+        self._mmap = None
+        self.refresh()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def refresh(self) -> None:
+        """Pick up rows appended since the last read (possibly by other processes)"""
+        with open(self.key_path, 'rb') as f:
+            f.seek(self._key_offset)
+            data = f.read()
+
+        # Only consume complete lines; a partial trailing line is re-read later
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            key, row = line.decode('ascii').split('\t')
+            self._rows[key] = int(row)
+        self._key_offset += end
+
+    def _mapped(self, row: int) -> np.ndarray:
+        """Return a memory map that covers the given row"""
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            n_rows = os.path.getsize(self.vector_path) // self.row_bytes
+            self._mmap = np.memmap(self.vector_path, dtype=self.dtype, mode='r',
+                                   shape=(n_rows, self.dim)) if n_rows else None
+        return self._mmap
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Read a vector by key, or None if it is not stored"""
+        row = self._rows.get(key)
+        if row is None:
+            self.refresh()
+            row = self._rows.get(key)
+            if row is None:
+                return None
+        return self._mapped(row)[row]
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        """Append a vector (no-op if the key is already stored)"""
+        if key in self._rows:
+            return
+        data = np.ascontiguousarray(vector, dtype=self.dtype).tobytes()
+
+        with _file_lock(self.lock_path):
+            self.refresh()
+            if key in self._rows:
+                return
+            with open(self.vector_path, 'ab') as vector_file:
+                row = vector_file.tell() // self.row_bytes
+                vector_file.write(data)
+            # The key line is written last so readers never see a missing row
+            with open(self.key_path, 'ab') as key_file:
+                key_file.write(f"{key}\t{row}\n".encode('ascii'))
+                self._key_offset = key_file.tell()
+            self._rows[key] = row
+
+    def iter_chunks(self, chunk_size: int = 4096):
+        """Yield the stored matrix in row chunks (memory-mapped, not copied)"""
+        matrix = self._mapped(max(len(self._rows) - 1, 0))
+        if matrix is None:
+            return
+        for start in range(0, matrix.shape[0], chunk_size):
+            yield matrix[start:start + chunk_size]
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by content hash plus model name
+
+    The memory tier is a bounded LRU; misses fall through to the optional
+    disk store, so embeddings survive restarts and are shared by every
+    process pointed at the same directory. Both tiers hold dtype vectors,
+    so a lookup returns the same values whichever tier it is served from.
+    """
+
+    def __init__(self, model_name: str, dim: int, max_entries: int = 4096,
+                 cache_dir: Optional[str] = None, dtype=np.float64):
+        self.model_name = model_name
+        self.dim = dim
+        self.max_entries = max_entries
+        self.dtype = np.dtype(dtype)
+
+        self._memory = OrderedDict()
+        self.disk = None
+        if cache_dir:
+            safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', model_name)
+            self.disk = DiskEmbeddingStore(cache_dir, f"{safe_name}-{dim}-{self.dtype.name}", dim,
+                                           dtype=self.dtype)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        """Content hash of a text for this model"""
+        digest = hashlib.sha1(self.model_name.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _remember(self, key, embedding):
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Look up an embedding, promoting disk hits into memory"""
+        key = self.key(text)
+
+        embedding = self._memory.get(key)
+        if embedding is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+        if self.disk is not None:
+            embedding = self.disk.get(key)
+            if embedding is not None:
+                embedding = np.array(embedding, dtype=self.dtype)
+                embedding.flags.writeable = False
+                self._remember(key, embedding)
+                self.hits += 1
+                self.disk_hits += 1
+                return embedding
+
+        self.misses += 1
+        return None
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up several embeddings; misses are returned as None"""
+        return [self.get(text) for text in texts]
+
+    def put(self, text: str, embedding: np.ndarray) -> np.ndarray:
+        """Store an embedding in both tiers; returns the stored (dtype) vector"""
+        key = self.key(text)
+        embedding = np.array(embedding, dtype=self.dtype)
+        embedding.flags.writeable = False
+        self._remember(key, embedding)
+        if self.disk is not None:
+            self.disk.put(key, embedding)
+        return embedding
+
+    def clear_memory(self) -> None:
+        """Drop the in-memory tier (the disk store is kept)"""
+        self._memory.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes"""
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'memory_entries': len(self._memory),
+            'disk_entries': len(self.disk) if self.disk is not None else 0
+        }
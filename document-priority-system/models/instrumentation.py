@@ -0,0 +1,313 @@
+"""
+Instrumentation
+Per-stage timers, counters and an opt-in sampling profiler for slow requests
+"""
+
+import os
+import io
+import time
+import bisect
+import random
+import pstats
+import cProfile
+import threading
+from collections import deque
+from typing import List, Dict, Optional, Callable
+
+# Stage latency bucket bounds in seconds (Prometheus 'le' labels)
+DEFAULT_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+
+
+class _NullContext:
+    """Shared no-op context manager returned while instrumentation is off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullContext()
+
+
+class StageTimer:
+    """Cumulative latency histogram of one stage"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)     # last bucket: above every bound
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: 'StageTimer') -> None:
+        """Add another timer's observations (same buckets)"""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        if other.max > self.max:
+            self.max = other.max
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total, 6),
+            'mean_ms': round(1e3 * self.total / self.count, 4) if self.count else None,
+            'max_ms': round(1e3 * self.max, 4),
+            'histogram': dict(zip([f"le_{bound}" for bound in self.buckets] + ['inf'], self.counts))
+        }
+
+
+class _Timing:
+    """Context manager that records one stage duration"""
+
+    __slots__ = ('metrics', 'stage', 'started')
+
+    def __init__(self, metrics: 'Metrics', stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _Profiling:
+    """Context manager that profiles one request and keeps the profile if it was slow"""
+
+    __slots__ = ('metrics', 'name', 'profiler', 'started')
+
+    def __init__(self, metrics: 'Metrics', name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.profiler = cProfile.Profile()
+        try:
+            self.profiler.enable()
+        except ValueError:
+            # Another profiler is active in this process
+            self.profiler = None
+            self.metrics._profiler_lock.release()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler is None:
+            return False
+        self.profiler.disable()
+        seconds = time.perf_counter() - self.started
+        try:
+            self.metrics._record_profile(self.name, seconds, self.profiler)
+        finally:
+            self.metrics._profiler_lock.release()
+        return False
+
+
+class Metrics:
+    """
+    Registry of stage timers and counters
+
+    Disabled by default: timer() and profile() then return a shared no-op
+    context and inc() / observe() return immediately, so instrumented code
+    pays one attribute check per call. Enable with enable() or by setting
+    DOCPRIORITY_METRICS=1 before the process starts.
+
+    Stages are dotted names ('content_relevance.bm25'); counters are plain
+    names ('documents_scored'). snapshot() returns everything as a dict and
+    prometheus() renders it in the Prometheus text exposition format.
+
+    Worker processes record into their own registry; drain() it there and
+    merge() the result into the parent's (as DocumentPreprocessor.
+    iter_preprocess does after every chunk).
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Optional[List[float]] = None):
+        self.enabled = enabled
+        self.buckets = list(buckets if buckets is not None else DEFAULT_BUCKETS)
+        self.timers = {}
+        self.counters = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+        # Sampling profiler (see enable_profiling)
+        self.profile_sample_rate = 0.0
+        self.profile_slow_seconds = 0.0
+        self.profile_top_n = 25
+        self.profile_callback = None
+        self.slow_profiles = deque(maxlen=20)
+        self._profiler_lock = threading.Lock()
+        self._random = random.Random()
+
+    def enable(self) -> 'Metrics':
+        self.enabled = True
+        return self
+
+    def disable(self) -> 'Metrics':
+        self.enabled = False
+        return self
+
+    def reset(self) -> None:
+        """Clear all timers, counters and kept profiles"""
+        with self._lock:
+            self.timers = {}
+            self.counters = {}
+            self.slow_profiles.clear()
+            self.started = time.time()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def timer(self, stage: str):
+        """Context manager timing one stage (a no-op while disabled)"""
+        return _Timing(self, stage) if self.enabled else _NULL
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record one stage duration"""
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self.timers.get(stage)
+            if timer is None:
+                timer = self.timers[stage] = StageTimer(self.buckets)
+            timer.observe(seconds)
+
+    def inc(self, counter: str, value: int = 1) -> None:
+        """Increment a counter"""
+        if not self.enabled or not value:
+            return
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def drain(self) -> Dict:
+        """Take the recorded timers and counters, leaving this registry empty"""
+        with self._lock:
+            recorded = {'timers': self.timers, 'counters': self.counters}
+            self.timers, self.counters = {}, {}
+        return recorded
+
+    def merge(self, recorded: Dict) -> None:
+        """Add timers and counters taken from another registry with drain()"""
+        if not self.enabled:
+            return
+        with self._lock:
+            for stage, other in recorded['timers'].items():
+                timer = self.timers.get(stage)
+                if timer is None:
+                    timer = self.timers[stage] = StageTimer(self.buckets)
+                timer.merge(other)
+            for counter, value in recorded['counters'].items():
+                self.counters[counter] = self.counters.get(counter, 0) + value
+
+    # ------------------------------------------------------------------
+    # Sampling profiler
+    # ------------------------------------------------------------------
+
+    def enable_profiling(self, sample_rate: float = 0.01, slow_ms: float = 0.0, top_n: int = 25,
+                         callback: Optional[Callable[[Dict], None]] = None, keep: int = 20) -> None:
+        """
+        Profile a random sample of requests and keep the slow ones
+
+        A sampled request (probability sample_rate) runs under cProfile; if
+        it took at least slow_ms its top_n functions by cumulative time are
+        kept in slow_profiles (the last `keep`) and passed to callback.
+        Only one request is profiled at a time; requests arriving meanwhile
+        run unprofiled.
+
+        Args:
+            sample_rate: Share of requests to profile (0 turns profiling off)
+            slow_ms: Minimum request duration for a profile to be kept
+            top_n: Functions listed per profile
+            callback: Optional function called with each kept profile
+            keep: Number of recent slow profiles kept in memory
+        """
+        self.profile_sample_rate = sample_rate
+        self.profile_slow_seconds = slow_ms / 1000
+        self.profile_top_n = top_n
+        self.profile_callback = callback
+        self.slow_profiles = deque(self.slow_profiles, maxlen=keep)
+
+    def profile(self, name: str):
+        """Context manager for one request; profiles it when sampled"""
+        if (not self.enabled or self.profile_sample_rate <= 0
+                or self._random.random() >= self.profile_sample_rate
+                or not self._profiler_lock.acquire(blocking=False)):
+            return _NULL
+        # The lock is released by _Profiling.__exit__
+        return _Profiling(self, name)
+
+    def _record_profile(self, name: str, seconds: float, profiler: cProfile.Profile) -> None:
+        self.inc('requests_profiled')
+        if seconds < self.profile_slow_seconds:
+            return
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(self.profile_top_n)
+        record = {
+            'request': name,
+            'seconds': round(seconds, 6),
+            'at': time.time(),
+            'profile': stream.getvalue()
+        }
+        self.slow_profiles.append(record)
+        self.inc('slow_requests_profiled')
+        if self.profile_callback is not None:
+            self.profile_callback(record)
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict:
+        """All timers and counters as a JSON-serializable dictionary"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'uptime_seconds': round(time.time() - self.started, 3),
+                'stages': {stage: timer.snapshot() for stage, timer in sorted(self.timers.items())},
+                'counters': dict(sorted(self.counters.items())),
+                'slow_profiles': [{key: value for key, value in record.items() if key != 'profile'}
+                                  for record in self.slow_profiles]
+            }
+
+    def prometheus(self, prefix: str = 'docpriority') -> str:
+        """Timers and counters in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            if self.timers:
+                name = f"{prefix}_stage_duration_seconds"
+                lines.append(f"# HELP {name} Time spent per processing stage.")
+                lines.append(f"# TYPE {name} histogram")
+                for stage, timer in sorted(self.timers.items()):
+                    cumulative = 0
+                    for bound, count in zip(timer.buckets + ['+Inf'], timer.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{stage="{stage}"}} {timer.total!r}')
+                    lines.append(f'{name}_count{{stage="{stage}"}} {timer.count}')
+
+            for counter, value in sorted(self.counters.items()):
+                name = f"{prefix}_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry used by components that are not given their own
+METRICS = Metrics(enabled=os.environ.get('DOCPRIORITY_METRICS', '').lower() in ('1', 'true', 'yes'))
@@ -0,0 +1,251 @@
+"""
+Keyword Matcher
+Aho-Corasick multi-pattern matching of categorized keywords in one pass
+"""
+
+import re
+from collections import deque
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import ahocorasick     # optional C implementation (pyahocorasick)
+except ImportError:
+    ahocorasick = None
+
+# Maximal alphanumeric runs; a keyword made of such characters never spans two
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a categorized keyword set
+
+    Keywords are matched case-insensitively and every occurrence (including
+    overlapping ones) is found in one pass. A keyword can belong to several
+    categories, e.g. ('urgency', 'critical') and ('department', 'Safety').
+    With word_boundary=True a hit only counts when it is not part of a
+    longer alphanumeric word; by default matching is plain substring
+    matching, like `keyword in text`.
+
+    When pyahocorasick is installed the automaton runs in C over the whole
+    text. Otherwise a pure-Python automaton is used: alphanumeric keywords
+    can only occur inside a single alphanumeric run, so the text is split
+    into runs with one regex scan and the automaton is run once per distinct
+    run (memoized across texts); keywords containing other characters are
+    matched by a second automaton over the full text.
+    """
+
+    def __init__(self, word_boundary: bool = False, token_cache_size: int = 100000,
+                 use_native: bool = True):
+        self.word_boundary = word_boundary
+        self.token_cache_size = token_cache_size
+        self.use_native = use_native and ahocorasick is not None
+        self._keywords = {}         # keyword -> list of categories
+        self._built = False
+        self._native = None
+        self._token_automaton = None
+        self._span_automaton = None
+        self._token_hits = {}       # alphanumeric run -> ((offset, keyword), ...)
+        self._token_keywords = {}   # alphanumeric run -> frozenset of keywords
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def add(self, keyword: str, category: Hashable) -> None:
+        """Register a keyword under a category"""
+        keyword = keyword.lower()
+        if not keyword:
+            return
+        categories = self._keywords.setdefault(keyword, [])
+        if category not in categories:
+            categories.append(category)
+        self._built = False
+
+    def add_keywords(self, keywords: Iterable[str], category: Hashable) -> None:
+        """Register several keywords under one category"""
+        for keyword in keywords:
+            self.add(keyword, category)
+
+    def add_groups(self, groups: Dict[str, Iterable[str]], kind: str) -> None:
+        """Register a {name: keywords} mapping under (kind, name) categories"""
+        for name, keywords in groups.items():
+            self.add_keywords(keywords, (kind, name))
+
+    def categories(self, keyword: str) -> List:
+        """Categories a keyword is registered under"""
+        return self._keywords.get(keyword.lower(), [])
+
+    @staticmethod
+    def _automaton(keywords: Iterable[str]):
+        """Build the trie, failure links and the resulting transition table"""
+        goto = [{}]
+        outputs = [[]]
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(keyword)
+
+        # Breadth-first failure links; transitions are completed with those
+        # of the failure state, so the scan never follows failure links
+        fail = [0] * len(goto)
+        delta = [dict(edges) for edges in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                if state:
+                    fallback = fail[state]
+                    while fallback and char not in goto[fallback]:
+                        fallback = fail[fallback]
+                    fail[nxt] = goto[fallback].get(char, 0)
+                    outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+            for char, nxt in delta[fail[state]].items():
+                delta[state].setdefault(char, nxt)
+
+        return delta, [tuple(out) for out in outputs]
+
+    def build(self) -> 'KeywordMatcher':
+        """Compile the automata (done automatically on first use)"""
+        if self.use_native:
+            self._native = ahocorasick.Automaton()
+            for keyword in self._keywords:
+                self._native.add_word(keyword, keyword)
+            self._native.make_automaton()
+            self._built = True
+            return self
+
+        token_keywords = [kw for kw in self._keywords if TOKEN_PATTERN.fullmatch(kw)]
+        span_keywords = [kw for kw in self._keywords if not TOKEN_PATTERN.fullmatch(kw)]
+        self._token_automaton = self._automaton(token_keywords)
+        self._span_automaton = self._automaton(span_keywords) if span_keywords else None
+        self._token_hits = {}
+        self._token_keywords = {}
+        self._built = True
+        return self
+
+    @staticmethod
+    def _scan(automaton, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (start, keyword) for every occurrence of the automaton's keywords"""
+        delta, outputs = automaton
+        root = delta[0]
+        state = 0
+        for end, char in enumerate(text, 1):
+            state = delta[state].get(char) if state else root.get(char)
+            if state is None:
+                state = 0
+                continue
+            for keyword in outputs[state]:
+                yield end - len(keyword), keyword
+
+    def _boundary_ok(self, text: str, start: int, end: int) -> bool:
+        return ((start == 0 or not text[start - 1].isalnum()) and
+                (end == len(text) or not text[end].isalnum()))
+
+    def _run_hits(self, token: str) -> Tuple[Tuple[int, str], ...]:
+        """Keyword occurrences inside one alphanumeric run (memoized)"""
+        hits = self._token_hits.get(token)
+        if hits is None:
+            if self.word_boundary:
+                hits = ((0, token),) if token in self._keywords else ()
+            else:
+                hits = tuple(self._scan(self._token_automaton, token))
+            if len(self._token_hits) >= self.token_cache_size:
+                self._token_hits.clear()
+            self._token_hits[token] = hits
+        return hits
+
+    def _span_matches(self, lowered: str) -> Iterator[Tuple[int, str]]:
+        if self._span_automaton is None:
+            return
+        for start, keyword in self._scan(self._span_automaton, lowered):
+            if not self.word_boundary or self._boundary_ok(lowered, start, start + len(keyword)):
+                yield start, keyword
+
+    def _native_matches(self, lowered: str) -> Iterator[Tuple[int, str]]:
+        if not self._keywords:
+            return
+        for end, keyword in self._native.iter(lowered):
+            start = end + 1 - len(keyword)
+            if not self.word_boundary or self._boundary_ok(lowered, start, end + 1):
+                yield start, keyword
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (start offset, keyword) for every occurrence, in text order
+
+        Offsets refer to the lowercased text.
+        """
+        if not self._built:
+            self.build()
+        lowered = text.lower()
+        if self.use_native:
+            return iter(sorted(self._native_matches(lowered)))
+
+        matches = [(match.start() + offset, keyword)
+                   for match in TOKEN_PATTERN.finditer(lowered)
+                   for offset, keyword in self._run_hits(match.group())]
+        matches.extend(self._span_matches(lowered))
+        return iter(sorted(matches))
+
+    def find(self, text: str) -> Dict[Hashable, Set[str]]:
+        """
+        Distinct keywords found in the text, grouped by category
+
+        Returns:
+            Dictionary mapping each matched category to its matched keywords
+        """
+        if not self._built:
+            self.build()
+        lowered = text.lower()
+        if self.use_native:
+            return self._group({keyword for _, keyword in self._native_matches(lowered)})
+
+        # Only runs never seen before go through the automaton
+        tokens = set(TOKEN_PATTERN.findall(lowered))
+        token_keywords = self._token_keywords
+        unseen = tokens.difference(token_keywords)
+        if unseen:
+            if len(token_keywords) + len(unseen) > self.token_cache_size:
+                token_keywords.clear()
+                unseen = tokens
+            for token in unseen:
+                token_keywords[token] = frozenset(keyword for _, keyword in self._run_hits(token))
+        keywords = set().union(*map(token_keywords.__getitem__, tokens))
+        keywords.update(keyword for _, keyword in self._span_matches(lowered))
+        return self._group(keywords)
+
+    def _group(self, keywords: Set[str]) -> Dict[Hashable, Set[str]]:
+        found = {}
+        for keyword in keywords:
+            for category in self._keywords[keyword]:
+                found.setdefault(category, set()).add(keyword)
+        return found
+
+    def find_batch(self, texts: List[str]) -> List[Dict[Hashable, Set[str]]]:
+        """find() for each text"""
+        return [self.find(text) for text in texts]
+
+
+def group_counts(found: Dict[Hashable, Set[str]], kind: str,
+                 names: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Distinct keyword counts per name for (kind, name) categories
+
+    Args:
+        found: Output of KeywordMatcher.find
+        kind: Category kind, e.g. 'urgency'
+        names: Names to report (with 0 when absent); default: matched names only
+    """
+    counts = {name: 0 for name in names} if names is not None else {}
+    for category, keywords in found.items():
+        if isinstance(category, tuple) and len(category) == 2 and category[0] == kind:
+            counts[category[1]] = len(keywords)
+    return counts
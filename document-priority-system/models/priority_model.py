@@ -8,10 +8,12 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import pickle
 import json
-from datetime import datetime, timedelta
+from models.batch_scorer import BatchPriorityScorer, parse_deadline_day, deadline_urgency
+from models.bm25_index import BM25Index
+from models.instrumentation import METRICS
 
 class DocumentPriorityModel:
-    def __init__(self):
+    def __init__(self, as_of=None, metrics=None):
         self.tfidf_vectorizer = TfidfVectorizer(
             max_features=1000,
             ngram_range=(1, 2),
@@ -82,49 +84,45 @@ class DocumentPriorityModel:
         
         self.is_trained = False
         self.document_embeddings = {}
+        self.bm25_index = BM25Index(k1=1.5, b=0.75)
+        self._batch_scorer = None
         
-    def calculate_deadline_urgency(self, deadline_str):
+        # Fixed "as-of" date for reproducible scoring (None: current time)
+        self.as_of = as_of
+        
+        # Stage timers of the batch scoring path
+        self.metrics = metrics if metrics is not None else METRICS
+        
+    def calculate_deadline_urgency(self, deadline_str, as_of=None):
         """Calculate urgency based on deadline proximity"""
-        if not deadline_str:
-            return 0.5  # Default medium urgency
+        # Overdue: 1.0, <=1 day: 0.95, <=3: 0.85, <=7: 0.7, <=14: 0.55, <=30: 0.4,
+        # later: 0.25, missing or invalid: 0.5
+        as_of = as_of if as_of is not None else self.as_of
+        return float(deadline_urgency(parse_deadline_day(deadline_str), as_of))
+    
+    def index_documents(self, documents, term_counts=None, keys=None):
+        """
+        Add documents to the corpus-level BM25 index
         
-        try:
-            deadline = datetime.strptime(deadline_str, '%Y-%m-%d')
-            days_remaining = (deadline - datetime.now()).days
-            
-            if days_remaining < 0:
-                return 1.0  # Overdue - maximum urgency
-            elif days_remaining <= 1:
-                return 0.95
-            elif days_remaining <= 3:
-                return 0.85
-            elif days_remaining <= 7:
-                return 0.7
-            elif days_remaining <= 14:
-                return 0.55
-            elif days_remaining <= 30:
-                return 0.4
-            else:
-                return 0.25
-        except:
-            return 0.5
+        This is the only way documents join the corpus: scoring reads the
+        index but never updates it. Already indexed ids are skipped; remove
+        them from bm25_index first to re-index changed content. Documents
+        without an id are skipped too, so indexing is idempotent; they are
+        still scored against the corpus statistics. term_counts optionally
+        supplies already tokenized BM25 term counts; keys optionally
+        replaces the document ids as index keys.
+        """
+        for i, doc in enumerate(documents):
+            doc_id = keys[i] if keys is not None else doc.get('id')
+            if doc_id is not None and doc_id not in self.bm25_index:
+                if term_counts is not None:
+                    self.bm25_index.add_tokens(term_counts[i], key=doc_id)
+                else:
+                    self.bm25_index.add_document(doc.get('content', doc.get('title', '')), key=doc_id)
     
     def calculate_bm25_score(self, query, document, k1=1.5, b=0.75):
-        """Simplified BM25 scoring"""
-        query_terms = query.lower().split()
-        doc_terms = document.lower().split()
-        doc_length = len(doc_terms)
-        avg_doc_length = 500  # Assumed average
-        
-        score = 0
-        for term in query_terms:
-            term_freq = doc_terms.count(term)
-            if term_freq > 0:
-                idf = np.log((1 + 1) / (1 + term_freq))
-                numerator = term_freq * (k1 + 1)
-                denominator = term_freq + k1 * (1 - b + b * (doc_length / avg_doc_length))
-                score += idf * (numerator / denominator)
-        
+        """BM25 score against the indexed corpus statistics"""
+        score = self.bm25_index.score_text(query, document, k1=k1, b=b)
         return min(score / 10, 1.0)  # Normalize to 0-1
     
     def get_bert_similarity(self, query, document):
@@ -143,7 +141,7 @@ class DocumentPriorityModel:
         
         return min(bert_score, 1.0)
     
-    def calculate_priority_score(self, document, user_role, user_department):
+    def calculate_priority_score(self, document, user_role, user_department, as_of=None):
         """
         Main scoring function combining all factors
         
@@ -164,7 +162,7 @@ class DocumentPriorityModel:
         
         # 3. Deadline urgency
         deadline = document.get('deadline', None)
-        urgency_score = self.calculate_deadline_urgency(deadline)
+        urgency_score = self.calculate_deadline_urgency(deadline, as_of)
         
         # 4. Role relevance (is this document tagged for user's department?)
         tagged_depts = document.get('tagged_departments', [])
@@ -238,26 +236,86 @@ class DocumentPriorityModel:
         else:
             return 'MINIMAL'
     
-    def batch_score_documents(self, documents, user_role, user_department):
-        """Score multiple documents and return sorted by priority"""
-        scored_docs = []
-        
-        for doc in documents:
-            score_result = self.calculate_priority_score(doc, user_role, user_department)
-            scored_docs.append({
-                'document_id': doc.get('id'),
-                'title': doc.get('title'),
-                'source_department': doc.get('source_department'),
-                'document_type': doc.get('document_type'),
-                'deadline': doc.get('deadline'),
-                **score_result
-            })
+    def get_batch_scorer(self):
+        """Return the compiled batch scorer, building it on first use"""
+        if self._batch_scorer is None:
+            self._batch_scorer = BatchPriorityScorer(self)
+        return self._batch_scorer
+    
+    def batch_score_documents(self, documents, user_role, user_department, as_of=None, top_k=None):
+        """
+        Score multiple documents and return sorted by priority
+        
+        With top_k, only the best top_k documents are selected (by score,
+        then id) and turned into result dicts.
+        """
+        scorer = self.get_batch_scorer()
+        columns = scorer.columnarize(documents)
+        scores = scorer.score(columns, user_department, as_of)
+        
+        if top_k is not None:
+            rows, _ = scorer.rank(columns.id_keys, scores, top_k)
+            return scorer.materialize(columns.documents, scores, rows)
+        
+        scored_docs = scorer.materialize(columns.documents, scores)
         
         # Sort by priority score (descending)
         scored_docs.sort(key=lambda x: x['priority_score'], reverse=True)
         
         return scored_docs
     
+    def batch_score_page(self, documents, user_role, user_department, page_size=20, cursor=None, as_of=None):
+        """
+        Score documents and return one page of results
+        
+        Pages are ordered by (score desc, id asc); pass the returned
+        'next_cursor' to fetch the following page, with the same documents.
+        The scores of a first page are kept and reused for its cursors, so
+        the pages of one walk partition the documents; once the snapshot is
+        evicted, its cursors raise ValueError ("Expired cursor").
+        
+        Returns:
+            Dictionary with 'results' and 'next_cursor' (None on the last page)
+        """
+        scorer = self.get_batch_scorer()
+        scores, id_keys, snapshot_id = scorer.session(user_department).page_scores(documents, cursor, as_of)
+        rows, next_cursor = scorer.rank(id_keys, scores, page_size, cursor, snapshot_id)
+        
+        return {
+            'results': scorer.materialize(documents, scores, rows),
+            'next_cursor': next_cursor
+        }
+    
+    def score_matrix(self, documents, departments=None, as_of=None, term_counts=None):
+        """
+        Score every document for every department in one pass
+        
+        Department-independent components (authority, document type, deadline
+        urgency, BM25 statistics) are computed once and broadcast against the
+        role relevance matrix. Column j equals the unrounded scores of
+        batch_score_documents(documents, dept, dept) for departments[j].
+        term_counts optionally supplies already tokenized BM25 term counts
+        (see BatchPriorityScorer.columnarize).
+        
+        Returns:
+            Dictionary with 'document_ids', 'departments' and
+            (documents x departments) 'priority_score' / 'priority_label' arrays
+        """
+        if departments is None:
+            departments = list(self.role_relevance_matrix)
+        departments = list(departments)
+        
+        scorer = self.get_batch_scorer()
+        columns = scorer.columnarize(documents, term_counts)
+        scores = scorer.score_matrix(columns, departments, as_of)
+        
+        return {
+            'document_ids': [doc.get('id') for doc in documents],
+            'departments': departments,
+            'priority_score': scores['priority_score'],
+            'priority_label': scores['priority_label']
+        }
+    
     def save_model(self, filepath):
         """Save model weights and configurations"""
         model_data = {
@@ -282,6 +340,7 @@ class DocumentPriorityModel:
             self.doc_type_weights = model_data['doc_type_weights']
             self.role_relevance_matrix = model_data['role_relevance_matrix']
             self.is_trained = model_data['is_trained']
+            self._batch_scorer = None
             
             print(f"Model loaded from {filepath}")
         except FileNotFoundError:
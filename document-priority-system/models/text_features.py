@@ -0,0 +1,115 @@
+"""
+Shared Text Features
+One tokenization pass per document, reused by the department classifier and BM25 scoring
+"""
+
+import re
+import numpy as np
+import scipy.sparse as sp
+from collections import Counter
+from typing import List, Dict
+from sklearn.preprocessing import normalize
+
+
+class TokenizedBatch:
+    """
+    Lowercased whitespace tokens of a document batch, computed once
+
+    Title and content are split separately: the classifier reads
+    "title content" (title_tokens + content_tokens, exactly the split of
+    the joined text) and BM25 / Jaccard read the content (or the title when
+    a document has no content), matching BM25Index.tokenize.
+    """
+
+    def __init__(self, documents: List[Dict]):
+        self.documents = documents
+        self.tokens = []            # classifier token stream per document
+        self.term_counts = []       # BM25 term counts per document
+
+        for doc in documents:
+            title_tokens = (doc.get('title') or '').lower().split()
+            content = doc.get('content')
+            content_tokens = content.lower().split() if content else []
+            self.tokens.append(title_tokens + content_tokens)
+            self.term_counts.append(Counter(content_tokens if 'content' in doc else title_tokens))
+
+    def __len__(self):
+        return len(self.documents)
+
+
+class TokenTfidf:
+    """
+    A fitted TfidfVectorizer's transform, computed from whitespace tokens
+
+    The vectorizer's token pattern never matches whitespace, so applying it
+    to each whitespace token gives the same token stream as applying it to
+    the whole text. Sub-tokens are memoized per distinct whitespace token;
+    n-grams, vocabulary lookup, IDF weighting and normalization follow
+    TfidfVectorizer. Rows equal vectorizer.transform(texts) for texts whose
+    lowercased split is the token list.
+    """
+
+    def __init__(self, vectorizer, cache_size: int = 200000):
+        self.vectorizer = vectorizer
+        self.vocabulary = vectorizer.vocabulary_
+        self.idf = vectorizer.idf_ if vectorizer.use_idf else None
+        self.ngram_range = vectorizer.ngram_range
+        self.pattern = re.compile(vectorizer.token_pattern)
+        self.stop_words = vectorizer.get_stop_words()
+        self.cache_size = cache_size
+        self._subtokens = {}
+
+    @staticmethod
+    def supports(vectorizer) -> bool:
+        """Whether a vectorizer's analysis can be reproduced from whitespace tokens"""
+        return (getattr(vectorizer, 'analyzer', None) == 'word' and vectorizer.lowercase
+                and vectorizer.preprocessor is None and vectorizer.tokenizer is None
+                and vectorizer.strip_accents is None and vectorizer.token_pattern is not None
+                and hasattr(vectorizer, 'vocabulary_') and not vectorizer.binary
+                and re.compile(vectorizer.token_pattern).groups <= 1)
+
+    def _split(self, token: str) -> List[str]:
+        parts = self._subtokens.get(token)
+        if parts is None:
+            parts = self.pattern.findall(token)
+            if self.stop_words:
+                parts = [part for part in parts if part not in self.stop_words]
+            if len(self._subtokens) >= self.cache_size:
+                self._subtokens.clear()
+            self._subtokens[token] = parts
+        return parts
+
+    def _features(self, tokens: List[str]) -> Counter:
+        words = [part for token in tokens for part in self._split(token)]
+        low, high = self.ngram_range
+        grams = Counter()
+        if low == 1:
+            grams.update(words)
+        for n in range(max(low, 2), high + 1):
+            grams.update(' '.join(words[i:i + n]) for i in range(len(words) - n + 1))
+        return grams
+
+    def transform(self, token_lists: List[List[str]]) -> sp.csr_matrix:
+        """TF-IDF rows for tokenized documents"""
+        vocabulary = self.vocabulary
+        indptr, indices, counts = [0], [], []
+        for tokens in token_lists:
+            for gram, count in self._features(tokens).items():
+                column = vocabulary.get(gram)
+                if column is not None:
+                    indices.append(column)
+                    counts.append(count)
+            indptr.append(len(indices))
+
+        matrix = sp.csr_matrix((np.array(counts, dtype=np.float64), np.array(indices, dtype=np.int64),
+                                np.array(indptr, dtype=np.int64)),
+                               shape=(len(token_lists), len(vocabulary)))
+        matrix.sort_indices()
+        if self.vectorizer.sublinear_tf:
+            np.log(matrix.data, out=matrix.data)
+            matrix.data += 1
+        if self.idf is not None:
+            matrix = matrix @ sp.diags(self.idf)
+        if self.vectorizer.norm:
+            matrix = normalize(matrix, norm=self.vectorizer.norm, copy=False)
+        return sp.csr_matrix(matrix)
@@ -0,0 +1,135 @@
+"""
+TF-IDF Index
+Persistent corpus-level TF-IDF matrix with transform-only queries
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from typing import List, Optional
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+class TfidfIndex:
+    """
+    Fitted TF-IDF index over a document corpus
+
+    The vectorizer is fitted once and documents are kept as an L2-normalized
+    sparse matrix, so a query costs one transform plus one sparse mat-vec.
+    New documents are appended with the vocabulary fixed; once the appended
+    share grows past refit_ratio the index is refitted on the full corpus.
+    """
+
+    def __init__(self, vectorizer: Optional[TfidfVectorizer] = None, refit_ratio: Optional[float] = 0.5):
+        self.vectorizer = vectorizer if vectorizer is not None else TfidfVectorizer(
+            max_features=1000,
+            ngram_range=(1, 2),
+            stop_words='english'
+        )
+        self.refit_ratio = refit_ratio
+
+        self.is_fitted = False
+        self.n_fitted = 0
+        self._texts = []
+        self._keys = {}
+        self._blocks = []       # matrix blocks appended since the last consolidation
+        self._matrix = None
+
+    def __len__(self):
+        return len(self._texts)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def row(self, key) -> Optional[int]:
+        """Return the matrix row for a document key, or None"""
+        return self._keys.get(key)
+
+    @property
+    def matrix(self) -> sp.csr_matrix:
+        """Sparse document matrix (rows are L2-normalized TF-IDF vectors)"""
+        if self._blocks:
+            blocks = ([self._matrix] if self._matrix is not None else []) + self._blocks
+            self._matrix = sp.vstack(blocks, format='csr')
+            self._blocks = []
+        return self._matrix
+
+    def _register(self, texts, keys):
+        start = len(self._texts)
+        self._texts.extend(texts)
+        if keys is not None:
+            for offset, key in enumerate(keys):
+                if key is not None:
+                    self._keys[key] = start + offset
+
+    def fit(self, texts: List[str], keys: Optional[List] = None) -> 'TfidfIndex':
+        """
+        Fit the vectorizer and build the document matrix from scratch
+
+        Args:
+            texts: Document texts
+            keys: Optional document keys aligned with texts
+        """
+        self._texts = []
+        self._keys = {}
+        self._register(texts, keys)
+        return self.refit()
+
+    def refit(self) -> 'TfidfIndex':
+        """Refit vocabulary and IDF weights on every indexed document"""
+        self._blocks = []
+        self._matrix = None
+        self.is_fitted = False
+        self.n_fitted = 0
+
+        if self._texts:
+            try:
+                self._matrix = self.vectorizer.fit_transform(self._texts).tocsr()
+            except ValueError:
+                # Empty vocabulary (e.g. only stop words); stay unfitted
+                return self
+            self.is_fitted = True
+            self.n_fitted = len(self._texts)
+        return self
+
+    def append(self, texts: List[str], keys: Optional[List] = None) -> None:
+        """
+        Add documents using the fitted vocabulary
+
+        The first call on an unfitted index performs the initial fit.
+        """
+        if not texts:
+            return
+        if not self.is_fitted:
+            self._register(texts, keys)
+            self.refit()
+            return
+
+        self._register(texts, keys)
+        self._blocks.append(self.vectorizer.transform(texts).tocsr())
+
+        appended = len(self._texts) - self.n_fitted
+        if self.refit_ratio is not None and appended > self.refit_ratio * self.n_fitted:
+            self.refit()
+
+    def transform(self, texts: List[str]) -> sp.csr_matrix:
+        """Vectorize texts with the fitted vocabulary"""
+        return self.vectorizer.transform(texts).tocsr()
+
+    def query(self, query: str, rows: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Cosine similarity between a query and indexed documents
+
+        Args:
+            query: Query text
+            rows: Optional matrix rows to score (default: every document)
+
+        Returns:
+            Array of similarity scores, aligned with rows when given
+        """
+        n_rows = len(self) if rows is None else len(rows)
+        if not self.is_fitted or n_rows == 0:
+            return np.zeros(n_rows)
+
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        query_vector = self.transform([query]).T.toarray()
+        return np.asarray(matrix @ query_vector).ravel()
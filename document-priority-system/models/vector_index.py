@@ -0,0 +1,178 @@
+"""
+Vector Index
+Top-k semantic retrieval over normalized embedding matrices
+"""
+
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+from models.clustering import MiniBatchKMeans
+
+
+class VectorIndex(ABC):
+    """
+    Common interface for embedding retrieval indexes
+
+    Vectors are L2-normalized on insert, so inner product equals cosine
+    similarity. search() returns (ids, scores) sorted by descending score.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.ids = []
+        self._blocks = []
+        self._matrix = np.empty((0, dim))
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Normalized embedding matrix (rows aligned with self.ids)"""
+        if self._blocks:
+            self._matrix = np.vstack([self._matrix] + self._blocks)
+            self._blocks = []
+        return self._matrix
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        """Row-normalize vectors (zero rows stay zero)"""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float64))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def add(self, embeddings: np.ndarray, ids: Optional[List] = None) -> None:
+        """
+        Add embeddings to the index
+
+        Args:
+            embeddings: Array of shape (n, dim)
+            ids: Optional ids aligned with embeddings (default: row numbers)
+        """
+        vectors = self.normalize(embeddings)
+        if ids is None:
+            ids = list(range(len(self.ids), len(self.ids) + len(vectors)))
+        self.ids.extend(ids)
+        self._blocks.append(vectors)
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Positions of the top_k scores, best first"""
+        if top_k <= 0 or len(scores) == 0:
+            return np.empty(0, dtype=np.intp)
+        if top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(scores))
+        return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+    @abstractmethod
+    def search(self, query: np.ndarray, top_k: int = 5) -> Tuple[List, np.ndarray]:
+        """Return (ids, cosine scores) of the top_k most similar vectors, best first"""
+
+
+class ExactVectorIndex(VectorIndex):
+    """Exact top-k: one matrix-vector product followed by argpartition"""
+
+    def search(self, query: np.ndarray, top_k: int = 5) -> Tuple[List, np.ndarray]:
+        """
+        Find the top_k most similar vectors
+
+        Args:
+            query: Query embedding
+            top_k: Number of results
+
+        Returns:
+            Tuple of (ids, cosine scores), best first
+        """
+        scores = self.matrix @ self.normalize(query)[0]
+        rows = self._top_k(scores, top_k)
+        return [self.ids[row] for row in rows], scores[rows]
+
+
+class IVFVectorIndex(VectorIndex):
+    """
+    Approximate inverted-file index
+
+    Vectors are bucketed under their nearest coarse centroid; a query scans
+    only the n_probe closest buckets. Raising n_probe trades latency for
+    recall (n_probe == n_lists is exact). The index trains itself once it
+    holds min_train_size vectors; until then searches are exact scans.
+    """
+
+    def __init__(self, dim: int, n_lists: int = 256, n_probe: int = 8,
+                 n_iter: int = 20, min_train_size: Optional[int] = None, seed: int = 0):
+        super().__init__(dim)
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.min_train_size = min_train_size if min_train_size is not None else 8 * n_lists
+        self.seed = seed
+
+        self.centroids = None
+        self._lists = []
+        self._n_assigned = 0
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, embeddings: np.ndarray) -> None:
+        """Fit coarse centroids (mini-batch spherical k-means) on the given vectors"""
+        vectors = self.normalize(embeddings)
+        kmeans = MiniBatchKMeans(n_clusters=min(self.n_lists, len(vectors)),
+                                 max_iter=self.n_iter, seed=self.seed).fit(vectors)
+
+        self.centroids = self.normalize(kmeans.cluster_centers_)
+        self._lists = [np.empty(0, dtype=np.intp) for _ in range(len(self.centroids))]
+        self._n_assigned = 0
+
+    def add(self, embeddings: np.ndarray, ids: Optional[List] = None) -> None:
+        """Add embeddings, training the coarse quantizer once enough are held"""
+        super().add(embeddings, ids)
+        if not self.is_trained and len(self) >= self.min_train_size:
+            self.train(self.matrix)
+
+    def _assign_pending(self):
+        """Bucket rows added since the last search"""
+        matrix = self.matrix
+        if self._n_assigned == len(matrix):
+            return
+        rows = np.arange(self._n_assigned, len(matrix))
+        assignment = np.argmax(matrix[rows] @ self.centroids.T, axis=1)
+        order = np.argsort(assignment, kind='stable')
+        bounds = np.searchsorted(assignment[order], np.arange(len(self._lists) + 1))
+        for list_idx in range(len(self._lists)):
+            new_rows = rows[order[bounds[list_idx]:bounds[list_idx + 1]]]
+            if len(new_rows):
+                self._lists[list_idx] = np.concatenate([self._lists[list_idx], new_rows])
+        self._n_assigned = len(matrix)
+
+    def search(self, query: np.ndarray, top_k: int = 5) -> Tuple[List, np.ndarray]:
+        """
+        Approximate top_k search over the n_probe nearest buckets
+
+        Returns:
+            Tuple of (ids, cosine scores), best first
+        """
+        query = self.normalize(query)[0]
+        if not self.is_trained:
+            scores = self.matrix @ query
+            rows = self._top_k(scores, top_k)
+            return [self.ids[row] for row in rows], scores[rows]
+
+        self._assign_pending()
+        probe = self._top_k(self.centroids @ query, self.n_probe)
+        candidates = np.concatenate([self._lists[list_idx] for list_idx in probe])
+        scores = self.matrix[candidates] @ query
+        best = self._top_k(scores, top_k)
+        return [self.ids[row] for row in candidates[best]], scores[best]
+
+
+def create_vector_index(kind: str, dim: int, **kwargs) -> VectorIndex:
+    """Factory for the scoring engine: 'exact' or 'ivf'"""
+    if kind == 'exact':
+        return ExactVectorIndex(dim)
+    if kind == 'ivf':
+        return IVFVectorIndex(dim, **kwargs)
+    raise ValueError(f"Unknown vector index type: {kind}")
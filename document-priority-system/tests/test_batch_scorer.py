@@ -0,0 +1,39 @@
+"""
+Columnar batch scoring matches the per-document path
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from models.priority_model import DocumentPriorityModel
+from utility.synthetic_corpus import SyntheticCorpus
+
+AS_OF = date(2025, 1, 1)
+
+
+@pytest.fixture
+def documents():
+    return list(SyntheticCorpus(seed=23, hierarchy_path=None).iter_documents(120))
+
+
+@pytest.mark.parametrize('department', ['Operations', 'Safety', 'Finance'])
+def test_batch_matches_per_document_scores(documents, department):
+    model = DocumentPriorityModel(as_of=AS_OF)
+    model.index_documents(documents[:80])
+
+    # Both paths draw one simulated-BERT value per document, in document order
+    np.random.seed(0)
+    expected = {doc['id']: model.calculate_priority_score(doc, 'Manager', department, as_of=AS_OF)
+                for doc in documents}
+    np.random.seed(0)
+    batch = model.batch_score_documents(documents, 'Manager', department, as_of=AS_OF)
+
+    assert len(batch) == len(documents)
+    for result in batch:
+        single = expected[result['document_id']]
+        assert result['priority_score'] == pytest.approx(single['priority_score'], abs=1e-4)
+        assert result['priority_label'] == single['priority_label']
+        for component, value in single['breakdown'].items():
+            assert result['breakdown'][component] == pytest.approx(value, abs=1e-3)
@@ -0,0 +1,87 @@
+"""
+BM25Index: closed-form scores through add, remove and compact
+"""
+
+import math
+
+import pytest
+
+from models.bm25_index import BM25Index
+
+DOCS = {
+    'a': 'signal failure at depot signal',
+    'b': 'depot maintenance schedule',
+    'c': 'fire safety drill at depot',
+    'd': 'budget review for signal upgrade',
+}
+
+
+def reference_scores(query, docs, k1=1.5, b=0.75):
+    """Okapi BM25 computed directly from the definition"""
+    tokenized = {key: text.lower().split() for key, text in docs.items()}
+    n_docs = len(tokenized)
+    avg_length = sum(len(terms) for terms in tokenized.values()) / n_docs
+    scores = {}
+    for key, terms in tokenized.items():
+        score = 0.0
+        for term in query.lower().split():
+            tf = terms.count(term)
+            if tf:
+                df = sum(term in other for other in tokenized.values())
+                idf = math.log((n_docs - df + 0.5) / (df + 0.5) + 1)
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(terms) / avg_length))
+        scores[key] = score
+    return scores
+
+
+def index_of(docs):
+    index = BM25Index()
+    for key, text in docs.items():
+        index.add_document(text, key=key)
+    return index
+
+
+def scores_by_key(index, query, keys):
+    dense = index.score(query)
+    return {key: dense[index.doc_number(key)] for key in keys}
+
+
+def test_idf_closed_form():
+    index = index_of(DOCS)
+    assert index.document_frequency('depot') == 3
+    assert index.idf('depot') == pytest.approx(math.log((4 - 3 + 0.5) / (3 + 0.5) + 1))
+    assert index.idf('unknown') == pytest.approx(math.log(4.5 / 0.5 + 1))
+
+
+def test_scores_match_definition():
+    index = index_of(DOCS)
+    expected = reference_scores('signal depot', DOCS)
+    assert scores_by_key(index, 'signal depot', DOCS) == pytest.approx(expected)
+
+    matched, sparse = index.score_sparse('signal depot')
+    dense = index.score('signal depot')
+    assert sparse == pytest.approx(dense[matched])
+    assert set(matched.tolist()) == {index.doc_number(key) for key, score in expected.items() if score}
+
+
+def test_remove_and_compact_keep_statistics_exact():
+    index = index_of(DOCS)
+    assert index.remove('a', DOCS['a'].lower().split())
+    assert not index.remove('a')
+    assert 'a' not in index and len(index) == 3 and index.n_retired == 1
+
+    remaining = {key: text for key, text in DOCS.items() if key != 'a'}
+    expected = reference_scores('signal depot', remaining)
+    assert index.document_frequency('signal') == 1
+    assert index.avg_doc_length == pytest.approx(sum(len(t.split()) for t in remaining.values()) / 3)
+    assert scores_by_key(index, 'signal depot', remaining) == pytest.approx(expected)
+
+    index.compact()
+    assert index.n_retired == 0
+    assert sorted(index.doc_number(key) for key in remaining) == [0, 1, 2]
+    assert scores_by_key(index, 'signal depot', remaining) == pytest.approx(expected)
+
+    # Removal without tokens scans the vocabulary; re-adding restores the statistics
+    assert index.remove('b')
+    index.add_document(DOCS['b'], key='b')
+    assert scores_by_key(index, 'signal depot', remaining) == pytest.approx(expected)
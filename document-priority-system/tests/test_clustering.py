@@ -0,0 +1,43 @@
+"""
+MiniBatchKMeans: separated blobs, save/load and incremental updates
+"""
+
+import numpy as np
+import pytest
+
+from models.clustering import MiniBatchKMeans
+
+
+@pytest.fixture
+def blobs():
+    rng = np.random.default_rng(3)
+    centers = np.eye(4, 16) * 10
+    labels = rng.integers(0, 4, 800)
+    return centers[labels] + rng.standard_normal((800, 16)) * 0.3, labels
+
+
+def test_fit_recovers_separated_blobs(blobs):
+    X, labels = blobs
+    predicted = MiniBatchKMeans(n_clusters=4, batch_size=64, seed=1).fit(X).predict(X)
+    # Each true blob maps to exactly one cluster and vice versa
+    pairs = set(zip(labels.tolist(), predicted.tolist()))
+    assert len(pairs) == 4 and len({p for _, p in pairs}) == 4
+
+
+def test_save_load_round_trip(blobs, tmp_path):
+    X, _ = blobs
+    model = MiniBatchKMeans(n_clusters=4, batch_size=64, seed=1).fit(X[:600])
+    path = str(tmp_path / 'centroids.npz')
+    model.save(path)
+    loaded = MiniBatchKMeans.load(path, batch_size=64)
+
+    assert loaded.n_clusters == 4
+    assert np.array_equal(loaded.cluster_centers_, model.cluster_centers_)
+    assert np.array_equal(loaded.counts_, model.counts_)
+    assert np.array_equal(loaded.predict(X), model.predict(X))
+
+    # Centers and counts are the whole update state: both continue identically
+    model.partial_fit(X[600:])
+    loaded.partial_fit(X[600:])
+    assert np.allclose(loaded.cluster_centers_, model.cluster_centers_)
+    assert np.array_equal(loaded.counts_, model.counts_)
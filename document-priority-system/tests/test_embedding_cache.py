@@ -0,0 +1,23 @@
+"""
+Embedding cache: every tier returns the vector that was stored
+"""
+
+import numpy as np
+import pytest
+
+from models.embedding_cache import EmbeddingCache
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_disk_hits_match_memory_hits(tmp_path, dtype):
+    vector = np.random.default_rng(0).standard_normal(8)
+    cache = EmbeddingCache('test-model', 8, max_entries=1, cache_dir=str(tmp_path), dtype=dtype)
+    stored = cache.put('first', vector)
+    assert np.array_equal(cache.get('first'), stored)
+
+    cache.put('second', vector[::-1])       # evicts 'first' from memory
+    assert np.array_equal(cache.get('first'), stored)
+
+    restarted = EmbeddingCache('test-model', 8, cache_dir=str(tmp_path), dtype=dtype)
+    assert np.array_equal(restarted.get('first'), stored)
+    assert restarted.get('first').dtype == np.dtype(dtype)
@@ -0,0 +1,51 @@
+"""
+HashingEmbedder: deterministic, content-sensitive embeddings
+"""
+
+import numpy as np
+
+from models.bert_embedder import HashingEmbedder, create_embedder
+
+TEXTS = [
+    'Emergency brake inspection overdue at Aluva depot',
+    'Emergency brake inspection completed at Aluva depot',
+    'Quarterly invoice for platform cleaning contract',
+    'Quarterly invoice for platform cleaning contracts',
+]
+
+
+def embedder(**kwargs):
+    return HashingEmbedder(embedding_dim=64, n_features=2 ** 12, **kwargs)
+
+
+def test_same_seed_same_embeddings():
+    first, second = embedder().encode_batch(TEXTS), embedder().encode_batch(TEXTS)
+    np.testing.assert_array_equal(first, second)
+    np.testing.assert_allclose(np.linalg.norm(first, axis=1), 1.0)
+    assert not np.allclose(first, embedder(seed=7).encode_batch(TEXTS))
+
+
+def test_batch_matches_single_encode():
+    batch = embedder().encode_batch(TEXTS, batch_size=3)
+    single = np.vstack([embedder().encode(text) for text in TEXTS])
+    np.testing.assert_allclose(batch, single)
+
+
+def test_embeddings_follow_content_not_length():
+    model = embedder()
+    same_length = ['brake failure', 'audit reports']
+    assert len(same_length[0]) == len(same_length[1])
+    a, b = model.encode_batch(same_length)
+    assert model.cosine_similarity(a, b) < 0.5
+
+    embeddings = model.encode_batch(TEXTS)
+    similar = [model.cosine_similarity(embeddings[0], embeddings[1]),
+               model.cosine_similarity(embeddings[2], embeddings[3])]
+    unrelated = model.cosine_similarity(embeddings[0], embeddings[2])
+    assert min(similar) > unrelated
+
+
+def test_factory():
+    model = create_embedder('hashing', embedding_dim=32, n_features=2 ** 10)
+    assert isinstance(model, HashingEmbedder)
+    assert model.encode('text').shape == (32,)
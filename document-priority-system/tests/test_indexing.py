@@ -0,0 +1,55 @@
+"""
+Corpus indexing is idempotent
+"""
+
+from datetime import date
+
+import pytest
+
+from models.priority_model import DocumentPriorityModel
+from utility.scoring_engine import ScoringEngine
+from utility.synthetic_corpus import SyntheticCorpus
+
+AS_OF = date(2025, 1, 1)
+
+
+@pytest.fixture
+def documents():
+    docs = list(SyntheticCorpus(seed=3, hierarchy_path=None).iter_documents(40))
+    for doc in docs[::4]:
+        del doc['id']
+    return docs
+
+
+def test_model_indexing_is_idempotent(documents):
+    model = DocumentPriorityModel(as_of=AS_OF)
+    model.index_documents(documents)
+    size = len(model.bm25_index)
+    model.index_documents(documents)
+    assert size == len(model.bm25_index) == sum(1 for doc in documents if 'id' in doc)
+
+
+def test_engine_indexing_is_idempotent(documents):
+    engine = ScoringEngine(hierarchy_path='data/department_hierarchy.json')
+    engine.index_documents(documents)
+    sizes = (len(engine.bm25_index), len(engine.tfidf_index), len(engine.vector_index),
+             len(engine.priority_model.bm25_index))
+    engine.index_documents(documents)
+    assert sizes == (len(engine.bm25_index), len(engine.tfidf_index), len(engine.vector_index),
+                     len(engine.priority_model.bm25_index))
+    assert sizes[0] == sum(1 for doc in documents if 'id' in doc)
+
+
+def test_relevant_documents_resolve_engine_index_ids(documents):
+    engine = ScoringEngine(hierarchy_path='data/department_hierarchy.json')
+    keyed = [doc for doc in documents if 'id' in doc]
+    engine.index_documents(keyed)
+    embedder = engine.bert_embedder
+
+    expected = embedder.get_relevant_documents('safety incident', keyed, threshold=0.0)
+    found = embedder.get_relevant_documents('safety incident', keyed[::-1], threshold=0.0,
+                                            index=engine.vector_index, id_field='id')
+    assert [hit['document']['id'] for hit in found] == [hit['document']['id'] for hit in expected]
+
+    with pytest.raises(ValueError):
+        embedder.get_relevant_documents('safety incident', keyed[:5], index=engine.vector_index)
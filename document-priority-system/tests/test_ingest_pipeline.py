@@ -0,0 +1,72 @@
+"""
+Streaming ingest: incremental JSON parsing and the BM25 window
+"""
+
+import io
+import json
+import os
+from datetime import date
+
+import pytest
+
+from models.priority_model import DocumentPriorityModel
+from utility.ingest_pipeline import IngestPipeline, iter_json_documents
+from utility.synthetic_corpus import SyntheticCorpus
+
+AS_OF = date(2025, 1, 1)
+HIERARCHY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'data', 'department_hierarchy.json')
+
+RECORDS = [
+    {'id': 1, 'title': 'Brackets ] and } in "strings" [', 'content': 'back\\slash \\" quote'},
+    {'id': 'b', 'nested': {'list': [1, [2, {'x': None}], True], 'empty': {}}, 'score': -1.5e3},
+    {'id': 3, 'content': 'unicode \u00e9\u4e2d \\u0041 \t tab', 'tags': []},
+]
+
+
+def parse(text, read_size):
+    return list(iter_json_documents(io.StringIO(text), read_size=read_size))
+
+
+@pytest.mark.parametrize('layout', ['array', 'documents'])
+def test_split_chunks_match_json_loads(layout):
+    body = json.dumps(RECORDS, indent=1)
+    text = body if layout == 'array' else '{"meta": {"n": 3}, "documents": ' + body + '}'
+    for read_size in range(1, len(text) + 2):
+        assert parse(text, read_size) == RECORDS, read_size
+    assert parse('  [ ]  ', 1) == []
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '{"items": [{"id": 1}]}',
+    '[{"id": 1}, {"id": 2}',
+    '[{"id": 1}, {"id": "open string}]',
+    '[{"id": 1,}]',
+    '[{"id": 1} {"id": 2}]',
+    '[{"id": 1},]',
+    '[, {"id": 1}]',
+    '[{"id": 1},, {"id": 2}]',
+])
+def test_malformed_input_raises(text):
+    for read_size in (1, 3, 1 << 16):
+        with pytest.raises(ValueError):
+            parse(text, read_size)
+
+
+def anonymous_documents(n):
+    for doc in SyntheticCorpus(seed=11, hierarchy_path=None).iter_documents(n):
+        del doc['id']
+        yield doc
+
+
+def test_window_bounds_index_for_records_without_id():
+    model = DocumentPriorityModel(as_of=AS_OF)
+    pipeline = IngestPipeline(model=model, batch_size=16, workers=1, bm25_window=40,
+                              as_of=AS_OF, hierarchy_path=HIERARCHY_PATH)
+    n_results = 0
+    for results in pipeline.iter_results(anonymous_documents(200)):
+        n_results += len(results)
+        assert len(model.bm25_index) <= 40 + 16
+    assert n_results == 200
+    assert len(model.bm25_index) == 40
@@ -0,0 +1,79 @@
+"""
+KeywordMatcher: both backends agree with a brute-force scan
+"""
+
+import re
+
+import pytest
+
+from models.keyword_matcher import KeywordMatcher, ahocorasick
+
+KEYWORDS = {
+    'urgency': ['urgent', 'immediate', 'asap', 'follow-up', 'fire alarm'],
+    'overlap': ['he', 'she', 'his', 'hers'],
+    'department': ['safety', 'fire', 'rolling stock'],
+}
+
+TEXTS = [
+    'URGENT: fire alarm in the depot; she asked for immediate follow-up.',
+    'Ushers said his safety report is Fireproof and urgently needed',
+    'rolling  stock maintenance; rolling stock audit (ASAP)!',
+    'nothing to see',
+    '',
+]
+
+
+def matcher(word_boundary, use_native):
+    keyword_matcher = KeywordMatcher(word_boundary=word_boundary, use_native=use_native)
+    keyword_matcher.add_groups(KEYWORDS, 'kind')
+    return keyword_matcher
+
+
+def brute_force(text, word_boundary):
+    lowered = text.lower()
+    matches = []
+    for keyword in {kw for keywords in KEYWORDS.values() for kw in keywords}:
+        for match in re.finditer(f'(?=({re.escape(keyword)}))', lowered):
+            start, end = match.start(), match.start() + len(keyword)
+            if word_boundary and ((start > 0 and lowered[start - 1].isalnum()) or
+                                  (end < len(lowered) and lowered[end].isalnum())):
+                continue
+            matches.append((start, keyword))
+    return sorted(matches)
+
+
+def grouped(matches):
+    found = {}
+    for _, keyword in matches:
+        for name, keywords in KEYWORDS.items():
+            if keyword in keywords:
+                found.setdefault(('kind', name), set()).add(keyword)
+    return found
+
+
+@pytest.mark.parametrize('word_boundary', [False, True])
+def test_pure_python_matches_brute_force(word_boundary):
+    keyword_matcher = matcher(word_boundary, use_native=False)
+    for _ in range(2):      # the second pass is served from the run caches
+        for text in TEXTS:
+            expected = brute_force(text, word_boundary)
+            assert list(keyword_matcher.iter_matches(text)) == expected
+            assert keyword_matcher.find(text) == grouped(expected)
+
+
+@pytest.mark.skipif(ahocorasick is None, reason='pyahocorasick is not installed')
+@pytest.mark.parametrize('word_boundary', [False, True])
+def test_native_matches_pure_python(word_boundary):
+    native, pure = matcher(word_boundary, use_native=True), matcher(word_boundary, use_native=False)
+    for text in TEXTS:
+        assert list(native.iter_matches(text)) == list(pure.iter_matches(text))
+        assert native.find(text) == pure.find(text)
+
+
+def test_keyword_in_several_categories():
+    keyword_matcher = KeywordMatcher(use_native=False)
+    keyword_matcher.add('Critical', ('urgency', 'critical'))
+    keyword_matcher.add('critical', ('department', 'Safety'))
+    assert keyword_matcher.categories('CRITICAL') == [('urgency', 'critical'), ('department', 'Safety')]
+    assert keyword_matcher.find('critical failure') == {('urgency', 'critical'): {'critical'},
+                                                        ('department', 'Safety'): {'critical'}}
@@ -0,0 +1,99 @@
+"""
+Cursor pagination: the pages of one walk partition the documents
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+
+from models.priority_model import DocumentPriorityModel
+from utility.scoring_engine import ScoringEngine
+from utility.scoring_service import ScoringService
+from utility.synthetic_corpus import SyntheticCorpus
+
+AS_OF = date(2025, 1, 1)
+
+
+@pytest.fixture
+def documents():
+    return list(SyntheticCorpus(seed=7, hierarchy_path=None).iter_documents(200))
+
+
+def walk(fetch_page):
+    ids, cursor = [], None
+    while True:
+        page = fetch_page(cursor)
+        ids.extend(result['document_id'] for result in page['results'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return ids
+
+
+def assert_partition(ids, documents):
+    assert len(ids) == len(set(ids))
+    assert set(ids) == {doc['id'] for doc in documents}
+
+
+def test_model_pages_partition_documents(documents):
+    model = DocumentPriorityModel(as_of=AS_OF)
+    ids = walk(lambda cursor: model.batch_score_page(documents, 'Manager', 'Operations',
+                                                     page_size=50, cursor=cursor))
+    assert_partition(ids, documents)
+
+
+def test_engine_pages_partition_documents(documents):
+    engine = ScoringEngine(hierarchy_path='data/department_hierarchy.json')
+    engine.index_documents(documents[:100])
+    profile = {'department': 'Safety', 'role': 'Engineer'}
+    ids = walk(lambda cursor: engine.batch_score_page(documents, profile, page_size=50, cursor=cursor))
+    assert_partition(ids, documents)
+
+
+def test_service_rank_pages_partition_documents(documents):
+    service = ScoringService(ScoringEngine(hierarchy_path='data/department_hierarchy.json'))
+    profile = {'department': 'Finance', 'role': 'Manager'}
+
+    async def walk_service():
+        ids, cursor = [], None
+        while True:
+            status, page = await service.handle_rank({'documents': documents, 'user_profile': profile,
+                                                      'page_size': 50, 'cursor': cursor})
+            assert status == 200
+            ids.extend(result['document_id'] for result in page['results'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return ids
+
+    assert_partition(asyncio.run(walk_service()), documents)
+
+
+def test_pages_rank_one_snapshot(documents):
+    model = DocumentPriorityModel(as_of=AS_OF)
+    scores = []
+    walk(lambda cursor: _record(model.batch_score_page(documents, 'Manager', 'Legal',
+                                                       page_size=40, cursor=cursor), scores))
+    assert scores == sorted(scores, reverse=True)
+
+
+def _record(page, scores):
+    scores.extend(result['priority_score'] for result in page['results'])
+    return page
+
+
+def test_evicted_snapshot_expires_its_cursor(documents):
+    model = DocumentPriorityModel(as_of=AS_OF)
+    model.get_batch_scorer().snapshot_cache_size = 1
+    first = model.batch_score_page(documents, 'Manager', 'Legal', page_size=50)
+    model.batch_score_page(documents, 'Manager', 'Finance', page_size=50)
+
+    with pytest.raises(ValueError, match='Expired cursor'):
+        model.batch_score_page(documents, 'Manager', 'Legal', page_size=50, cursor=first['next_cursor'])
+
+
+def test_cursor_rejects_another_profile(documents):
+    model = DocumentPriorityModel(as_of=AS_OF)
+    first = model.batch_score_page(documents, 'Manager', 'Legal', page_size=50)
+
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        model.batch_score_page(documents, 'Manager', 'Finance', page_size=50, cursor=first['next_cursor'])
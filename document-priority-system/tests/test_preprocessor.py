@@ -0,0 +1,52 @@
+"""
+Parallel preprocessing is a drop-in replacement for the serial path
+"""
+
+import numpy as np
+import pytest
+
+from models.instrumentation import Metrics
+from models.keyword_matcher import KeywordMatcher
+from utility.phrase_stats import PhraseStatistics
+from utility.preprocessor import DocumentPreprocessor
+from utility.synthetic_corpus import SyntheticCorpus
+
+HIERARCHY_PATH = 'data/department_hierarchy.json'
+VOLATILE = ('preprocessed_at',)
+
+
+def preprocess(documents, workers):
+    metrics = Metrics(enabled=True)
+    preprocessor = DocumentPreprocessor(HIERARCHY_PATH, phrase_stats=PhraseStatistics(width=2 ** 16),
+                                        metrics=metrics)
+    processed = preprocessor.preprocess_batch(documents, workers=workers, chunk_size=7)
+    return processed, preprocessor.phrase_stats, metrics
+
+
+@pytest.fixture
+def documents():
+    return list(SyntheticCorpus(seed=13, hierarchy_path=None).iter_documents(60))
+
+
+def test_parallel_matches_serial(documents):
+    serial, serial_stats, serial_metrics = preprocess(documents, workers=1)
+    parallel, parallel_stats, parallel_metrics = preprocess(documents, workers=2)
+
+    strip = lambda docs: [{k: v for k, v in doc.items() if k not in VOLATILE} for doc in docs]
+    assert strip(parallel) == strip(serial)
+    assert parallel_stats.n_docs == serial_stats.n_docs == len(documents)
+    assert np.array_equal(parallel_stats.counts, serial_stats.counts)
+
+    # Worker timers and counters are merged into the parent's registry
+    assert parallel_metrics.counters['documents_preprocessed'] == len(documents)
+    assert parallel_metrics.timers['preprocess.key_phrases'].count == len(documents)
+    assert parallel_metrics.timers['preprocess'].count == serial_metrics.timers['preprocess'].count
+
+
+def test_word_boundary_follows_shared_matcher():
+    matcher = KeywordMatcher(word_boundary=True)
+    assert DocumentPreprocessor(HIERARCHY_PATH, keyword_matcher=matcher).word_boundary is True
+    assert DocumentPreprocessor(HIERARCHY_PATH, keyword_matcher=matcher, word_boundary=True).word_boundary
+
+    with pytest.raises(ValueError):
+        DocumentPreprocessor(HIERARCHY_PATH, keyword_matcher=KeywordMatcher(), word_boundary=True)
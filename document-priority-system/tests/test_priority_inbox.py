@@ -0,0 +1,34 @@
+"""
+Priority inboxes keep only scoring fields and refill after withdrawals
+"""
+
+from datetime import date
+
+from models.batch_scorer import id_sort_key
+from models.priority_model import DocumentPriorityModel
+from utility.priority_inbox import PriorityInboxes
+from utility.synthetic_corpus import SyntheticCorpus
+
+AS_OF = date(2025, 1, 1)
+
+
+def test_inboxes_refill_after_withdrawals():
+    documents = list(SyntheticCorpus(seed=17, hierarchy_path=None).iter_documents(60))
+    for doc in documents:
+        doc['attachment'] = 'x' * 1000
+    inboxes = PriorityInboxes(DocumentPriorityModel(as_of=AS_OF), departments=['Operations', 'Legal'],
+                              size=5, reserve=1, as_of=AS_OF)
+    inboxes.upsert_many(documents)
+    assert all('attachment' not in doc for doc in inboxes.documents.values())
+
+    withdrawn = set()
+    for _ in range(10):
+        top = inboxes.inbox('Legal')[0]['document_id']
+        assert inboxes.withdraw(top)
+        withdrawn.add(top)
+        for department in inboxes.departments:
+            inbox = inboxes.inbox(department)
+            keys = [(-result['priority_score'], id_sort_key(result['document_id'])) for result in inbox]
+            assert len(inbox) == inboxes.size
+            assert keys == sorted(keys)
+            assert not withdrawn & {result['document_id'] for result in inbox}
@@ -0,0 +1,131 @@
+"""
+ProductionBERTEmbedder: length-bucketed batching with a stub model
+"""
+
+import contextlib
+import types
+
+import numpy as np
+import pytest
+
+from models.bert_embedder import ProductionBERTEmbedder, plan_batches
+
+
+class StubTokenizer:
+    """Whitespace tokenizer with the transformers calls the embedder uses"""
+
+    def __call__(self, texts, **kwargs):
+        return {'input_ids': [[len(word) for word in text.split()] for text in texts]}
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [101] + ids + [102]
+
+    def pad(self, features, **kwargs):
+        sequences = features['input_ids']
+        width = max(len(seq) for seq in sequences)
+        input_ids = np.zeros((len(sequences), width), dtype=np.int64)
+        attention_mask = np.zeros_like(input_ids)
+        for i, seq in enumerate(sequences):
+            input_ids[i, :len(seq)] = seq
+            attention_mask[i, :len(seq)] = 1
+        return {'input_ids': input_ids, 'attention_mask': attention_mask}
+
+
+class StubTensor:
+    def __init__(self, array):
+        self.array = array
+
+    def float(self):
+        return self
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+class StubModel:
+    """Embeds the unpadded tokens of each row; records the padded batch shapes"""
+
+    def __init__(self):
+        self.shapes = []
+
+    def __call__(self, features):
+        ids, mask = features['input_ids'], features['attention_mask']
+        self.shapes.append(ids.shape)
+        embedding = np.stack([(ids * mask).sum(axis=1), mask.sum(axis=1), (ids ** 2 * mask).sum(axis=1)], axis=1)
+        return {'sentence_embedding': StubTensor(embedding.astype(np.float32))}
+
+
+def stub_embedder(window=6, chunk_overlap=2, token_budget=24, max_batch_size=4):
+    embedder = ProductionBERTEmbedder.__new__(ProductionBERTEmbedder)
+    embedder.tokenizer = StubTokenizer()
+    embedder.model = StubModel()
+    embedder._torch = types.SimpleNamespace(inference_mode=contextlib.nullcontext)
+    embedder.embedding_dim = 3
+    embedder.window = window
+    embedder.chunk_overlap = chunk_overlap
+    embedder.token_budget = token_budget
+    embedder.max_batch_size = max_batch_size
+    embedder.real_tokens = embedder.padded_tokens = 0
+    return embedder
+
+
+def test_plan_batches_respects_budget_and_covers_all():
+    lengths = np.sort(np.random.default_rng(0).integers(0, 50, size=200))[::-1]
+    spans = list(plan_batches(lengths, token_budget=128, max_batch_size=16))
+    assert spans[0][0] == 0 and spans[-1][1] == len(lengths)
+    for (_, stop), (start, _) in zip(spans, spans[1:]):
+        assert stop == start
+    for start, stop in spans:
+        size = stop - start
+        assert size <= 16
+        assert size == 1 or size * lengths[start] <= 128
+
+
+def test_windows_overlap_and_cover_long_inputs():
+    embedder = stub_embedder(window=6, chunk_overlap=2)
+    assert embedder._windows([1, 2, 3]) == [[1, 2, 3]]
+    tokens = list(range(15))
+    windows = embedder._windows(tokens)
+    assert all(len(window) <= 6 for window in windows)
+    assert sorted(set(token for window in windows for token in window)) == tokens
+    for left, right in zip(windows, windows[1:]):
+        assert left[-2:] == right[:2]
+
+
+def test_bucketed_sequences_match_one_at_a_time():
+    rng = np.random.default_rng(1)
+    sequences = [list(rng.integers(1, 9, size=n)) for n in rng.integers(1, 12, size=30)]
+
+    embedder = stub_embedder()
+    bucketed = embedder._embed_sequences(sequences)
+    single = np.vstack([stub_embedder()._embed_sequences([seq]) for seq in sequences])
+    np.testing.assert_array_equal(bucketed, single)
+
+    for batch_size, width in embedder.model.shapes:
+        assert batch_size <= embedder.max_batch_size
+        assert batch_size == 1 or batch_size * width <= embedder.token_budget
+    assert embedder.real_tokens == sum(len(seq) for seq in sequences)
+    assert embedder.real_tokens <= embedder.padded_tokens
+
+
+def test_long_texts_pool_their_windows():
+    embedder = stub_embedder()
+    texts = ['a bb', ' '.join(['word'] * 20), 'ccc', '']
+    embeddings = embedder._compute_batch(texts)
+    assert embeddings.shape == (4, 3)
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0)
+    np.testing.assert_allclose(embeddings[0], embedder._compute_batch(['a bb'])[0])
+
+    windows = embedder._windows([4] * 20)
+    assert len(windows) > 1
+    pooled = sum(len(window) * embedder._embed_sequences([[101] + window + [102]])[0].astype(np.float64)
+                 for window in windows)
+    np.testing.assert_allclose(embeddings[1], pooled / np.linalg.norm(pooled))
+
+
+def test_requires_local_model_directory(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ProductionBERTEmbedder(str(tmp_path / 'missing'))
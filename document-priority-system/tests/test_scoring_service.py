@@ -0,0 +1,47 @@
+"""
+Micro-batched service handlers: a failing request fails by itself
+"""
+
+import pytest
+
+from utility.scoring_engine import ScoringEngine
+from utility.scoring_service import ScoringService
+from utility.synthetic_corpus import SyntheticCorpus
+
+
+@pytest.fixture
+def service():
+    return ScoringService(ScoringEngine(hierarchy_path='data/department_hierarchy.json'))
+
+
+@pytest.fixture
+def documents():
+    return list(SyntheticCorpus(seed=5, hierarchy_path=None).iter_documents(20))
+
+
+def test_score_batch_isolates_single_request_groups(service, documents):
+    payloads = [
+        {'document': None, 'user_profile': {'department': 'Legal', 'role': 'Manager'}},
+        {'document': documents[0], 'user_profile': {'department': 'Finance', 'role': 'Manager'}}
+    ]
+    results = service._score_batch(payloads)
+    assert isinstance(results[0], Exception)
+    assert 0.0 <= results[1]['priority_score'] <= 1.0
+
+
+def test_rank_batch_isolates_failing_request(service, documents):
+    payloads = [
+        {'documents': documents, 'user_profile': {'department': 'Legal', 'role': 'Manager'}},
+        {'documents': [None], 'user_profile': {'department': 'Legal', 'role': 'Manager'}},
+        {'documents': documents, 'user_profile': {'department': 'Finance', 'role': 'Manager'}}
+    ]
+    results = service._rank_batch(payloads)
+    assert len(results[0]['results']) == len(results[2]['results']) == len(documents)
+    assert isinstance(results[1], Exception)
+
+
+def test_search_batch_isolates_failing_request(service, documents):
+    service.index_documents(documents)
+    results = service._search_batch([{'query': None}, {'query': 'safety inspection', 'top_k': 3}])
+    assert isinstance(results[0], Exception)
+    assert len(results[1]['results']) == 3
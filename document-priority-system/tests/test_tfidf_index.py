@@ -0,0 +1,48 @@
+"""
+TfidfIndex: appended documents use the fitted vocabulary until a refit
+"""
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from models.tfidf_index import TfidfIndex
+from utility.synthetic_corpus import SyntheticCorpus
+
+
+@pytest.fixture
+def texts():
+    return [doc['content'] for doc in SyntheticCorpus(seed=29, hierarchy_path=None).iter_documents(70)]
+
+
+def vectorizer():
+    return TfidfVectorizer(ngram_range=(1, 2), stop_words='english')
+
+
+def test_fit_matches_sklearn(texts):
+    index = TfidfIndex(vectorizer()).fit(texts, keys=list(range(len(texts))))
+    reference = vectorizer().fit(texts)
+    expected = cosine_similarity(reference.transform(texts), reference.transform(['signal maintenance'])).ravel()
+    assert index.query('signal maintenance') == pytest.approx(expected)
+    assert index.query('signal maintenance', rows=[index.row(5), index.row(2)]) == pytest.approx(expected[[5, 2]])
+
+
+def test_append_keeps_vocabulary_then_refits(texts):
+    index = TfidfIndex(vectorizer(), refit_ratio=0.5)
+    index.append(texts[:40])
+    assert index.n_fitted == 40
+
+    # Below the refit ratio: new rows are transformed with the fitted vocabulary
+    index.append(texts[40:55])
+    assert index.n_fitted == 40 and len(index) == 55
+    fitted = vectorizer().fit(texts[:40])
+    expected = cosine_similarity(fitted.transform(texts[:55]), fitted.transform(['safety inspection'])).ravel()
+    assert index.query('safety inspection') == pytest.approx(expected)
+
+    # Past it: the whole corpus is refitted
+    index.append(texts[55:])
+    assert index.n_fitted == len(texts)
+    refitted = vectorizer().fit(texts)
+    expected = cosine_similarity(refitted.transform(texts), refitted.transform(['safety inspection'])).ravel()
+    assert np.allclose(index.query('safety inspection'), expected)
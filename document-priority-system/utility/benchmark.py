@@ -0,0 +1,324 @@
+"""
+Benchmark Suite
+Throughput, latency percentiles and peak memory of the scoring and categorization hot paths
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gc
+import json
+import time
+import platform
+import argparse
+import multiprocessing
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Callable
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from utility.synthetic_corpus import SyntheticCorpus
+
+QUERY = 'emergency track circuit failure safety inspection'
+AS_OF = date(2025, 10, 1)
+
+
+def _document_text(doc: Dict) -> str:
+    """Content relevance text (matches ScoringEngine._document_text)"""
+    return (doc.get('content') or '') + ' ' + (doc.get('title') or '')
+
+
+# ----------------------------------------------------------------------
+# Cases: setup(options) returns a function run on each batch. Imports stay
+# inside the setups so each case only loads what it measures.
+# ----------------------------------------------------------------------
+
+def _setup_batch_score_documents(options: Dict) -> Callable:
+    from models.priority_model import DocumentPriorityModel
+    model = DocumentPriorityModel()
+    return lambda docs: model.batch_score_documents(docs, 'Operations', 'Operations', as_of=AS_OF)
+
+
+def _setup_preprocess_batch(options: Dict) -> Callable:
+    from utility.preprocessor import DocumentPreprocessor
+    preprocessor = DocumentPreprocessor(options['hierarchy'])
+    return lambda docs: preprocessor.preprocess_batch(docs)
+
+
+def _setup_encode_batch(options: Dict) -> Callable:
+    from models.bert_embedder import create_embedder
+    embedder = create_embedder(options['embedder'], **options['embedder_params'])
+    return lambda docs: embedder.encode_batch([_document_text(doc) for doc in docs])
+
+
+def _setup_tfidf(options: Dict) -> Callable:
+    from models.tfidf_index import TfidfIndex
+    index = TfidfIndex()
+
+    def run(docs):
+        # Index the batch, then score it against the query (ScoringEngine.calculate_tfidf_similarity)
+        keys = [doc['id'] for doc in docs]
+        index.append([_document_text(doc) for doc in docs], keys)
+        return index.query(QUERY, [index.row(key) for key in keys])
+    return run
+
+
+def _setup_bm25(options: Dict) -> Callable:
+    from models.bm25_index import BM25Index
+    index = BM25Index(k1=1.5, b=0.75)
+
+    def run(docs):
+        # Index the batch, then score it against the query (ScoringEngine.calculate_bm25_scores)
+        keys = [doc['id'] for doc in docs]
+        index.add_documents([_document_text(doc) for doc in docs], keys)
+        return index.score(QUERY)[[index.doc_number(key) for key in keys]]
+    return run
+
+
+def _setup_categorizer(options: Dict) -> Callable:
+    from models.department_classifier import DepartmentClassifier, DEFAULT_CLASSIFIER_PATH
+    classifier = DepartmentClassifier(options['classifier'] or DEFAULT_CLASSIFIER_PATH)
+    classes = np.asarray(classifier.classes)
+
+    def run(rows):
+        proba = classifier.predict_proba([{'content': text} for text, _ in rows])
+        return int(np.sum(classes[proba.argmax(axis=1)] == np.array([label for _, label in rows])))
+    return run
+
+
+# name: (setup, input kind); 'documents' are sample_documents.json-style
+# dicts, 'labelled' are Document_data.csv-style (text, label) rows
+CASES = {
+    'batch_score_documents': (_setup_batch_score_documents, 'documents'),
+    'preprocess_batch': (_setup_preprocess_batch, 'documents'),
+    'encode_batch': (_setup_encode_batch, 'documents'),
+    'tfidf': (_setup_tfidf, 'documents'),
+    'bm25': (_setup_bm25, 'documents'),
+    'categorizer': (_setup_categorizer, 'labelled')
+}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _batches(corpus: SyntheticCorpus, kind: str, n: int, batch_size: int, start: int = 0):
+    if kind == 'documents':
+        yield from corpus.iter_document_batches(n, batch_size, start)
+        return
+    for offset in range(start, start + n, batch_size):
+        yield list(corpus.iter_labelled(min(batch_size, start + n - offset), offset))
+
+
+def run_case(name: str, n_docs: int, options: Dict) -> Dict:
+    """
+    Time one case over a synthetic corpus of n_docs documents
+
+    The corpus is generated batch by batch and only the case's own call is
+    timed. Warm-up batches (documents beyond n_docs) run first and are not
+    timed.
+
+    Args:
+        name: Case name (see CASES)
+        n_docs: Corpus size
+        options: Benchmark options (seed, batch_size, warmup_batches, ...)
+
+    Returns:
+        Dictionary with throughput, per-batch latency percentiles and peak memory
+    """
+    setup, kind = CASES[name]
+    corpus = SyntheticCorpus(seed=options['seed'], hierarchy_path=options['hierarchy'])
+    batch_size = options['batch_size']
+
+    started = time.perf_counter()
+    run = setup(options)
+    setup_seconds = time.perf_counter() - started
+
+    warmup = options['warmup_batches'] * batch_size
+    for batch in _batches(corpus, kind, warmup, batch_size, start=n_docs):
+        run(batch)
+
+    gc.collect()
+    setup_peak_rss = _peak_rss_mb()
+    latencies = []
+    correct = 0
+    for batch in _batches(corpus, kind, n_docs, batch_size):
+        started = time.perf_counter()
+        output = run(batch)
+        latencies.append(time.perf_counter() - started)
+        if kind == 'labelled':
+            correct += output
+
+    latencies = np.array(latencies)
+    seconds = float(latencies.sum())
+    per_doc = latencies / np.array([min(batch_size, n_docs - i * batch_size) for i in range(len(latencies))])
+    result = {
+        'case': name,
+        'documents': n_docs,
+        'batch_size': batch_size,
+        'batches': len(latencies),
+        'seconds': round(seconds, 6),
+        'docs_per_second': round(n_docs / seconds, 1) if seconds > 0 else None,
+        'setup_seconds': round(setup_seconds, 4),
+        'batch_latency_ms': {
+            f"p{q}": round(float(np.percentile(latencies, q)) * 1e3, 4) for q in (50, 90, 95, 99)
+        },
+        'doc_latency_us_mean': round(float(per_doc.mean()) * 1e6, 3),
+        'peak_rss_mb': _peak_rss_mb(),
+        'setup_peak_rss_mb': setup_peak_rss
+    }
+    result['batch_latency_ms']['max'] = round(float(latencies.max()) * 1e3, 4)
+    if kind == 'labelled':
+        result['accuracy'] = round(correct / n_docs, 4)
+    return result
+
+
+def run_isolated(name: str, n_docs: int, options: Dict) -> Dict:
+    """Run a case in a fresh process so its peak memory is its own"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_case, name, n_docs, options).result()
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float = 0.2,
+            memory_threshold: Optional[float] = None) -> List[Dict]:
+    """
+    Compare results against a baseline run
+
+    A (case, size) regresses when its throughput drops by more than
+    threshold, its p95 batch latency grows by more than threshold, or (with
+    memory_threshold) its peak RSS grows by more than memory_threshold.
+
+    Args:
+        results: Results of this run
+        baseline: A previous benchmark report
+        threshold: Allowed relative slowdown (0.2 = 20%)
+        memory_threshold: Allowed relative peak-memory growth (None: not checked)
+
+    Returns:
+        List of comparison dictionaries (one per case and size in both runs)
+    """
+    previous = {(r['case'], r['documents']): r for r in baseline.get('results', [])}
+    comparisons = []
+    for result in results:
+        base = previous.get((result['case'], result['documents']))
+        if base is None:
+            continue
+        checks = {
+            'docs_per_second': (base['docs_per_second'], result['docs_per_second'], -1, threshold),
+            'p95_batch_ms': (base['batch_latency_ms']['p95'], result['batch_latency_ms']['p95'], 1, threshold)
+        }
+        if memory_threshold is not None and base.get('peak_rss_mb') and result.get('peak_rss_mb'):
+            checks['peak_rss_mb'] = (base['peak_rss_mb'], result['peak_rss_mb'], 1, memory_threshold)
+
+        comparison = {'case': result['case'], 'documents': result['documents'], 'metrics': {}, 'regressed': False}
+        for metric, (old, new, direction, limit) in checks.items():
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = direction * change > limit
+            comparison['metrics'][metric] = {'baseline': old, 'current': new,
+                                             'change': round(change, 4), 'regressed': regressed}
+            comparison['regressed'] |= regressed
+        comparisons.append(comparison)
+    return comparisons
+
+
+def environment() -> Dict:
+    """Machine and library versions, recorded with every report"""
+    import sklearn
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'scikit_learn': sklearn.__version__
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scoring and categorization hot paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help="Corpus sizes (documents), e.g. 1000 10000 100000")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--warmup-batches', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--hierarchy', default='data/department_hierarchy.json')
+    parser.add_argument('--embedder', default='simulated', help="encode_batch backend (see create_embedder)")
+    parser.add_argument('--embedder-params', default='{}', help="JSON keyword arguments for the embedder")
+    parser.add_argument('--classifier', default=None, help="Categorization Module artifact for the categorizer case")
+    parser.add_argument('--in-process', action='store_true',
+                        help="Run cases in this process (faster start-up; peak memory is then cumulative)")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=None, help="Previous report to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Allowed relative throughput / p95 latency regression")
+    parser.add_argument('--memory-threshold', type=float, default=None,
+                        help="Allowed relative peak-memory growth (default: not checked)")
+    args = parser.parse_args()
+
+    options = {
+        'seed': args.seed,
+        'batch_size': args.batch_size,
+        'warmup_batches': args.warmup_batches,
+        'hierarchy': args.hierarchy,
+        'embedder': args.embedder,
+        'embedder_params': json.loads(args.embedder_params),
+        'classifier': args.classifier
+    }
+
+    results = []
+    for n_docs in args.sizes:
+        for name in args.cases:
+            print(f"[bench] {name} on {n_docs} documents...", file=sys.stderr)
+            result = run_case(name, n_docs, options) if args.in_process else run_isolated(name, n_docs, options)
+            results.append(result)
+            latency = result['batch_latency_ms']
+            print(f"[bench]   {result['docs_per_second']} docs/sec, batch p50 {latency['p50']} ms, "
+                  f"p95 {latency['p95']} ms, peak RSS {result['peak_rss_mb']} MB", file=sys.stderr)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'options': options,
+        'results': results
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        comparisons = compare(results, baseline, args.threshold, args.memory_threshold)
+        report['baseline'] = {'path': args.baseline, 'created': baseline.get('created'),
+                              'threshold': args.threshold, 'memory_threshold': args.memory_threshold,
+                              'comparisons': comparisons}
+        for comparison in comparisons:
+            for metric, values in comparison['metrics'].items():
+                flag = 'REGRESSION' if values['regressed'] else 'ok'
+                print(f"[bench] {comparison['case']} ({comparison['documents']}) {metric}: "
+                      f"{values['baseline']} -> {values['current']} ({values['change']:+.1%}) {flag}",
+                      file=sys.stderr)
+        if any(comparison['regressed'] for comparison in comparisons):
+            exit_code = 1
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] Report saved to {args.output}", file=sys.stderr)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,571 @@
+"""
+Streaming Ingest Pipeline
+NDJSON / chunked JSON → preprocess → categorize → score → sink, in bounded memory
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+from itertools import chain, count, islice
+from typing import List, Dict, Optional, Iterable, Iterator, Callable, TextIO, Union
+from models.priority_model import DocumentPriorityModel
+from models.text_features import TokenizedBatch
+from models.department_classifier import DepartmentClassifier
+from utility.preprocessor import DocumentPreprocessor
+
+Source = Union[str, TextIO]
+
+# Start of the document array inside a {"documents": [...]} file
+_DOCUMENTS_KEY = re.compile(r'"documents"\s*:\s*\[')
+_WHITESPACE = re.compile(r'\s*')
+
+
+def _open_source(source: Source):
+    """Open a path ('-' for stdin) or pass an open text stream through"""
+    if not isinstance(source, str):
+        return source, False
+    if source == '-':
+        return sys.stdin, False
+    return open(source, 'r', encoding='utf-8'), True
+
+
+def iter_ndjson(source: Source) -> Iterator[Dict]:
+    """
+    Stream records from newline-delimited JSON
+
+    Args:
+        source: File path, '-' for stdin, or an open text stream
+
+    Yields:
+        One dictionary per non-blank line
+    """
+    stream, owned = _open_source(source)
+    try:
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e.msg}") from e
+    finally:
+        if owned:
+            stream.close()
+
+
+class _ValueScanner:
+    """
+    Finds where a JSON value ends, fed one piece of text at a time
+
+    Nesting depth and string / escape state carry over between pieces, so
+    a value split over many reads is scanned once in total and decoded only
+    when it is complete.
+    """
+
+    _OUTSIDE_STRING = re.compile(r'["{}\[\],\s]')
+    _INSIDE_STRING = re.compile(r'["\\]')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False        # the last piece ended inside a string escape
+
+    def feed(self, text: str, start: int = 0) -> Optional[int]:
+        """Return the offset in text just past the value, or None if it continues"""
+        i, n = start, len(text)
+        if self.escaped and i < n:
+            i += 1
+            self.escaped = False
+        while i < n:
+            if self.in_string:
+                match = self._INSIDE_STRING.search(text, i)
+                if match is None:
+                    return None
+                if match.group() == '\\':
+                    i = match.end() + 1
+                    if i > n:
+                        self.escaped = True
+                    continue
+                self.in_string = False
+                i = match.end()
+                if self.depth == 0:
+                    return i
+            else:
+                match = self._OUTSIDE_STRING.search(text, i)
+                if match is None:
+                    return None
+                char = match.group()
+                if char == '"':
+                    self.in_string = True
+                elif char in '{[':
+                    self.depth += 1
+                elif self.depth == 0:
+                    # A number or literal ends at the delimiter after it
+                    return match.start()
+                elif char in '}]':
+                    self.depth -= 1
+                    if self.depth == 0:
+                        return match.end()
+                i = match.end()
+        return None
+
+
+def iter_json_documents(source: Source, read_size: int = 1 << 16) -> Iterator[Dict]:
+    """
+    Stream the elements of a JSON array without loading the whole file
+
+    Accepts a top-level array or an object with a "documents" array (the
+    sample_documents.json layout). The file is read in read_size chunks and
+    each element is decoded as soon as it is complete, so memory is bounded
+    by the largest single record. Element boundaries are found by a
+    bracket / string scanner that resumes where the previous read stopped,
+    so an element spanning many reads costs time linear in its size.
+
+    Args:
+        source: File path, '-' for stdin, or an open text stream
+        read_size: Characters read per chunk
+
+    Yields:
+        One dictionary per array element
+    """
+    stream, owned = _open_source(source)
+    decoder = json.JSONDecoder()
+    scanner = _ValueScanner()
+    buffer = ''
+    eof = False
+
+    def read():
+        nonlocal eof
+        chunk = stream.read(read_size)
+        if not chunk:
+            eof = True
+        return chunk
+
+    try:
+        # Find the opening bracket of the array
+        while True:
+            stripped = buffer.lstrip()
+            if stripped.startswith('['):
+                pos = len(buffer) - len(stripped) + 1
+                break
+            match = _DOCUMENTS_KEY.search(buffer)
+            if match:
+                pos = match.end()
+                break
+            if eof:
+                raise ValueError("No JSON array or \"documents\" array found")
+            buffer += read()
+
+        expect_value = True     # at the start of the array or just after a comma
+        first = True
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                if eof:
+                    raise ValueError("Unterminated JSON array")
+                buffer, pos = read(), 0
+                continue
+            if buffer[pos] == ']':
+                if expect_value and not first:
+                    raise ValueError("Trailing comma in JSON array")
+                return
+            if not expect_value:
+                if buffer[pos] != ',':
+                    raise ValueError(f"Expected ',' or ']' between array elements, got {buffer[pos]!r}")
+                pos += 1
+                expect_value = True
+                continue
+            if buffer[pos] == ',':
+                raise ValueError("Missing value in JSON array")
+
+            # Scan each new piece once; join them only when the element is complete
+            end = scanner.feed(buffer, pos)
+            if end is None:
+                pieces = [buffer[pos:]]
+                while end is None:
+                    if eof:
+                        raise ValueError("Unterminated JSON array")
+                    chunk = read()
+                    if chunk:
+                        pieces.append(chunk)
+                        end = scanner.feed(chunk)
+                buffer, pos = ''.join(pieces), 0
+            scanner.reset()
+
+            record, pos = decoder.raw_decode(buffer, pos)
+            expect_value = first = False
+            yield record
+    finally:
+        if owned:
+            stream.close()
+
+
+def read_records(source: Source, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Stream records from NDJSON or a JSON array file
+
+    Args:
+        source: File path, '-' for stdin, or an open text stream
+        fmt: 'ndjson' or 'json'; by default '.json' paths are read as JSON
+             arrays and everything else as NDJSON
+    """
+    if fmt is None:
+        fmt = 'json' if isinstance(source, str) and source.endswith('.json') else 'ndjson'
+    if fmt == 'json':
+        return iter_json_documents(source)
+    if fmt == 'ndjson':
+        return iter_ndjson(source)
+    raise ValueError(f"Unknown input format: {fmt}")
+
+
+def micro_batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    """Group an iterable into lists of at most batch_size items"""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def tag_mentioned_departments(documents: List[Dict]) -> List[Dict]:
+    """
+    Default categorizer: route untagged documents to the departments they mention
+
+    Documents that already carry tagged_departments keep them; others are
+    tagged with the departments whose keywords the preprocessor found.
+    """
+    for doc in documents:
+        if not doc.get('tagged_departments'):
+            doc['tagged_departments'] = list(doc.get('mentioned_departments', []))
+    return documents
+
+
+class JSONLinesSink:
+    """Write result records as NDJSON to a file path or text stream"""
+
+    def __init__(self, target: Source, flush_every_batch: bool = False):
+        if isinstance(target, str):
+            self.stream = open(target, 'w', encoding='utf-8')
+            self._owned = True
+        else:
+            self.stream = target
+            self._owned = False
+        self.flush_every_batch = flush_every_batch
+        self.records_written = 0
+
+    def write_batch(self, records: List[Dict]) -> None:
+        self.stream.write(''.join(json.dumps(record, default=str) + '\n' for record in records))
+        if self.flush_every_batch:
+            self.stream.flush()
+        self.records_written += len(records)
+
+    def close(self) -> None:
+        if self._owned:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StdoutSink(JSONLinesSink):
+    """NDJSON on standard output, flushed after every batch"""
+
+    def __init__(self):
+        super().__init__(sys.stdout, flush_every_batch=True)
+
+
+class _Failure:
+    """Carries a stage's exception downstream to the consumer"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_DONE = object()
+
+
+class IngestPipeline:
+    """
+    Generator-based streaming pipeline: parse → preprocess → categorize → score
+
+    Records flow in micro-batches through one thread per stage. Stages are
+    connected by bounded queues (queue_size batches each), so a slow stage
+    blocks the ones before it instead of letting batches pile up, and peak
+    memory is set by batch_size and queue_size rather than by corpus size.
+    Preprocessing can fan out to worker processes (see
+    DocumentPreprocessor.iter_preprocess).
+
+    Scoring uses DocumentPriorityModel's batch path against every department.
+    Scored documents join the model's BM25 corpus; only the most recent
+    bm25_window documents are kept there, so corpus statistics follow the
+    stream without growing with it. Records without an id are indexed
+    under a synthetic key and retired like any other.
+
+    Each batch is tokenized once (TokenizedBatch) in the categorize stage;
+    the same tokens feed the categorizer, when it has a
+    categorize_tokenized(documents, tokenized) method (e.g.
+    DepartmentClassifier), and the BM25 / Jaccard scoring components.
+
+    categorizer is any callable taking and returning a list of preprocessed
+    documents; it should fill 'tagged_departments'.
+    """
+
+    def __init__(self, preprocessor: Optional[DocumentPreprocessor] = None,
+                 model: Optional[DocumentPriorityModel] = None,
+                 categorizer: Optional[Callable[[List[Dict]], List[Dict]]] = None,
+                 departments: Optional[List[str]] = None, batch_size: int = 256,
+                 queue_size: int = 4, workers: Optional[int] = None,
+                 bm25_window: int = 100000, as_of=None,
+                 hierarchy_path: str = 'data/department_hierarchy.json'):
+        self.preprocessor = preprocessor if preprocessor is not None else DocumentPreprocessor(hierarchy_path)
+        self.model = model if model is not None else DocumentPriorityModel()
+        self.categorizer = categorizer if categorizer is not None else tag_mentioned_departments
+        self.departments = list(departments if departments is not None else self.model.role_relevance_matrix)
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.workers = workers
+        self.bm25_window = bm25_window
+        self.as_of = as_of
+
+        self._window = deque()      # (key, term counts) of documents in the BM25 corpus, oldest first
+        self._anonymous = count()   # synthetic keys for records without an id
+        self.stats = {}
+
+    # ------------------------------------------------------------------
+    # Stages: each maps an iterator of batches to an iterator of batches
+    # ------------------------------------------------------------------
+
+    def _preprocess_stage(self, batches: Iterator[List[Dict]]) -> Iterator[List[Dict]]:
+        documents = chain.from_iterable(batches)
+        processed = self.preprocessor.iter_preprocess(documents, workers=self.workers,
+                                                      chunk_size=self.batch_size,
+                                                      max_pending=self.queue_size)
+        return micro_batches(processed, self.batch_size)
+
+    def _categorize_stage(self, batches: Iterator[List[Dict]]) -> Iterator[tuple]:
+        categorize_tokenized = getattr(self.categorizer, 'categorize_tokenized', None)
+        for batch in batches:
+            tokenized = TokenizedBatch(batch)
+            if categorize_tokenized is not None:
+                batch = categorize_tokenized(batch, tokenized)
+            else:
+                batch = self.categorizer(batch)
+            yield batch, tokenized
+
+    def _score_stage(self, batches: Iterator[tuple]) -> Iterator[List[Dict]]:
+        for batch, tokenized in batches:
+            keys = self._window_keys(batch)
+            self.model.index_documents(batch, tokenized.term_counts, keys=keys)
+            matrix = self.model.score_matrix(batch, self.departments, as_of=self.as_of,
+                                             term_counts=tokenized.term_counts)
+            yield self._results(batch, matrix)
+            self._slide_window(keys, tokenized.term_counts)
+
+    def _results(self, batch: List[Dict], matrix: Dict) -> List[Dict]:
+        scores = matrix['priority_score'].round(4).tolist()
+        labels = matrix['priority_label'].tolist()
+        results = []
+        for doc, doc_scores, doc_labels in zip(batch, scores, labels):
+            results.append({
+                'document_id': doc.get('id'),
+                'title': doc.get('title'),
+                'source_department': doc.get('source_department'),
+                'document_type': doc.get('document_type'),
+                'deadline': doc.get('deadline'),
+                'tagged_departments': doc.get('tagged_departments', []),
+                'urgency_level': doc['extracted_urgency']['urgency_level'],
+                'key_phrases': doc.get('key_phrases', []),
+                'priority_scores': dict(zip(self.departments, doc_scores)),
+                'priority_labels': dict(zip(self.departments, doc_labels))
+            })
+        return results
+
+    def _window_keys(self, batch: List[Dict]) -> List:
+        """BM25 index keys: the document id, or a synthetic key when it has none"""
+        # JSON ids are never tuples, so synthetic keys cannot collide with them
+        return [doc['id'] if doc.get('id') is not None else ('__anonymous__', next(self._anonymous))
+                for doc in batch]
+
+    def _slide_window(self, keys: List, term_counts: List) -> None:
+        """Retire the oldest documents once the BM25 corpus exceeds bm25_window"""
+        bm25_index = self.model.bm25_index
+        self._window.extend(zip(keys, term_counts))
+
+        removed = False
+        while len(self._window) > self.bm25_window:
+            key, tokens = self._window.popleft()
+            removed |= bm25_index.remove(key, tokens)
+        # Release retired document numbers once they dominate the index
+        if removed and bm25_index.n_retired > len(bm25_index):
+            bm25_index.compact()
+
+    # ------------------------------------------------------------------
+    # Threaded execution
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _put(out_queue: queue.Queue, item, stop: threading.Event, blocked: List[float]) -> bool:
+        """Blocking put that gives up once the pipeline is stopped"""
+        started = time.perf_counter()
+        try:
+            while not stop.is_set():
+                try:
+                    out_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            blocked[0] += time.perf_counter() - started
+
+    @staticmethod
+    def _drain(in_queue: queue.Queue, stop: threading.Event, waited: List[float]) -> Iterator[List[Dict]]:
+        """Iterate batches from a queue until the end marker"""
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                item = in_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            finally:
+                waited[0] += time.perf_counter() - started
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+
+    def _run_stage(self, name: str, batches: Iterator[List[Dict]], out_queue: queue.Queue,
+                   stop: threading.Event, waited: List[float]) -> None:
+        busy = 0.0
+        blocked = [0.0]
+        try:
+            while True:
+                started = time.perf_counter()
+                batch = next(batches, _DONE)
+                busy += time.perf_counter() - started
+                if batch is _DONE:
+                    break
+                if not self._put(out_queue, batch, stop, blocked):
+                    return
+            self._put(out_queue, _DONE, stop, blocked)
+        except BaseException as e:
+            self._put(out_queue, _Failure(e), stop, blocked)
+        finally:
+            # Working time excludes waiting for input; blocked time is backpressure
+            self.stats['stage_seconds'][name] = round(busy - waited[0], 4)
+            self.stats['blocked_seconds'][name] = round(blocked[0], 4)
+
+    def iter_results(self, records: Iterable[Dict]) -> Iterator[List[Dict]]:
+        """
+        Run the pipeline over a record stream
+
+        Args:
+            records: Any iterable of document dictionaries (e.g. read_records())
+
+        Yields:
+            Batches of result records, in input order
+        """
+        stop = threading.Event()
+        stages = [
+            ('parse', lambda _: micro_batches(records, self.batch_size)),
+            ('preprocess', self._preprocess_stage),
+            ('categorize', self._categorize_stage),
+            ('score', self._score_stage)
+        ]
+
+        self.stats = {'documents': 0, 'batches': 0, 'stage_seconds': {}, 'blocked_seconds': {}}
+        threads = []
+        upstream = None
+        for name, stage in stages:
+            out_queue = queue.Queue(maxsize=self.queue_size)
+            waited = [0.0]
+            batches = stage(self._drain(upstream, stop, waited) if upstream is not None else None)
+            thread = threading.Thread(target=self._run_stage,
+                                      args=(name, batches, out_queue, stop, waited),
+                                      name=f"ingest-{name}", daemon=True)
+            threads.append(thread)
+            upstream = out_queue
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            for batch in self._drain(upstream, stop, [0.0]):
+                self.stats['documents'] += len(batch)
+                self.stats['batches'] += 1
+                yield batch
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            self.stats['seconds'] = round(elapsed, 4)
+            self.stats['docs_per_second'] = round(self.stats['documents'] / elapsed, 1) if elapsed > 0 else 0.0
+
+    def run(self, records: Iterable[Dict], sink) -> Dict:
+        """
+        Stream records through the pipeline into a sink
+
+        Args:
+            records: Any iterable of document dictionaries
+            sink: Object with write_batch(records) and close()
+
+        Returns:
+            Run statistics (documents, batches, seconds, docs_per_second and
+            per-stage working / blocked seconds)
+        """
+        try:
+            for batch in self.iter_results(records):
+                sink.write_batch(batch)
+        finally:
+            sink.close()
+        return self.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream documents through preprocessing, categorization and priority scoring")
+    parser.add_argument('input', help="NDJSON or JSON array file ('-' for NDJSON on stdin)")
+    parser.add_argument('--format', choices=['ndjson', 'json'], default=None,
+                        help="Input format (default: by file extension)")
+    parser.add_argument('--output', default='-', help="NDJSON output file ('-' for stdout)")
+    parser.add_argument('--hierarchy', default='data/department_hierarchy.json')
+    parser.add_argument('--departments', nargs='+', default=None, help="Departments to score for")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--queue-size', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=None, help="Preprocessing worker processes")
+    parser.add_argument('--bm25-window', type=int, default=100000)
+    parser.add_argument('--classifier', default=None,
+                        help="Categorization Module artifact used to tag documents "
+                             "(default: tag the departments each document mentions)")
+    args = parser.parse_args()
+
+    categorizer = DepartmentClassifier(args.classifier) if args.classifier else None
+    pipeline = IngestPipeline(categorizer=categorizer, departments=args.departments, batch_size=args.batch_size,
+                              queue_size=args.queue_size, workers=args.workers,
+                              bm25_window=args.bm25_window, hierarchy_path=args.hierarchy)
+    sink = StdoutSink() if args.output == '-' else JSONLinesSink(args.output)
+    stats = pipeline.run(read_records(args.input, args.format), sink)
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
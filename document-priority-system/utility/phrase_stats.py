@@ -0,0 +1,180 @@
+"""
+Phrase Statistics
+Streaming corpus-level n-gram document frequencies for key-phrase salience
+"""
+
+import hashlib
+import numpy as np
+from typing import List, Iterable, Tuple
+
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_COMBINE = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (uint64 arithmetic wraps)"""
+    x = (x ^ (x >> np.uint64(30))) * _MIX_1
+    x = (x ^ (x >> np.uint64(27))) * _MIX_2
+    return x ^ (x >> np.uint64(31))
+
+
+class PhraseStatistics:
+    """
+    Hashed n-gram document-frequency counter
+
+    Phrases are hashed into a fixed-size counter array, so memory does not
+    grow with the corpus vocabulary. depth=1 is a plain hashed counter;
+    depth > 1 turns it into a count-min sketch (each phrase updates one
+    bucket per row and its frequency is the minimum over rows), which
+    bounds the overestimate caused by collisions. Counts are updated one
+    document at a time, so statistics are always current for streamed input.
+
+    Phrase hashes are rolled from per-word hashes with array operations;
+    phrase strings are only built for the phrases that are returned.
+    """
+
+    def __init__(self, width: int = 2 ** 20, depth: int = 1, ngram_range: Tuple[int, int] = (2, 3),
+                 word_cache_size: int = 200000):
+        self.width = width
+        self.depth = depth
+        self.ngram_range = ngram_range
+        self.word_cache_size = word_cache_size
+
+        self.counts = np.zeros((depth, width), dtype=np.uint32)
+        self.n_docs = 0
+        self._word_hashes = {}
+
+    def _word_hash(self, word: str) -> int:
+        value = self._word_hashes.get(word)
+        if value is None:
+            value = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+            if len(self._word_hashes) >= self.word_cache_size:
+                self._word_hashes.clear()
+            self._word_hashes[word] = value
+        return value
+
+    def phrase_hashes(self, words: List[str]):
+        """
+        64-bit hashes of all n-grams, shortest first, in text order
+
+        Returns:
+            Tuple of (hashes, start word index, n-gram length) arrays
+        """
+        low, high = self.ngram_range
+        word_hashes = np.fromiter((self._word_hash(word) for word in words),
+                                  dtype=np.uint64, count=len(words))
+
+        hashes, starts, lengths = [], [], []
+        rolling = word_hashes
+        for n in range(2, high + 1):
+            if len(rolling) < 2:
+                break
+            rolling = _mix(rolling[:-1] * _COMBINE + word_hashes[n - 1:])
+            if n >= low:
+                hashes.append(rolling)
+                starts.append(np.arange(len(rolling)))
+                lengths.append(np.full(len(rolling), n))
+        if low <= 1 and len(word_hashes):
+            hashes.insert(0, _mix(word_hashes))
+            starts.insert(0, np.arange(len(word_hashes)))
+            lengths.insert(0, np.ones(len(word_hashes), dtype=int))
+
+        if not hashes:
+            empty = np.empty(0, dtype=np.intp)
+            return np.empty(0, dtype=np.uint64), empty, empty
+        return np.concatenate(hashes), np.concatenate(starts), np.concatenate(lengths)
+
+    def _buckets(self, hashes: np.ndarray) -> np.ndarray:
+        """Counter bucket of each hash per row, shape (depth, len(hashes))"""
+        # Double hashing: row r uses h1 + r * h2
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.intp)
+
+    def _add(self, buckets: np.ndarray) -> None:
+        for row in range(self.depth):
+            np.add.at(self.counts[row], buckets[row], 1)
+        self.n_docs += 1
+
+    def _frequencies(self, buckets: np.ndarray) -> np.ndarray:
+        return self.counts[np.arange(self.depth)[:, None], buckets].min(axis=0)
+
+    def add_document(self, words: List[str]) -> None:
+        """Count each distinct phrase of one tokenized document once"""
+        self._add(self._buckets(np.unique(self.phrase_hashes(words)[0])))
+
+    def add_documents(self, documents: Iterable[List[str]]) -> None:
+        """Stream several tokenized documents into the counter"""
+        for words in documents:
+            self.add_document(words)
+
+    def _sequence_hash(self, words: List[str]) -> np.uint64:
+        """Hash of one whole phrase, as produced by phrase_hashes"""
+        hashes = np.array([self._word_hash(word) for word in words], dtype=np.uint64)
+        if len(hashes) == 1:
+            return _mix(hashes)[0]
+        value = hashes[:1]
+        for word_hash in hashes[1:]:
+            value = _mix(value * _COMBINE + word_hash)
+        return value[0]
+
+    def document_frequency(self, phrases: List[str]) -> np.ndarray:
+        """Estimated number of documents containing each phrase (never underestimated)"""
+        hashes = np.array([self._sequence_hash(phrase.split()) for phrase in phrases], dtype=np.uint64)
+        return self._frequencies(self._buckets(hashes))
+
+    def key_phrases(self, words: List[str], top_n: int = 10, update: bool = True) -> List[str]:
+        """
+        Rank one tokenized document's phrases by TF-IDF salience
+
+        Args:
+            words: Document tokens
+            top_n: Number of phrases to return
+            update: Count the document into the corpus statistics first
+
+        Returns:
+            Most salient phrases; ties keep first-occurrence order
+        """
+        hashes, starts, lengths = self.phrase_hashes(words)
+        if len(hashes) == 0 or top_n <= 0:
+            return []
+
+        unique, first, term_freq = np.unique(hashes, return_index=True, return_counts=True)
+        buckets = self._buckets(unique)
+        if update:
+            self._add(buckets)
+        salience = term_freq * (np.log((1 + self.n_docs) / (1 + self._frequencies(buckets))) + 1)
+
+        # Bounded selection: only phrases tied with the top_n-th salience are sorted
+        if top_n < len(unique):
+            threshold = np.partition(salience, len(unique) - top_n)[len(unique) - top_n]
+            candidates = np.flatnonzero(salience >= threshold)
+        else:
+            candidates = np.arange(len(unique))
+        best = candidates[np.lexsort((first[candidates], -salience[candidates]))][:top_n]
+
+        return [' '.join(words[starts[i]:starts[i] + lengths[i]]) for i in first[best]]
+
+    def merge(self, other: 'PhraseStatistics') -> None:
+        """Add another counter's statistics (e.g. from a parallel worker)"""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge phrase statistics with different shapes")
+        self.counts += other.counts
+        self.n_docs += other.n_docs
+
+    def save(self, filepath: str) -> None:
+        """Save the counter to an .npz file"""
+        np.savez_compressed(filepath, counts=self.counts, n_docs=self.n_docs,
+                            ngram_range=np.array(self.ngram_range))
+
+    @classmethod
+    def load(cls, filepath: str) -> 'PhraseStatistics':
+        """Restore a counter saved with save()"""
+        data = np.load(filepath)
+        depth, width = data['counts'].shape
+        stats = cls(width=width, depth=depth, ngram_range=tuple(int(n) for n in data['ngram_range']))
+        stats.counts = data['counts']
+        stats.n_docs = int(data['n_docs'])
+        return stats
@@ -5,12 +5,64 @@ Handles text cleaning, normalization, and feature extraction
 
 import re
 import json
-from typing import List, Dict, Set
+import heapq
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Dict, Set, Optional, Iterable, Iterator
 from datetime import datetime
+from models.keyword_matcher import KeywordMatcher
+from models.instrumentation import Metrics, METRICS
+from utility.phrase_stats import PhraseStatistics
+
+# Per-process preprocessor for pool workers, built once by _init_worker
+_worker_preprocessor = None
+
+
+def _init_worker(hierarchy_path: str, word_boundary: bool, metrics_enabled: bool,
+                 metrics_buckets: List[float]) -> None:
+    """Pool initializer: load the hierarchy once per worker process"""
+    global _worker_preprocessor
+    _worker_preprocessor = DocumentPreprocessor(hierarchy_path, word_boundary=word_boundary,
+                                                metrics=Metrics(metrics_enabled, metrics_buckets))
+
+
+def _preprocess_chunk(documents: List[Dict], key_phrases: bool):
+    """Pool task: preprocess one chunk; returns (documents, metrics recorded meanwhile)"""
+    processed = [_worker_preprocessor.preprocess_document(doc, key_phrases=key_phrases)
+                 for doc in documents]
+    return processed, _worker_preprocessor.metrics.drain()
+
 
 class DocumentPreprocessor:
-    def __init__(self, hierarchy_path='data/department_hierarchy.json'):
-        """Initialize preprocessor with department hierarchy"""
+    def __init__(self, hierarchy_path='data/department_hierarchy.json',
+                 keyword_matcher: Optional[KeywordMatcher] = None, word_boundary: Optional[bool] = None,
+                 phrase_stats: Optional[PhraseStatistics] = None, learn_phrases: bool = True,
+                 metrics: Optional[Metrics] = None):
+        """
+        Initialize preprocessor with department hierarchy
+        
+        Urgency keywords and department tags are compiled into one keyword
+        automaton (shared with other components when keyword_matcher is
+        given), so a document is scanned once for both. word_boundary
+        defaults to the shared matcher's setting (False without one); a
+        conflicting value raises ValueError. With phrase_stats, key phrases
+        are ranked by TF-IDF salience against corpus statistics, which every
+        extracted document updates when learn_phrases is set. Per-stage
+        timings go to metrics (the process-wide registry by default).
+        """
+        self.hierarchy_path = hierarchy_path
+        self.metrics = metrics if metrics is not None else METRICS
+        if keyword_matcher is None:
+            word_boundary = bool(word_boundary)
+        elif word_boundary is None:
+            word_boundary = keyword_matcher.word_boundary
+        elif word_boundary != keyword_matcher.word_boundary:
+            raise ValueError(f"word_boundary={word_boundary} conflicts with the shared keyword_matcher "
+                             f"(word_boundary={keyword_matcher.word_boundary})")
+        self.word_boundary = word_boundary
+        self.phrase_stats = phrase_stats
+        self.learn_phrases = learn_phrases
         self.stop_words = self._load_stop_words()
         
         # Load department hierarchy
@@ -27,6 +79,10 @@ class DocumentPreprocessor:
                 'low': ['information', 'fyi', 'reference']
             }
             self.dept_tags = {}
+        
+        self.keyword_matcher = keyword_matcher if keyword_matcher is not None else KeywordMatcher(word_boundary)
+        self.keyword_matcher.add_groups(self.urgency_keywords, 'urgency')
+        self.keyword_matcher.add_groups(self.dept_tags, 'department')
     
     def _load_stop_words(self) -> Set[str]:
         """Load common stop words"""
@@ -82,17 +138,31 @@ class DocumentPreprocessor:
         filtered_words = [word for word in words if word not in self.stop_words]
         return ' '.join(filtered_words)
     
-    def extract_urgency_signals(self, text: str) -> Dict[str, any]:
+    def match_keywords(self, text: str) -> Dict:
+        """
+        Find urgency, department (and any shared) keywords in one pass
+        
+        Args:
+            text: Document text
+            
+        Returns:
+            Dictionary mapping (kind, name) categories to matched keywords
+        """
+        return self.keyword_matcher.find(text)
+    
+    def extract_urgency_signals(self, text: str, matches: Optional[Dict] = None) -> Dict[str, any]:
         """
         Extract urgency signals from text
         
         Args:
             text: Document text
+            matches: Optional precomputed match_keywords(text) result
             
         Returns:
             Dictionary with urgency level and score
         """
-        text_lower = text.lower()
+        if matches is None:
+            matches = self.match_keywords(text)
         
         urgency_scores = {
             'critical': 0,
@@ -102,10 +172,8 @@ class DocumentPreprocessor:
         }
         
         # Count urgency keywords
-        for level, keywords in self.urgency_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    urgency_scores[level] += 1
+        for level in self.urgency_keywords:
+            urgency_scores[level] = len(matches.get(('urgency', level), ()))
         
         # Determine dominant urgency level
         max_score = max(urgency_scores.values())
@@ -127,27 +195,21 @@ class DocumentPreprocessor:
             'keyword_counts': urgency_scores
         }
     
-    def extract_department_mentions(self, text: str) -> List[str]:
+    def extract_department_mentions(self, text: str, matches: Optional[Dict] = None) -> List[str]:
         """
         Extract mentioned departments from text
         
         Args:
             text: Document text
+            matches: Optional precomputed match_keywords(text) result
             
         Returns:
             List of department names found in text
         """
-        mentioned_depts = []
-        text_lower = text.lower()
-        
-        for dept, keywords in self.dept_tags.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    if dept not in mentioned_depts:
-                        mentioned_depts.append(dept)
-                    break
+        if matches is None:
+            matches = self.match_keywords(text)
         
-        return mentioned_depts
+        return [dept for dept in self.dept_tags if ('department', dept) in matches]
     
     def extract_dates(self, text: str) -> List[str]:
         """
@@ -175,7 +237,10 @@ class DocumentPreprocessor:
     
     def extract_key_phrases(self, text: str, top_n: int = 10) -> List[str]:
         """
-        Extract key phrases from text (simple n-gram approach)
+        Extract key phrases from text (bigrams and trigrams)
+        
+        Phrases are ranked by TF-IDF salience when corpus phrase statistics
+        are configured, otherwise by raw frequency.
         
         Args:
             text: Document text
@@ -190,78 +255,145 @@ class DocumentPreprocessor:
         # Remove stop words
         no_stops = self.remove_stop_words(clean)
         
-        # Extract bigrams and trigrams
-        words = no_stops.split()
-        phrases = []
-        
-        # Bigrams
-        for i in range(len(words) - 1):
-            phrases.append(f"{words[i]} {words[i+1]}")
-        
-        # Trigrams
-        for i in range(len(words) - 2):
-            phrases.append(f"{words[i]} {words[i+1]} {words[i+2]}")
-        
-        # Count frequency
-        phrase_counts = {}
-        for phrase in phrases:
-            phrase_counts[phrase] = phrase_counts.get(phrase, 0) + 1
+        return self._rank_phrases(no_stops.split(), top_n)
+    
+    def _rank_phrases(self, words: List[str], top_n: int) -> List[str]:
+        """Key phrases of cleaned, stop-word free tokens (see extract_key_phrases)"""
+        if self.phrase_stats is not None:
+            return self.phrase_stats.key_phrases(words, top_n, update=self.learn_phrases)
         
-        # Sort by frequency
-        sorted_phrases = sorted(phrase_counts.items(), key=lambda x: x[1], reverse=True)
+        # Extract bigrams and trigrams
+        phrases = [f"{a} {b}" for a, b in zip(words, words[1:])]
+        phrases += [f"{a} {b} {c}" for a, b, c in zip(words, words[1:], words[2:])]
         
-        return [phrase for phrase, count in sorted_phrases[:top_n]]
+        # Top phrases by frequency (bounded heap; ties keep first occurrence)
+        phrase_counts = Counter(phrases)
+        return heapq.nlargest(top_n, phrase_counts, key=phrase_counts.get)
     
-    def preprocess_document(self, document: Dict) -> Dict:
+    def preprocess_document(self, document: Dict, key_phrases: bool = True) -> Dict:
         """
         Full preprocessing pipeline for a document
         
         Args:
             document: Document dictionary
+            key_phrases: Extract key phrases (False leaves 'key_phrases'
+                empty for the caller to rank from 'content_without_stopwords')
             
         Returns:
             Preprocessed document with additional features
         """
+        metrics = self.metrics
+        timer = metrics.timer
+        
         # Extract text content
         content = document.get('content', '')
         title = document.get('title', '')
         full_text = f"{title} {content}"
         
-        # Clean text
-        clean_content = self.clean_text(full_text)
-        
-        # Extract features
-        urgency_info = self.extract_urgency_signals(full_text)
-        mentioned_depts = self.extract_department_mentions(full_text)
-        dates = self.extract_dates(full_text)
-        key_phrases = self.extract_key_phrases(full_text, top_n=5)
+        with timer('preprocess'):
+            # Clean text
+            with timer('preprocess.clean'):
+                clean_content = self.clean_text(full_text)
+                without_stopwords = self.remove_stop_words(clean_content)
+            
+            # Extract features
+            with timer('preprocess.keywords'):
+                matches = self.match_keywords(full_text)
+                urgency_info = self.extract_urgency_signals(full_text, matches)
+                mentioned_depts = self.extract_department_mentions(full_text, matches)
+            with timer('preprocess.dates'):
+                dates = self.extract_dates(full_text)
+            phrases = []
+            if key_phrases:
+                with timer('preprocess.key_phrases'):
+                    phrases = self._rank_phrases(without_stopwords.split(), 5)
+        metrics.inc('documents_preprocessed')
         
         # Create preprocessed document
         preprocessed = {
             **document,
             'cleaned_content': clean_content,
-            'content_without_stopwords': self.remove_stop_words(clean_content),
+            'content_without_stopwords': without_stopwords,
             'extracted_urgency': urgency_info,
             'mentioned_departments': mentioned_depts,
             'extracted_dates': dates,
-            'key_phrases': key_phrases,
+            'key_phrases': phrases,
             'word_count': len(clean_content.split()),
             'preprocessed_at': datetime.now().isoformat()
         }
         
         return preprocessed
     
-    def preprocess_batch(self, documents: List[Dict]) -> List[Dict]:
+    def preprocess_batch(self, documents: List[Dict], workers: Optional[int] = None,
+                         chunk_size: int = 256) -> List[Dict]:
         """
         Preprocess multiple documents
         
         Args:
             documents: List of document dictionaries
+            workers: Worker processes (None or 1: preprocess in this process)
+            chunk_size: Documents per worker task
             
         Returns:
             List of preprocessed documents
         """
-        return [self.preprocess_document(doc) for doc in documents]
+        return list(self.iter_preprocess(documents, workers=workers, chunk_size=chunk_size))
+    
+    def iter_preprocess(self, documents: Iterable[Dict], workers: Optional[int] = None,
+                        chunk_size: int = 256, max_pending: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Stream preprocessed documents in input order
+        
+        With workers > 1, chunks are spread over a process pool whose workers
+        load the hierarchy once at start-up; only the chunks travel to the
+        workers. With phrase_stats, key phrases depend on every earlier
+        document, so this process ranks them (and updates the statistics)
+        in input order as chunks come back, and the output matches the
+        serial one whatever the scheduling. Worker metrics are merged into
+        self.metrics after every chunk. At most max_pending chunks
+        (default: 2 per worker) are in flight, so memory stays bounded for
+        arbitrarily long inputs.
+        
+        Args:
+            documents: Any iterable of document dictionaries
+            workers: Worker processes (None or 1: preprocess in this process)
+            chunk_size: Documents per worker task
+            max_pending: Maximum chunks submitted but not yet yielded
+            
+        Yields:
+            Preprocessed documents
+        """
+        if not workers or workers <= 1:
+            for doc in documents:
+                yield self.preprocess_document(doc)
+            return
+        
+        max_pending = max_pending or 2 * workers
+        documents = iter(documents)
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(self.hierarchy_path, self.word_boundary, self.metrics.enabled,
+                                             self.metrics.buckets))
+        rank_here = self.phrase_stats is not None
+        pending = deque()
+        try:
+            while True:
+                # Keep the pool busy, then hand back the oldest chunk
+                while len(pending) < max_pending:
+                    chunk = list(islice(documents, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(pool.submit(_preprocess_chunk, chunk, not rank_here))
+                if not pending:
+                    break
+                processed, recorded = pending.popleft().result()
+                self.metrics.merge(recorded)
+                if rank_here:
+                    for doc in processed:
+                        with self.metrics.timer('preprocess.key_phrases'):
+                            doc['key_phrases'] = self._rank_phrases(doc['content_without_stopwords'].split(), 5)
+                yield from processed
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
     
     def extract_bilingual_features(self, text: str) -> Dict:
         """
@@ -0,0 +1,236 @@
+"""
+Priority Inboxes
+Incrementally maintained top-N priority views per department
+"""
+
+import bisect
+from typing import List, Dict, Optional
+from models.priority_model import DocumentPriorityModel
+from models.batch_scorer import SCORING_FIELDS, id_sort_key
+from models.bm25_index import BM25Index
+
+
+class DepartmentInbox:
+    """
+    Top-N documents for one department
+
+    Entries are kept in one sorted list of at most size + reserve keys: the
+    first size are the inbox, the rest a reserve that backfills withdrawn
+    top entries without rescoring. Worse documents are dropped, so memory
+    per inbox is bounded by size + reserve rather than by the corpus.
+    Entries are ordered by (score desc, id asc), like batch_score_page.
+
+    Every held key is better than every dropped one (floor is the best
+    dropped key), so the inbox is exact until withdrawals exhaust the
+    reserve; needs_refill then tells the owner to rescore the dropped
+    documents.
+    """
+
+    def __init__(self, department: str, size: int = 20, reserve: Optional[int] = None):
+        self.department = department
+        self.size = size
+        self.reserve = size if reserve is None else reserve
+
+        self._ranked = []           # sorted keys of held entries (inbox first, then reserve)
+        self._entries = {}          # id -> (key, result) of held entries
+        self._floor = None          # best key ever dropped (None: nothing dropped)
+        self._snapshot = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._entries
+
+    @property
+    def needs_refill(self) -> bool:
+        """True if the inbox is short of entries while dropped documents may exist"""
+        return self._floor is not None and len(self._ranked) < self.size
+
+    @staticmethod
+    def _key(doc_id, score: float):
+        # repr() separates ids with the same text (1 and '1'), so the raw id
+        # at the end is only reached when comparing a key with itself
+        return -score, id_sort_key(doc_id), repr(doc_id), doc_id
+
+    def push(self, doc_id: str, result: Dict) -> None:
+        """Insert or replace a document's entry"""
+        if doc_id in self._entries:
+            self.remove(doc_id)
+
+        key = self._key(doc_id, result['priority_score'])
+        if self._floor is not None and key >= self._floor:
+            # Dropped documents may rank above it, so it cannot be held
+            self._drop(key)
+            return
+
+        self._entries[doc_id] = (key, result)
+        position = bisect.bisect_left(self._ranked, key)
+        self._ranked.insert(position, key)
+        if position < self.size:
+            self._snapshot = None
+        if len(self._ranked) > self.size + self.reserve:
+            worst = self._ranked.pop()
+            del self._entries[worst[-1]]
+            self._drop(worst)
+
+    def remove(self, doc_id: str) -> bool:
+        """Drop a document's entry; the first reserve entry moves into the inbox"""
+        entry = self._entries.pop(doc_id, None)
+        if entry is None:
+            return False
+        position = bisect.bisect_left(self._ranked, entry[0])
+        del self._ranked[position]
+        if position < self.size:
+            self._snapshot = None
+        return True
+
+    def read(self) -> List[Dict]:
+        """Current top entries, best first"""
+        if self._snapshot is None:
+            self._snapshot = [self._entries[key[-1]][1] for key in self._ranked[:self.size]]
+        return self._snapshot
+
+    def reset_floor(self) -> None:
+        """Forget the dropped documents before they are pushed again (see needs_refill)"""
+        self._floor = None
+
+    def clear(self) -> None:
+        self._ranked = []
+        self._entries = {}
+        self._floor = None
+        self._snapshot = None
+
+    def _drop(self, key) -> None:
+        if self._floor is None or key < self._floor:
+            self._floor = key
+
+
+class PriorityInboxes:
+    """
+    Materialized priority inboxes for every department
+
+    Each ingested document is scored once against all departments (one
+    score_matrix pass) and pushed into every department's DepartmentInbox,
+    so reading an inbox never rescores the corpus. Scores depend on the
+    date (deadline urgency) and on corpus BM25 statistics; refresh()
+    rescores everything held, e.g. once per day. Inboxes keep size + reserve
+    entries each; one whose reserve runs out after withdrawals is refilled
+    by rescoring the documents it does not hold for that department. Only
+    the fields scoring reads (SCORING_FIELDS) of each document are kept
+    for that.
+    """
+
+    def __init__(self, model: Optional[DocumentPriorityModel] = None,
+                 departments: Optional[List[str]] = None, size: int = 20, as_of=None,
+                 reserve: Optional[int] = None):
+        self.model = model if model is not None else DocumentPriorityModel()
+        self.departments = list(departments if departments is not None else self.model.role_relevance_matrix)
+        self.size = size
+        self.as_of = as_of
+
+        self.inboxes = {dept: DepartmentInbox(dept, size, reserve) for dept in self.departments}
+        self.documents = {}         # id -> scoring fields of every held document
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.documents
+
+    @staticmethod
+    def _document_tokens(document: Dict) -> List[str]:
+        return BM25Index.tokenize(document.get('content', document.get('title', '')))
+
+    def _forget_terms(self, doc_id) -> None:
+        """Remove a held document from the model's BM25 corpus"""
+        document = self.documents.get(doc_id)
+        if document is not None:
+            self.model.bm25_index.remove(doc_id, self._document_tokens(document))
+
+    def upsert(self, document: Dict) -> None:
+        """Add a new document or replace an existing one"""
+        self.upsert_many([document])
+
+    def upsert_many(self, documents: List[Dict]) -> None:
+        """
+        Add or replace documents, scoring the batch once for all departments
+
+        Args:
+            documents: Documents with an 'id'; later duplicates in the batch win
+        """
+        latest = {}
+        for document in documents:
+            doc_id = document.get('id')
+            if doc_id is None:
+                raise ValueError("Inbox documents need an 'id'")
+            latest[doc_id] = {field: document[field] for field in SCORING_FIELDS if field in document}
+
+        # Updated documents are re-indexed with their new content
+        for doc_id in latest:
+            self._forget_terms(doc_id)
+        self.documents.update(latest)
+        self.model.index_documents(list(latest.values()))
+        self._score_into_inboxes(list(latest.values()))
+        # A lowered score can push an updated document out of a full inbox
+        self._refill()
+
+    def withdraw(self, doc_id) -> bool:
+        """
+        Remove a document from every inbox
+
+        Returns:
+            True if the document was held
+        """
+        if doc_id not in self.documents:
+            return False
+        self._forget_terms(doc_id)
+        del self.documents[doc_id]
+        for inbox in self.inboxes.values():
+            inbox.remove(doc_id)
+        self._refill()
+        return True
+
+    def inbox(self, department: str) -> List[Dict]:
+        """Top documents for a department, best first (a copy)"""
+        return list(self.inboxes[department].read())
+
+    def refresh(self, as_of=None) -> None:
+        """Rescore every held document (e.g. after the date changes)"""
+        if as_of is not None:
+            self.as_of = as_of
+        for inbox in self.inboxes.values():
+            inbox.clear()
+        self._score_into_inboxes(list(self.documents.values()))
+
+    def _refill(self) -> None:
+        """Rescore the documents an exhausted inbox dropped, for its department only"""
+        for dept, inbox in self.inboxes.items():
+            if inbox.needs_refill:
+                dropped = [document for doc_id, document in self.documents.items() if doc_id not in inbox]
+                inbox.reset_floor()
+                self._score_into_inboxes(dropped, [dept])
+
+    def _score_into_inboxes(self, documents: List[Dict], departments: Optional[List[str]] = None) -> None:
+        departments = departments if departments is not None else self.departments
+        if not documents:
+            return
+        matrix = self.model.score_matrix(documents, departments, as_of=self.as_of)
+        scores = matrix['priority_score'].tolist()
+        labels = matrix['priority_label']
+
+        for i, document in enumerate(documents):
+            doc_id = document['id']
+            summary = {
+                'document_id': doc_id,
+                'title': document.get('title'),
+                'source_department': document.get('source_department'),
+                'document_type': document.get('document_type'),
+                'deadline': document.get('deadline')
+            }
+            for j, dept in enumerate(departments):
+                self.inboxes[dept].push(doc_id, {
+                    **summary,
+                    'priority_score': round(scores[i][j], 4),
+                    'priority_label': labels[i, j]
+                })
@@ -8,24 +8,53 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import json
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
-from models.bert_embedder import BERTEmbedder
-from utils.preprocessor import DocumentPreprocessor
+from models.bert_embedder import create_embedder
+from models.bm25_index import BM25Index
+from models.tfidf_index import TfidfIndex
+from models.vector_index import create_vector_index
+from models.priority_model import DocumentPriorityModel
+from models.keyword_matcher import KeywordMatcher
+from models.instrumentation import Metrics, METRICS
+from utility.preprocessor import DocumentPreprocessor
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
 class ScoringEngine:
-    def __init__(self, hierarchy_path='data/department_hierarchy.json'):
+    def __init__(self, hierarchy_path='data/department_hierarchy.json', embedding_cache_dir=None,
+                 vector_index='exact', vector_index_params=None, embedder='simulated', embedder_params=None,
+                 metrics: Optional[Metrics] = None):
         """Initialize scoring engine with all components"""
-        self.preprocessor = DocumentPreprocessor(hierarchy_path)
-        self.bert_embedder = BERTEmbedder()
+        # Stage timers and counters, shared with the preprocessor and embedder
+        self.metrics = metrics if metrics is not None else METRICS
+        
+        # One keyword automaton for urgency, department and domain keywords
+        self.keyword_matcher = KeywordMatcher()
+        self.preprocessor = DocumentPreprocessor(hierarchy_path, keyword_matcher=self.keyword_matcher,
+                                                 metrics=self.metrics)
+        
+        # Embedding backend: 'simulated', model-free 'hashing' or sentence-transformers 'production'
+        self.bert_embedder = create_embedder(
+            embedder, cache_dir=embedding_cache_dir, keyword_matcher=self.keyword_matcher,
+            metrics=self.metrics, **(embedder_params or {})
+        )
+        
+        # Semantic retrieval index: 'exact' or approximate 'ivf'
+        self.vector_index = create_vector_index(
+            vector_index, self.bert_embedder.embedding_dim, **(vector_index_params or {})
+        )
         self.tfidf_vectorizer = TfidfVectorizer(
             max_features=1000,
             ngram_range=(1, 2),
             stop_words='english'
         )
+        self.tfidf_index = TfidfIndex(self.tfidf_vectorizer)
+        self.bm25_index = BM25Index(k1=1.5, b=0.75)
+        
+        # Priority model shared by every scoring session
+        self.priority_model = DocumentPriorityModel(metrics=self.metrics)
         
         # Load hierarchy data
         try:
@@ -36,9 +65,43 @@ class ScoringEngine:
         
         self.document_vectors = {}
     
+    def _document_text(self, document: Dict) -> str:
+        """Text used for content relevance scoring"""
+        return document.get('content', '') + ' ' + document.get('title', '')
+    
+    def index_documents(self, documents: List[Dict]) -> None:
+        """
+        Add documents to the corpus-level retrieval indexes
+        
+        Scoring only reads these indexes; documents that were never indexed
+        are scored against the existing corpus statistics. Documents without
+        an id cannot be told apart from one call to the next, so they are
+        not indexed; indexing the same documents twice is a no-op.
+        
+        Args:
+            documents: List of document dictionaries
+        """
+        new_docs, seen = [], set()
+        for doc in documents:
+            doc_id = doc.get('id')
+            if doc_id is not None and doc_id not in self.bm25_index and doc_id not in seen:
+                new_docs.append(doc)
+                seen.add(doc_id)
+        if not new_docs:
+            return
+        
+        texts = [self._document_text(doc) for doc in new_docs]
+        keys = [doc.get('id') for doc in new_docs]
+        self.bm25_index.add_documents(texts, keys)
+        self.tfidf_index.append(texts, keys)
+        self.vector_index.add(self.bert_embedder.encode_batch(texts), keys)
+        
+        # Corpus statistics used by the priority scoring sessions
+        self.priority_model.index_documents(new_docs)
+    
     def calculate_tfidf_similarity(self, query: str, documents: List[Dict]) -> List[float]:
         """
-        Calculate TF-IDF based similarity scores
+        Calculate TF-IDF similarity against the persistent corpus index
         
         Args:
             query: Query text
@@ -47,30 +110,28 @@ class ScoringEngine:
         Returns:
             List of similarity scores
         """
-        # Prepare document texts
-        doc_texts = [doc.get('content', '') + ' ' + doc.get('title', '') for doc in documents]
+        if not self.tfidf_index.is_fitted:
+            # Return default scores if the corpus has no usable vocabulary
+            return [0.5] * len(documents)
         
-        # Add query to corpus
-        all_texts = [query] + doc_texts
+        # One transform for the query, one sparse mat-vec over the indexed rows
+        scores = np.zeros(len(documents))
+        rows = [self.tfidf_index.row(doc.get('id')) for doc in documents]
+        indexed = [i for i, row in enumerate(rows) if row is not None]
+        if indexed:
+            scores[indexed] = self.tfidf_index.query(query, [rows[i] for i in indexed])
         
-        try:
-            # Fit and transform
-            tfidf_matrix = self.tfidf_vectorizer.fit_transform(all_texts)
-            
-            # Calculate similarity between query and documents
-            query_vector = tfidf_matrix[0:1]
-            doc_vectors = tfidf_matrix[1:]
-            
-            similarities = cosine_similarity(query_vector, doc_vectors)[0]
-            
-            return similarities.tolist()
-        except:
-            # Return default scores if TF-IDF fails
-            return [0.5] * len(documents)
+        unindexed = [i for i, row in enumerate(rows) if row is None]
+        if unindexed:
+            query_vector = self.tfidf_index.transform([query])
+            doc_vectors = self.tfidf_index.transform([self._document_text(documents[i]) for i in unindexed])
+            scores[unindexed] = cosine_similarity(query_vector, doc_vectors)[0]
+        
+        return scores.tolist()
     
     def calculate_bm25_score(self, query: str, document: str, k1=1.5, b=0.75) -> float:
         """
-        Calculate BM25 score
+        Calculate BM25 score against the indexed corpus statistics
         
         Args:
             query: Query text
@@ -81,21 +142,57 @@ class ScoringEngine:
         Returns:
             BM25 score
         """
-        query_terms = query.lower().split()
-        doc_terms = document.lower().split()
-        doc_length = len(doc_terms)
-        avg_doc_length = 500  # Assumed average
+        score = self.bm25_index.score_text(query, document, k1=k1, b=b)
+        return min(score / 10, 1.0)
+    
+    def calculate_bm25_scores(self, query: str, documents: List[Dict]) -> List[float]:
+        """
+        Calculate BM25 scores for many documents with one postings walk
         
-        score = 0
-        for term in query_terms:
-            term_freq = doc_terms.count(term)
-            if term_freq > 0:
-                idf = np.log((1 + 1) / (1 + term_freq))
-                numerator = term_freq * (k1 + 1)
-                denominator = term_freq + k1 * (1 - b + b * (doc_length / avg_doc_length))
-                score += idf * (numerator / denominator)
+        Args:
+            query: Query text
+            documents: List of document dictionaries
+            
+        Returns:
+            List of BM25 scores
+        """
+        scores = np.zeros(len(documents))
         
-        return min(score / 10, 1.0)
+        rows = [self.bm25_index.doc_number(doc.get('id')) for doc in documents]
+        indexed = [i for i, row in enumerate(rows) if row is not None]
+        if indexed:
+            # Only documents containing a query term get a non-zero score
+            matched, matched_scores = self.bm25_index.score_sparse(query)
+            if len(matched):
+                wanted = np.array([rows[i] for i in indexed], dtype=np.intp)
+                pos = np.minimum(np.searchsorted(matched, wanted), len(matched) - 1)
+                hit = matched[pos] == wanted
+                scores[np.array(indexed)[hit]] = matched_scores[pos[hit]]
+        
+        for i, row in enumerate(rows):
+            if row is None:
+                scores[i] = self.bm25_index.score_text(query, self._document_text(documents[i]))
+        
+        return np.minimum(scores / 10, 1.0).tolist()
+    
+    def semantic_search(self, query: str, top_k: int = 5, threshold: float = 0.0) -> List[Dict]:
+        """
+        Retrieve the indexed documents most similar to a query
+        
+        Args:
+            query: Query text
+            top_k: Number of results
+            threshold: Minimum cosine similarity
+            
+        Returns:
+            List of document ids with similarity scores, best first
+        """
+        doc_ids, scores = self.vector_index.search(self.bert_embedder.encode(query), top_k)
+        return [
+            {'document_id': doc_id, 'similarity_score': round(float(score), 4)}
+            for doc_id, score in zip(doc_ids, scores)
+            if score >= threshold
+        ]
     
     def calculate_content_relevance(self, query: str, document: Dict) -> Dict:
         """
@@ -108,22 +205,27 @@ class ScoringEngine:
         Returns:
             Dictionary with relevance scores
         """
-        doc_content = document.get('content', '') + ' ' + document.get('title', '')
-        
-        # TF-IDF
-        tfidf_scores = self.calculate_tfidf_similarity(query, [document])
-        tfidf_score = tfidf_scores[0] if tfidf_scores else 0.5
-        
-        # BM25
-        bm25_score = self.calculate_bm25_score(query, doc_content)
-        
-        # BERT
-        query_emb = self.bert_embedder.encode(query)
-        doc_emb = self.bert_embedder.encode(doc_content)
-        bert_score = self.bert_embedder.cosine_similarity(query_emb, doc_emb)
-        
-        # Weighted combination
-        content_relevance = (0.3 * tfidf_score + 0.3 * bm25_score + 0.4 * bert_score)
+        timer = self.metrics.timer
+        with self.metrics.profile('calculate_content_relevance'), timer('content_relevance'):
+            doc_content = self._document_text(document)
+            
+            # TF-IDF
+            with timer('content_relevance.tfidf'):
+                tfidf_scores = self.calculate_tfidf_similarity(query, [document])
+                tfidf_score = tfidf_scores[0] if tfidf_scores else 0.5
+            
+            # BM25
+            with timer('content_relevance.bm25'):
+                bm25_score = self.calculate_bm25_score(query, doc_content)
+            
+            # BERT
+            with timer('content_relevance.bert'):
+                query_emb = self.bert_embedder.encode(query)
+                doc_emb = self.bert_embedder.encode(doc_content)
+                bert_score = self.bert_embedder.cosine_similarity(query_emb, doc_emb)
+            
+            # Weighted combination
+            content_relevance = (0.3 * tfidf_score + 0.3 * bm25_score + 0.4 * bert_score)
         
         return {
             'tfidf': round(tfidf_score, 4),
@@ -132,72 +234,109 @@ class ScoringEngine:
             'combined': round(content_relevance, 4)
         }
     
-    def score_document(self, document: Dict, user_profile: Dict) -> Dict:
+    def get_session(self, user_profile: Dict):
         """
-        Calculate complete priority score for a document
+        Get the compiled scoring session for a user profile
+        
+        Sessions are cached per (department, role); each precompiles the
+        department's relevance row and the profile query so repeated calls
+        only run the vectorized scoring path.
         
         Args:
-            document: Document dictionary
             user_profile: User profile with role and department
             
         Returns:
-            Scoring results
+            ScoringSession for the profile
         """
-        from models.priority_model import DocumentPriorityModel
-        
-        # Initialize priority model
-        priority_model = DocumentPriorityModel()
-        
-        # Create query from user profile
         user_dept = user_profile.get('department', 'Operations')
         user_role = user_profile.get('role', 'Manager')
-        query = f"{user_dept} {user_role}"
         
-        # Add query to document for processing
-        doc_with_query = {**document, 'user_query': query}
-        
-        # Calculate priority score
-        score_result = priority_model.calculate_priority_score(
-            doc_with_query,
-            user_role,
-            user_dept
-        )
+        # Query derived from the user profile
+        query = f"{user_dept} {user_role}"
+        return self.priority_model.get_batch_scorer().session(user_dept, user_role, query)
+    
+    def score_document(self, document: Dict, user_profile: Dict) -> Dict:
+        """
+        Calculate complete priority score for a document
         
-        return score_result
+        Args:
+            document: Document dictionary
+            user_profile: User profile with role and department
+            
+        Returns:
+            Scoring results
+        """
+        timer = self.metrics.timer
+        with self.metrics.profile('score_document'), timer('score_document'):
+            with timer('score_document.session'):
+                session = self.get_session(user_profile)
+            with timer('score_document.weighting'):
+                result = session.score_document(document)
+        self.metrics.inc('documents_scored')
+        return result
     
-    def batch_score_documents(self, documents: List[Dict], user_profile: Dict) -> List[Dict]:
+    def batch_score_documents(self, documents: List[Dict], user_profile: Dict, top_k: int = None) -> List[Dict]:
         """
         Score multiple documents
         
         Args:
             documents: List of document dictionaries
             user_profile: User profile
+            top_k: Optional number of top documents to return (by score, then id)
             
         Returns:
             List of scored documents sorted by priority
         """
-        scored_docs = []
-        
-        for doc in documents:
-            score_result = self.score_document(doc, user_profile)
-            
-            scored_doc = {
-                'document_id': doc.get('id'),
-                'title': doc.get('title'),
-                'source_department': doc.get('source_department'),
-                'document_type': doc.get('document_type'),
-                'deadline': doc.get('deadline'),
-                'tagged_departments': doc.get('tagged_departments', []),
-                **score_result
-            }
+        timer = self.metrics.timer
+        with self.metrics.profile('batch_score_documents'), timer('batch_score'):
+            session = self.get_session(user_profile)
+            with timer('batch_score.weighting'):
+                columns, scores = session.score_documents(documents)
+            extra_fields = {'tagged_departments': []}
             
-            scored_docs.append(scored_doc)
-        
-        # Sort by priority score
-        scored_docs.sort(key=lambda x: x['priority_score'], reverse=True)
+            with timer('batch_score.materialize'):
+                if top_k is not None:
+                    rows, _ = session.scorer.rank(columns.id_keys, scores, top_k)
+                    scored_docs = session.scorer.materialize(columns.documents, scores, rows, extra_fields)
+                else:
+                    scored_docs = session.scorer.materialize(columns.documents, scores, extra_fields=extra_fields)
+                    
+                    # Sort by priority score
+                    scored_docs.sort(key=lambda x: x['priority_score'], reverse=True)
+        self.metrics.inc('documents_scored', len(documents))
         
         return scored_docs
     
+    def batch_score_page(self, documents: List[Dict], user_profile: Dict, page_size: int = 20,
+                         cursor: str = None) -> Dict:
+        """
+        Score documents and return one page of results
+        
+        Args:
+            documents: List of document dictionaries
+            user_profile: User profile
+            page_size: Results per page
+            cursor: 'next_cursor' of the previous page (None for the first page)
+            
+        Returns:
+            Dictionary with 'results' and 'next_cursor' (None on the last page)
+        """
+        timer = self.metrics.timer
+        with self.metrics.profile('batch_score_page'), timer('batch_score'):
+            session = self.get_session(user_profile)
+            with timer('batch_score.weighting'):
+                # Cursor pages rank the scores computed for the first page
+                scores, id_keys, snapshot_id = session.page_scores(documents, cursor)
+            with timer('batch_score.materialize'):
+                rows, next_cursor = session.scorer.rank(id_keys, scores, page_size, cursor, snapshot_id)
+                results = session.scorer.materialize(documents, scores, rows, {'tagged_departments': []})
+        self.metrics.inc('documents_scored', len(documents))
+        
+        return {
+            'results': results,
+            'next_cursor': next_cursor
+        }
+    
     def explain_score(self, score_result: Dict) -> str:
         """
         Generate human-readable explanation of score
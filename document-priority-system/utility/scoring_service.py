@@ -0,0 +1,562 @@
+"""
+Scoring Service
+Asyncio HTTP service that micro-batches concurrent scoring, ranking and search requests
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import asyncio
+import argparse
+import bisect
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import List, Dict, Optional, Callable, Tuple
+from models.batch_scorer import slice_scores
+from utility.scoring_engine import ScoringEngine
+
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Document fields read by the scorer and the JSON types they may take (null is allowed)
+DOCUMENT_FIELD_TYPES = {
+    'id': (str, int),
+    'title': (str,),
+    'content': (str,),
+    'source_department': (str,),
+    'document_type': (str,),
+    'deadline': (str,),
+    'user_query': (str,)
+}
+
+
+def document_error(document) -> Optional[str]:
+    """Describe why a request document cannot be scored, or return None"""
+    if not isinstance(document, dict):
+        return "documents must be objects"
+    for field, types in DOCUMENT_FIELD_TYPES.items():
+        value = document.get(field)
+        if value is not None and (not isinstance(value, types) or isinstance(value, bool)):
+            return f"document field '{field}' must be {' or '.join(t.__name__ for t in types)}"
+    tags = document.get('tagged_departments', [])
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        return "document field 'tagged_departments' must be a list of strings"
+    return None
+
+
+def user_profile_error(user_profile) -> Optional[str]:
+    """Describe why a user profile is invalid, or return None"""
+    if not isinstance(user_profile, dict):
+        return "'user_profile' must be an object"
+    for field in ('department', 'role'):
+        if not isinstance(user_profile.get(field, ''), str):
+            return f"'user_profile.{field}' must be a string"
+    return None
+
+
+def positive_int_error(body: Dict, field: str) -> Optional[str]:
+    """Describe why an optional positive integer field is invalid, or return None"""
+    value = body.get(field)
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+        return f"'{field}' must be a positive integer"
+    return None
+
+
+class Histogram:
+    """
+    Cumulative bucket counts plus a window of recent values for percentiles
+
+    Bucket counts cover every observation; percentiles are computed over
+    the last `window` observations, so memory stays constant.
+    """
+
+    def __init__(self, buckets: List[float], window: int = 10000):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)     # last bucket: above every bound
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.recent.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        return float(np.percentile(np.fromiter(self.recent, dtype=np.float64), q))
+
+    def snapshot(self) -> Dict:
+        bounds = [f"le_{bound}" for bound in self.buckets] + ['inf']
+        p50, p99 = self.percentile(50), self.percentile(99)
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 4) if self.count else None,
+            'p50': round(p50, 4) if p50 is not None else None,
+            'p99': round(p99, 4) if p99 is not None else None,
+            'histogram': dict(zip(bounds, self.counts))
+        }
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests into batches for one handler
+
+    A batch is dispatched when it reaches max_batch_size or when the oldest
+    waiting request has waited max_wait seconds. Handlers take a list of
+    request payloads and return one result per payload; they run in the
+    executor so the event loop keeps accepting requests meanwhile. A
+    handler may return an exception in place of a result to fail only that
+    request.
+    """
+
+    def __init__(self, handler: Callable[[List], List], executor: ThreadPoolExecutor,
+                 max_batch_size: int = 64, max_wait: float = 0.005):
+        self.handler = handler
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+
+        self._pending = []
+        self._timer = None
+
+    async def submit(self, payload):
+        """Queue one request payload and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((payload, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple]) -> None:
+        self.batch_sizes.observe(len(batch))
+        payloads = [payload for payload, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self.handler, payloads)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class ScoringService:
+    """
+    Micro-batching HTTP front end for ScoringEngine
+
+    Endpoints (JSON in, JSON out):
+        POST /score   {"document": {...}, "user_profile": {...}}
+        POST /rank    {"documents": [...], "user_profile": {...}, "page_size": 20, "cursor": null}
+        POST /search  {"query": "...", "top_k": 5, "threshold": 0.0}
+        POST /index   {"documents": [...]}
+        GET  /metrics latency percentiles and histograms, batch-size histograms,
+                      engine stage timers and counters
+        GET  /metrics/prometheus  the same in the Prometheus text format
+        GET  /health
+
+    Concurrent /score and /rank requests for the same profile are scored in
+    one vectorized pass; /search requests share one encode_batch call. All
+    engine work runs on a single executor thread, because the engine's
+    indexes are not thread-safe; batches keep filling while one runs.
+    Request fields are type-checked before batching (400 on failure), and a
+    request that still fails in a batch fails alone. Scoring and ranking
+    never add documents to the corpus; only /index does.
+    """
+
+    def __init__(self, engine: Optional[ScoringEngine] = None, max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0):
+        self.engine = engine if engine is not None else ScoringEngine()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scoring')
+        self.documents = {}         # indexed documents by id, for search results
+
+        max_wait = max_wait_ms / 1000
+        self.batchers = {
+            name: MicroBatcher(self._instrumented(name, handler), self.executor, max_batch_size, max_wait)
+            for name, handler in (('score', self._score_batch), ('rank', self._rank_batch),
+                                  ('search', self._search_batch))
+        }
+        self.latency = {}           # route -> Histogram of milliseconds
+        self.routes = {
+            ('POST', '/score'): self.handle_score,
+            ('POST', '/rank'): self.handle_rank,
+            ('POST', '/search'): self.handle_search,
+            ('POST', '/index'): self.handle_index,
+            ('GET', '/metrics'): self.handle_metrics,
+            ('GET', '/metrics/prometheus'): self.handle_prometheus,
+            ('GET', '/health'): self.handle_health
+        }
+
+    # ------------------------------------------------------------------
+    # Batch handlers (executor thread)
+    # ------------------------------------------------------------------
+
+    def _instrumented(self, name: str, handler: Callable[[List], List]) -> Callable[[List], List]:
+        """Wrap a batch handler with the engine's stage timer and request profiler"""
+        metrics = self.engine.metrics
+
+        def run(payloads: List) -> List:
+            with metrics.profile(f"service.{name}"), metrics.timer(f"service.{name}_batch"):
+                return handler(payloads)
+        return run
+
+    @staticmethod
+    def _profile_key(user_profile: Dict) -> Tuple:
+        return user_profile.get('department', 'Operations'), user_profile.get('role', 'Manager')
+
+    def _grouped(self, payloads: List[Dict], handle_group: Callable) -> List:
+        """
+        Run handle_group(payloads, positions, session, results) once per user profile
+
+        If a group fails, each of its payloads is retried alone, so a bad
+        request fails by itself (its result is the exception) instead of
+        failing every request batched with it.
+        """
+        results = [None] * len(payloads)
+        groups = {}
+        for i, payload in enumerate(payloads):
+            groups.setdefault(self._profile_key(payload.get('user_profile', {})), []).append(i)
+
+        for (department, role), positions in groups.items():
+            session = None
+            try:
+                session = self.engine.get_session({'department': department, 'role': role})
+                handle_group(payloads, positions, session, results)
+            except Exception as e:
+                if len(positions) == 1 or session is None:
+                    for i in positions:
+                        results[i] = e
+                    continue
+                for i in positions:
+                    try:
+                        handle_group(payloads, [i], session, results)
+                    except Exception as e:
+                        results[i] = e
+        return results
+
+    @staticmethod
+    def _score_group(payloads: List[Dict], positions: List[int], session, results: List) -> None:
+        columns, scores = session.score_documents([payloads[i]['document'] for i in positions])
+        for i, result in zip(positions, session.scorer.materialize(columns.documents, scores)):
+            results[i] = {key: result[key] for key in ('priority_score', 'breakdown', 'priority_label')}
+
+    @staticmethod
+    def _rank_group(payloads: List[Dict], positions: List[int], session, results: List) -> None:
+        # Only first pages are scored; cursor pages rank their first page's snapshot
+        documents, offsets = [], [0]
+        for i in positions:
+            if payloads[i].get('cursor') is None:
+                documents.extend(payloads[i]['documents'])
+            offsets.append(len(documents))
+        columns, scores = session.score_documents(documents)
+
+        for i, start, stop in zip(positions, offsets, offsets[1:]):
+            payload = payloads[i]
+            try:
+                part_scores, id_keys, snapshot_id = session.scorer.page_snapshot(
+                    session, payload['documents'], cursor=payload.get('cursor'),
+                    scored=slice_scores(scores, start, stop)
+                )
+                rows, next_cursor = session.scorer.rank(id_keys, part_scores, payload.get('page_size') or 20,
+                                                        payload.get('cursor'), snapshot_id)
+            except ValueError as e:
+                results[i] = {'error': str(e)}
+                continue
+            results[i] = {
+                'results': session.scorer.materialize(payload['documents'], part_scores, rows,
+                                                      {'tagged_departments': []}),
+                'next_cursor': next_cursor
+            }
+
+    def _score_batch(self, payloads: List[Dict]) -> List:
+        return self._grouped(payloads, self._score_group)
+
+    def _rank_batch(self, payloads: List[Dict]) -> List:
+        return self._grouped(payloads, self._rank_group)
+
+    def _search_batch(self, payloads: List[Dict]) -> List:
+        """Search every query; as in _grouped, a failing request's result is its exception"""
+        encode_batch = self.engine.bert_embedder.encode_batch
+        try:
+            embeddings = encode_batch([payload['query'] for payload in payloads])
+        except Exception:
+            embeddings = [None] * len(payloads)
+
+        results = []
+        for payload, embedding in zip(payloads, embeddings):
+            try:
+                if embedding is None:
+                    embedding = encode_batch([payload['query']])[0]
+                results.append(self._search_one(payload, embedding))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _search_one(self, payload: Dict, embedding) -> Dict:
+        threshold = payload.get('threshold') or 0.0
+        doc_ids, scores = self.engine.vector_index.search(embedding, payload.get('top_k') or 5)
+        return {'results': [
+            {
+                'document_id': doc_id,
+                'title': self.documents.get(doc_id, {}).get('title'),
+                'similarity_score': round(float(score), 4)
+            }
+            for doc_id, score in zip(doc_ids, scores)
+            if score >= threshold
+        ]}
+
+    def index_documents(self, documents: List[Dict]) -> int:
+        """Add documents to the searchable corpus; returns the corpus size"""
+        self.engine.index_documents(documents)
+        for doc in documents:
+            if doc.get('id') is not None:
+                self.documents[doc['id']] = doc
+        return len(self.engine.vector_index)
+
+    # ------------------------------------------------------------------
+    # Request handlers (event loop)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _documents_error(body: Dict) -> Optional[str]:
+        documents = body.get('documents')
+        if not isinstance(documents, list):
+            return "'documents' list of objects is required"
+        for document in documents:
+            error = document_error(document)
+            if error is not None:
+                return error
+        return None
+
+    async def handle_score(self, body: Dict):
+        if not isinstance(body.get('document'), dict):
+            return HTTPStatus.BAD_REQUEST, {'error': "'document' object is required"}
+        error = user_profile_error(body.get('user_profile', {})) or document_error(body['document'])
+        if error is not None:
+            return HTTPStatus.BAD_REQUEST, {'error': error}
+        return HTTPStatus.OK, await self.batchers['score'].submit(body)
+
+    async def handle_rank(self, body: Dict):
+        error = (user_profile_error(body.get('user_profile', {})) or self._documents_error(body)
+                 or positive_int_error(body, 'page_size'))
+        cursor = body.get('cursor')
+        if error is None and cursor is not None and not isinstance(cursor, str):
+            error = "'cursor' must be a string or null"
+        if error is not None:
+            return HTTPStatus.BAD_REQUEST, {'error': error}
+        result = await self.batchers['rank'].submit(body)
+        return (HTTPStatus.BAD_REQUEST if 'error' in result else HTTPStatus.OK), result
+
+    async def handle_search(self, body: Dict):
+        if not isinstance(body.get('query'), str):
+            return HTTPStatus.BAD_REQUEST, {'error': "'query' string is required"}
+        error = positive_int_error(body, 'top_k')
+        threshold = body.get('threshold')
+        if error is None and threshold is not None and (not isinstance(threshold, (int, float))
+                                                        or isinstance(threshold, bool)):
+            error = "'threshold' must be a number"
+        if error is not None:
+            return HTTPStatus.BAD_REQUEST, {'error': error}
+        return HTTPStatus.OK, await self.batchers['search'].submit(body)
+
+    async def handle_index(self, body: Dict):
+        error = self._documents_error(body)
+        if error is not None:
+            return HTTPStatus.BAD_REQUEST, {'error': error}
+        loop = asyncio.get_running_loop()
+        size = await loop.run_in_executor(self.executor, self.index_documents, body['documents'])
+        return HTTPStatus.OK, {'indexed': len(body['documents']), 'corpus_size': size}
+
+    async def handle_metrics(self, body: Dict):
+        return HTTPStatus.OK, self.metrics()
+
+    async def handle_prometheus(self, body: Dict):
+        return HTTPStatus.OK, self.prometheus()
+
+    async def handle_health(self, body: Dict):
+        return HTTPStatus.OK, {'status': 'ok', 'corpus_size': len(self.engine.vector_index)}
+
+    def metrics(self) -> Dict:
+        """Latency (ms) and batch-size statistics per endpoint, plus the engine's instrumentation"""
+        return {
+            'latency_ms': {route: histogram.snapshot() for route, histogram in self.latency.items()},
+            'batch_size': {name: batcher.batch_sizes.snapshot() for name, batcher in self.batchers.items()},
+            'engine': self.engine.metrics.snapshot()
+        }
+
+    def prometheus(self) -> str:
+        """Endpoint latency and engine instrumentation in the Prometheus text format"""
+        name = 'docpriority_request_duration_ms'
+        lines = [f"# HELP {name} Request latency per endpoint.", f"# TYPE {name} histogram"]
+        for route, histogram in sorted(self.latency.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ['+Inf'], histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{route="{route}"}} {histogram.total!r}')
+            lines.append(f'{name}_count{{route="{route}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n' + self.engine.metrics.prometheus()
+
+    # ------------------------------------------------------------------
+    # HTTP/1.1 plumbing
+    # ------------------------------------------------------------------
+
+    async def dispatch(self, method: str, path: str, raw_body: bytes):
+        """Route one request; returns (status, JSON-serializable body)"""
+        path = path.split('?', 1)[0]
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f"{method} not allowed on {path}"}
+            return HTTPStatus.NOT_FOUND, {'error': f"Unknown endpoint {path}"}
+
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return HTTPStatus.BAD_REQUEST, {'error': "Request body is not valid JSON"}
+        if not isinstance(body, dict):
+            return HTTPStatus.BAD_REQUEST, {'error': "Request body must be a JSON object"}
+
+        started = time.perf_counter()
+        try:
+            status, payload = await handler(body)
+        except Exception as e:
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(e).__name__}: {e}"}
+        if not path.startswith('/metrics'):
+            self.latency.setdefault(path, Histogram(LATENCY_BUCKETS_MS)).observe(
+                (time.perf_counter() - started) * 1000)
+        return status, payload
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one (keep-alive) connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': "Malformed request line"}, False)
+                    break
+                method, path, version = parts
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if length < 0 or length > MAX_BODY_BYTES:
+                    status = HTTPStatus.REQUEST_ENTITY_TOO_LARGE if length > 0 else HTTPStatus.BAD_REQUEST
+                    await self._respond(writer, status, {'error': "Invalid Content-Length"}, False)
+                    break
+                raw_body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method, path, raw_body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: HTTPStatus, payload, keep_alive: bool) -> None:
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            body, content_type = json.dumps(payload, default=str).encode('utf-8'), 'application/json'
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8080) -> asyncio.AbstractServer:
+        """Start listening; returns the asyncio server"""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def serve_forever(self, host: str = '127.0.0.1', port: int = 8080) -> None:
+        server = await self.start(host, port)
+        print(f"[Service] Listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching document scoring service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--hierarchy', default='data/department_hierarchy.json')
+    parser.add_argument('--corpus', default=None, help="JSON or NDJSON documents to index for /search")
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0, help="Latency window for batching")
+    parser.add_argument('--metrics', action='store_true', help="Record engine stage timers and counters")
+    parser.add_argument('--profile-sample-rate', type=float, default=0.0,
+                        help="Share of engine requests run under the profiler (implies --metrics)")
+    parser.add_argument('--profile-slow-ms', type=float, default=100.0,
+                        help="Keep (and log) profiles of sampled requests at least this slow")
+    args = parser.parse_args()
+
+    engine = ScoringEngine(args.hierarchy)
+    if args.metrics or args.profile_sample_rate > 0:
+        engine.metrics.enable()
+    if args.profile_sample_rate > 0:
+        engine.metrics.enable_profiling(
+            args.profile_sample_rate, args.profile_slow_ms,
+            callback=lambda record: print(f"[Service] Slow {record['request']} ({record['seconds'] * 1000:.1f} ms)\n"
+                                          f"{record['profile']}", file=sys.stderr))
+    service = ScoringService(engine, args.max_batch_size, args.max_wait_ms)
+    if args.corpus:
+        from utility.ingest_pipeline import read_records, micro_batches
+        for batch in micro_batches(read_records(args.corpus), 1024):
+            service.index_documents(batch)
+        print(f"[Service] Indexed {len(service.engine.vector_index)} documents")
+
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
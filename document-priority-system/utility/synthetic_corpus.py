@@ -0,0 +1,366 @@
+"""
+Synthetic Corpus Generator
+Seeded KMRL-style documents and labelled categorizer text at any scale
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import csv
+import json
+import random
+import argparse
+from datetime import date, timedelta
+from itertools import islice
+from typing import List, Dict, Optional, Iterator, Tuple
+
+STATIONS = ['Aluva', 'Pulinchodu', 'Companypady', 'Ambattukavu', 'Muttom', 'Kalamassery', 'Cochin University',
+            'Pathadipalam', 'Edapally', 'Changampuzha Park', 'Palarivattom', 'JLN Stadium', 'Kaloor',
+            'Town Hall', 'MG Road', 'Maharajas College', 'Ernakulam South', 'Kadavanthra', 'Elamkulam',
+            'Vyttila', 'Thykoodam', 'Petta']
+DEPOTS = ['Muttom depot', 'depot A', 'depot B', 'depot C', 'Depot 2', 'the stabling yard']
+ASSETS = ['track circuit', 'signaling system', 'rolling stock', 'HVAC system', 'escalator', 'lift',
+          'traction power substation', 'platform screen doors', 'CCTV network', 'ticket vending machines',
+          'point machine', 'overhead equipment', 'fire detection panel', 'UPS units', 'axle counter']
+AUTHORS = {
+    'CMRS': ['Commissioner of Metro Rail Safety'],
+    'MoHUA': ['Ministry of Housing and Urban Affairs', 'Environmental Cell'],
+    'Executive_Directors': ["Managing Director's Office", 'Director (Projects)'],
+    'Safety': ['Chief Safety Officer', 'Safety Inspector'],
+    'Engineering': ['Chief Engineering Consultant', 'Design Engineer'],
+    'Operations': ['Station Controller - {station}', 'Operations Control Centre'],
+    'Maintenance': ['Chief Maintenance Engineer', 'Depot Supervisor'],
+    'Legal': ['Legal Advisor', 'Company Secretary'],
+    'Finance': ['Finance Controller', 'Accounts Officer'],
+    'Procurement': ['Procurement Manager', 'Procurement Officer'],
+    'HR': ['HR Director', 'Training Coordinator']
+}
+# Share of incoming documents per source department
+SOURCE_WEIGHTS = {
+    'CMRS': 3, 'MoHUA': 3, 'Executive_Directors': 5, 'Safety': 10, 'Engineering': 12, 'Operations': 18,
+    'Maintenance': 16, 'Legal': 5, 'Finance': 10, 'Procurement': 12, 'HR': 6
+}
+DEFAULT_DOCUMENT_TYPES = {
+    'CMRS': ['Safety_Circular', 'Regulatory_Directive', 'Compliance_Notice'],
+    'MoHUA': ['Regulatory_Directive', 'Compliance_Notice', 'Policy_Update'],
+    'Executive_Directors': ['Board_Minutes', 'Strategic_Directive', 'Policy_Update'],
+    'Safety': ['Safety_Circular', 'Incident_Report', 'Safety_Alert'],
+    'Engineering': ['Engineering_Drawing', 'Technical_Specification', 'Design_Change'],
+    'Operations': ['Incident_Report', 'Schedule_Change', 'Operational_Notice'],
+    'Maintenance': ['Maintenance_Alert', 'Job_Card', 'Inspection_Report'],
+    'Legal': ['Legal_Opinion', 'Contract_Document', 'Compliance_Notice'],
+    'Finance': ['Budget_Document', 'Financial_Report', 'Payment_Approval'],
+    'Procurement': ['Purchase_Order', 'Vendor_Invoice', 'Tender_Document'],
+    'HR': ['HR_Policy', 'Training_Notice', 'Personnel_Order']
+}
+DEFAULT_DEPARTMENT_TAGS = {
+    'Operations': ['operations', 'train', 'service', 'schedule', 'timetable', 'passenger', 'station'],
+    'Engineering': ['engineering', 'design', 'construction', 'infrastructure', 'technical', 'drawing'],
+    'Safety': ['safety', 'incident', 'hazard', 'emergency', 'security', 'risk'],
+    'Maintenance': ['maintenance', 'repair', 'inspection', 'preventive', 'breakdown', 'servicing'],
+    'Procurement': ['procurement', 'vendor', 'purchase', 'supplier', 'contract', 'tender'],
+    'Finance': ['finance', 'payment', 'budget', 'invoice', 'cost', 'revenue'],
+    'HR': ['hr', 'personnel', 'training', 'leave', 'employee', 'policy'],
+    'Legal': ['legal', 'contract', 'compliance', 'regulation', 'audit']
+}
+URGENCY_LEVELS = ['Critical', 'High', 'Medium', 'Low']
+URGENCY_WEIGHTS = [1, 3, 4, 3]
+URGENCY_OPENERS = {
+    'Critical': ['Immediate action required.', 'Emergency notice: respond urgently.', 'Critical priority item.'],
+    'High': ['Important: expedite the review.', 'Timely response expected.', 'Alert for the concerned teams.'],
+    'Medium': ['Please review and schedule the required work.', 'For attention of the concerned section.'],
+    'Low': ['For information and reference.', 'FYI - routine update.', '']
+}
+MALAYALAM_SENTENCES = ['സുരക്ഷാ നിർദേശങ്ങൾ പാലിക്കുക.', 'അറ്റച്ച് ചെയ്ത ഇൻവോയ്സ് പരിശോധിക്കുക.',
+                       'ഡോക്യുമെന്റിൽ സംബന്ധമായ വിശദീകരണം.', 'അടിയന്തര നടപടി ആവശ്യമാണ്.']
+
+# Sentence templates: {tag} is a department keyword, other slots are filled per document
+SENTENCES = [
+    '{Tag} review of the {asset} at {station} station is scheduled for {day}.',
+    'All {tag} staff must complete the updated procedure within {hours} hours.',
+    'The {asset} near {station} reported a fault during peak hours; {tag} teams are notified.',
+    'Updated {tag} guidelines apply to {depot} from {day}.',
+    'Estimated {tag} impact is Rs. {amount} lakh against the approved budget.',
+    'A joint {tag} inspection with {other} is requested before {day}.',
+    '{Tag} records for the {asset} must be submitted to the {other} section.',
+    'Passenger service between {station} and {station2} may be affected by the {asset} work.',
+    'Vendor documents for the {asset} are attached for {tag} verification.',
+    'The {tag} committee approved the revised plan with {percent}% contingency.',
+    'Refer to clause {clause} of the {tag} manual for the detailed steps.',
+    '{Tag} audit observations on {depot} are to be closed by {day}.'
+]
+TITLES = [
+    '{type} - {Asset} at {station}', '{Tag} Notice - {Asset} {month}', '{type}: {Tag} Update for {depot}',
+    '{Tag} Review - {Asset} Phase {phase}', '{type} - {station} Station {Tag}'
+]
+
+# Document_data.csv-style labelled templates per categorizer label
+LABELLED_TEMPLATES = {
+    'Engineering': [
+        'Track inspection report: wear on rail joint at Km {km}.',
+        'Drawing: cable tray route revision for {depot}.',
+        'Configuration change for signaling PLC: update firmware to v{major}.{minor}, rollback plan included.',
+        'Design change: revised {asset} layout for {station} station.'
+    ],
+    'Finance': [
+        'Budget reforecast Q{quarter}: increased OPEX for depot expansion by {percent}%.',
+        'Invoice #INV-2025-{number:03d}: Vendor {vendor} Supplies.',
+        'Purchase order confirmation and tax invoice attached for spare parts procurement.',
+        'Payment approval requested for {asset} AMC, Rs. {amount} lakh.'
+    ],
+    'HR': [
+        'Leave policy update: employees entitled to {leaves} casual leaves per year.',
+        'Staff rotation notice: Technician {letter} transferred to Depot {depot_number}.',
+        'Training schedule: safety refresher for station staff on Oct {dom}.',
+        'Recruitment notice: {count} station controller posts open for internal candidates.'
+    ],
+    'Legal': [
+        'Contract clause clarification: warranty period extended to {months} months for supplied components.',
+        'Legal opinion regarding land acquisition adjacent to depot expansion.',
+        'Regulatory directive: Commissioner of Metro Rail Safety issued new reporting guidelines.',
+        'Arbitration notice received from {vendor} Supplies regarding delayed payments.'
+    ],
+    'Safety': [
+        'Hazard alert: slippery platform edge during monsoon — apply anti-slip tape.',
+        'Safety circular: emergency brake test procedure updated.',
+        'Incident report: minor electrical fire in {depot}; no injuries. Root cause under investigation.',
+        'Evacuation drill scheduled at {station} station; all staff to participate.'
+    ]
+}
+LABEL_CODES = {'Engineering': 'ENG', 'Finance': 'FIN', 'HR': 'HR', 'Legal': 'LEG', 'Safety': 'SAF'}
+VENDORS = ['Acme', 'Kerala', 'Metro', 'Southern', 'Apex', 'Unity']
+
+
+class SyntheticCorpus:
+    """
+    Seeded generator of KMRL-style documents and labelled categorizer text
+
+    Documents follow the data/sample_documents.json schema; source
+    departments, document types and department keywords come from the
+    department hierarchy when it is available. Labelled rows follow the
+    Document_data.csv style (templated text, optional Malayalam sentence,
+    reference and attachment suffixes, a small share of noisy labels).
+
+    Everything is generated lazily from random.Random(seed): the same seed
+    and arguments give the same corpus, and a corpus of any size can be
+    streamed without holding it in memory.
+    """
+
+    def __init__(self, seed: int = 42, hierarchy_path: Optional[str] = 'data/department_hierarchy.json',
+                 start_date: date = date(2025, 9, 1), span_days: int = 120,
+                 bilingual_ratio: float = 0.15, long_ratio: float = 0.05, label_noise: float = 0.05):
+        self.seed = seed
+        self.start_date = start_date
+        self.span_days = span_days
+        self.bilingual_ratio = bilingual_ratio
+        self.long_ratio = long_ratio
+        self.label_noise = label_noise
+
+        hierarchy = {}
+        if hierarchy_path:
+            try:
+                with open(hierarchy_path, 'r', encoding='utf-8') as f:
+                    hierarchy = json.load(f)
+            except (OSError, ValueError):
+                hierarchy = {}
+
+        authorities = hierarchy.get('authority_hierarchy', {})
+        self.document_types = {dept: info.get('typical_documents') or DEFAULT_DOCUMENT_TYPES.get(dept, ['General_Notice'])
+                               for dept, info in authorities.items()} or dict(DEFAULT_DOCUMENT_TYPES)
+        self.response_hours = {doc_type: info.get('typical_response_time_hours', 72)
+                               for doc_type, info in hierarchy.get('document_type_urgency', {}).items()}
+        self.relevance = hierarchy.get('cross_department_relevance', {})
+        self.department_tags = hierarchy.get('department_tags') or dict(DEFAULT_DEPARTMENT_TAGS)
+
+        self.sources = list(self.document_types)
+        self.source_weights = [SOURCE_WEIGHTS.get(dept, 5) for dept in self.sources]
+        self.departments = list(self.department_tags)
+
+    # ------------------------------------------------------------------
+    # Documents (sample_documents.json schema)
+    # ------------------------------------------------------------------
+
+    def _fill(self, template: str, rng: random.Random, tag: str, **extra) -> str:
+        asset = rng.choice(ASSETS)
+        station, station2 = rng.sample(STATIONS, 2)
+        values = {
+            'tag': tag, 'Tag': tag.capitalize(), 'asset': asset, 'Asset': asset.title(),
+            'station': station, 'station2': station2, 'depot': rng.choice(DEPOTS),
+            'other': rng.choice(self.departments), 'hours': rng.choice([24, 48, 72, 96]),
+            'day': (self.start_date + timedelta(days=rng.randrange(self.span_days))).strftime('%d %b %Y'),
+            'amount': rng.randrange(2, 900), 'percent': rng.randrange(2, 25),
+            'clause': f"{rng.randrange(1, 20)}.{rng.randrange(1, 10)}", 'phase': rng.randrange(1, 4),
+            'month': (self.start_date + timedelta(days=rng.randrange(self.span_days))).strftime('%B %Y')
+        }
+        values.update(extra)
+        return template.format(**values)
+
+    def _tagged_departments(self, rng: random.Random, source: str, primary: str) -> List[str]:
+        tags = [primary]
+        related = self.relevance.get(primary, {})
+        for dept in self.departments:
+            if dept != primary and rng.random() < 0.6 * related.get(dept, 0.2) ** 2:
+                tags.append(dept)
+        if source in self.relevance and source not in tags and rng.random() < 0.3:
+            tags.append(source)
+        return tags
+
+    def document(self, index: int) -> Dict:
+        """
+        The index-th document of the corpus (independent of every other index)
+
+        Args:
+            index: Document number
+
+        Returns:
+            Document dictionary in the sample_documents.json schema
+        """
+        rng = random.Random(f"{self.seed}:doc:{index}")
+        source = rng.choices(self.sources, self.source_weights)[0]
+        doc_type = rng.choice(self.document_types[source])
+        primary = source if source in self.department_tags else rng.choice(self.departments)
+        tagged = self._tagged_departments(rng, source, primary)
+        urgency = rng.choices(URGENCY_LEVELS, URGENCY_WEIGHTS)[0]
+
+        # Mostly short notices, with a tail of long reports
+        n_sentences = rng.randint(12, 60) if rng.random() < self.long_ratio else rng.randint(2, 7)
+        sentences = [URGENCY_OPENERS[urgency][rng.randrange(len(URGENCY_OPENERS[urgency]))]]
+        for _ in range(n_sentences):
+            dept = primary if rng.random() < 0.6 else rng.choice(tagged)
+            sentences.append(self._fill(rng.choice(SENTENCES), rng, rng.choice(self.department_tags[dept])))
+        language = 'English'
+        if rng.random() < self.bilingual_ratio:
+            sentences.append(rng.choice(MALAYALAM_SENTENCES))
+            language = 'Bilingual'
+
+        received = self.start_date + timedelta(days=rng.randrange(self.span_days))
+        deadline = None
+        if rng.random() < 0.85:
+            hours = self.response_hours.get(doc_type, 72)
+            deadline = (received + timedelta(days=max(1, round(hours / 24 * rng.uniform(0.5, 3))))).isoformat()
+
+        author = rng.choice(AUTHORS.get(source, [source])).format(station=rng.choice(STATIONS))
+        title = self._fill(rng.choice(TITLES), rng, rng.choice(self.department_tags[primary]),
+                           type=doc_type.replace('_', ' '))
+        return {
+            'id': f"SYN-{self.seed}-{index:08d}",
+            'title': title,
+            'source_department': source,
+            'source_authority': author,
+            'document_type': doc_type,
+            'tagged_departments': tagged,
+            'deadline': deadline,
+            'content': ' '.join(sentence for sentence in sentences if sentence),
+            'language': language,
+            'urgency_level': urgency,
+            'received_date': received.isoformat()
+        }
+
+    def iter_documents(self, n: int, start: int = 0) -> Iterator[Dict]:
+        """Yield documents start .. start + n - 1"""
+        for index in range(start, start + n):
+            yield self.document(index)
+
+    def iter_document_batches(self, n: int, batch_size: int, start: int = 0) -> Iterator[List[Dict]]:
+        """Yield the first n documents in lists of at most batch_size"""
+        documents = self.iter_documents(n, start)
+        while True:
+            batch = list(islice(documents, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    # ------------------------------------------------------------------
+    # Labelled text (Document_data.csv style)
+    # ------------------------------------------------------------------
+
+    def labelled(self, index: int) -> Tuple[str, str]:
+        """
+        The index-th labelled row
+
+        Returns:
+            Tuple of (text, label)
+        """
+        rng = random.Random(f"{self.seed}:label:{index}")
+        labels = list(LABELLED_TEMPLATES)
+        label = rng.choice(labels)
+        text = rng.choice(LABELLED_TEMPLATES[label]).format(
+            km=rng.randrange(1, 26), depot=rng.choice(DEPOTS), major=rng.randrange(1, 5), minor=rng.randrange(10),
+            asset=rng.choice(ASSETS), station=rng.choice(STATIONS), quarter=rng.randrange(1, 5),
+            percent=rng.randrange(2, 25), number=rng.randrange(1, 1000), vendor=rng.choice(VENDORS),
+            amount=rng.randrange(2, 900), leaves=rng.choice([12, 15, 18, 20]), letter=rng.choice('ABCDE'),
+            depot_number=rng.randrange(1, 4), dom=rng.randrange(1, 31), count=rng.randrange(2, 40),
+            months=rng.choice([12, 18, 24, 36])
+        )
+
+        if rng.random() < 0.3:
+            text += ' ' + rng.choice(MALAYALAM_SENTENCES)
+        if rng.random() < 0.4:
+            day = self.start_date + timedelta(days=rng.randrange(self.span_days))
+            text += f"  Ref: {LABEL_CODES[label]}-{rng.randrange(1, 100):03d} | Date: {day.isoformat()}."
+        if rng.random() < 0.3:
+            text += f" [attachment: page_{rng.randrange(1, 10)}.pdf]"
+
+        if rng.random() < self.label_noise:
+            label = rng.choice(labels)
+        return text, label
+
+    def iter_labelled(self, n: int, start: int = 0) -> Iterator[Tuple[str, str]]:
+        """Yield labelled rows start .. start + n - 1"""
+        for index in range(start, start + n):
+            yield self.labelled(index)
+
+    # ------------------------------------------------------------------
+    # Writers
+    # ------------------------------------------------------------------
+
+    def write_documents(self, path: str, n: int, fmt: str = 'json') -> None:
+        """
+        Stream n documents to a file
+
+        Args:
+            path: Output path
+            n: Number of documents
+            fmt: 'json' ({"documents": [...]}, like sample_documents.json) or 'ndjson'
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            if fmt == 'ndjson':
+                for doc in self.iter_documents(n):
+                    f.write(json.dumps(doc, ensure_ascii=False) + '\n')
+                return
+            f.write('{\n  "documents": [')
+            for index, doc in enumerate(self.iter_documents(n)):
+                f.write(('\n    ' if index == 0 else ',\n    ') + json.dumps(doc, ensure_ascii=False))
+            f.write('\n  ]\n}\n')
+
+    def write_labelled_csv(self, path: str, n: int) -> None:
+        """Stream n labelled rows to a text,label CSV"""
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['text', 'label'])
+            writer.writerows(self.iter_labelled(n))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic KMRL corpus")
+    parser.add_argument('--documents', type=int, default=0, help="Number of documents to generate")
+    parser.add_argument('--output', default='data/synthetic_documents.json')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json')
+    parser.add_argument('--labelled', type=int, default=0, help="Number of labelled rows to generate")
+    parser.add_argument('--labelled-output', default='data/synthetic_labelled.csv')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--hierarchy', default='data/department_hierarchy.json')
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus(seed=args.seed, hierarchy_path=args.hierarchy)
+    if args.documents:
+        corpus.write_documents(args.output, args.documents, args.format)
+        print(f"[corpus] {args.documents} documents -> {args.output}")
+    if args.labelled:
+        corpus.write_labelled_csv(args.labelled_output, args.labelled)
+        print(f"[corpus] {args.labelled} labelled rows -> {args.labelled_output}")
+
+
+if __name__ == "__main__":
+    main()